@@ -0,0 +1,173 @@
+import os
+import queue
+import stat
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+from backup.scanner import SourceManifest
+
+# lzma, tarfile and zipfile are imported by the writers that need them, so
+# loading this module (and BackupManager) stays cheap when archives are off
+
+ARCHIVE_EXTENSIONS = {"zip": ".zip", "tar.xz": ".tar.xz"}
+XZ_BLOCK_SIZE = 4 * 1024 * 1024  # Uncompressed bytes per independently compressed xz stream
+READ_CHUNK_SIZE = 1024 * 1024
+READ_AHEAD_CHUNKS = 16
+
+class ParallelXZWriter:
+    """
+    Write-only file object that compresses its input to .xz on a thread pool.
+
+    Input is cut into fixed-size blocks that are compressed as independent xz
+    streams and written in order. Concatenated xz streams are a valid .xz file,
+    readable by tarfile, the lzma module and the xz tool.
+    """
+
+    def __init__(self, fileobj, max_workers: int, preset: int = 6):
+        self.fileobj = fileobj
+        self.preset = preset
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_pending = max_workers * 2
+        self.pending = deque()
+        self.buffer = bytearray()
+
+    def write(self, data) -> int:
+        self.buffer += data
+        while len(self.buffer) >= XZ_BLOCK_SIZE:
+            self._submit(bytes(self.buffer[:XZ_BLOCK_SIZE]))
+            del self.buffer[:XZ_BLOCK_SIZE]
+        return len(data)
+
+    def _submit(self, block: bytes) -> None:
+        import lzma
+        # Bound memory use by writing finished blocks before queueing more
+        while len(self.pending) >= self.max_pending:
+            self.fileobj.write(self.pending.popleft().result())
+        self.pending.append(self.executor.submit(lzma.compress, block, format=lzma.FORMAT_XZ, preset=self.preset))
+
+    def close(self) -> None:
+        try:
+            if self.buffer:
+                self._submit(bytes(self.buffer))
+                self.buffer = bytearray()
+            while self.pending:
+                self.fileobj.write(self.pending.popleft().result())
+        finally:
+            for future in self.pending:
+                future.cancel()
+            self.executor.shutdown()
+
+class _ReadAhead:
+    """Read files in manifest order on a background thread into a bounded queue of chunks"""
+
+    _END_OF_FILE = object()
+
+    def __init__(self, manifest: SourceManifest, source_paths: Dict[str, str]):
+        self.chunks = queue.Queue(maxsize=READ_AHEAD_CHUNKS)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._read_all, args=(manifest, source_paths), daemon=True)
+        self.thread.start()
+
+    def _put(self, item) -> bool:
+        while not self.stopped.is_set():
+            try:
+                self.chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read_all(self, manifest: SourceManifest, source_paths: Dict[str, str]) -> None:
+        try:
+            for entry in manifest.files:
+                with open(source_paths[entry.rel_path], "rb") as f:
+                    while True:
+                        chunk = f.read(READ_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        if not self._put(chunk):
+                            return
+                if not self._put(self._END_OF_FILE):
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def file_chunks(self):
+        """Yield the chunks of the next file"""
+        while True:
+            item = self.chunks.get()
+            if item is self._END_OF_FILE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+class _ProgressReader:
+    """File wrapper that reports how many bytes have been read"""
+
+    def __init__(self, fileobj, report: Callable[[int], None]):
+        self.fileobj = fileobj
+        self.report = report
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.report(len(data))
+        return data
+
+def write_tar_xz(archive_path: str, manifest: SourceManifest, source_paths: Dict[str, str],
+                 report: Callable[[int], None], max_workers: int) -> None:
+    """Stream the manifest into a .tar.xz archive, compressing blocks in parallel"""
+    import tarfile
+    with open(archive_path, "wb") as out:
+        xz = ParallelXZWriter(out, max_workers)
+        try:
+            with tarfile.open(fileobj=xz, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+                for rel_dir in manifest.directories:
+                    info = tarfile.TarInfo(rel_dir.replace(os.sep, "/"))
+                    info.type = tarfile.DIRTYPE
+                    info.mode = 0o755
+                    info.mtime = int(time.time())
+                    tar.addfile(info)
+                for entry in manifest.files:
+                    # Headers come from the scan, so files are not stat'ed again
+                    info = tarfile.TarInfo(entry.rel_path.replace(os.sep, "/"))
+                    info.size = entry.size
+                    info.mtime = entry.mtime_ns / 1e9
+                    info.mode = stat.S_IMODE(entry.mode)
+                    with open(source_paths[entry.rel_path], "rb") as f:
+                        tar.addfile(info, _ProgressReader(f, report))
+        finally:
+            xz.close()
+
+def write_zip(archive_path: str, manifest: SourceManifest, source_paths: Dict[str, str],
+              report: Callable[[int], None]) -> None:
+    """Stream the manifest into a deflate .zip archive while a worker thread reads ahead"""
+    import zipfile
+    reader = _ReadAhead(manifest, source_paths)
+    try:
+        with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for rel_dir in manifest.directories:
+                archive.writestr(rel_dir.replace(os.sep, "/") + "/", b"")
+            for entry in manifest.files:
+                info = zipfile.ZipInfo(entry.rel_path.replace(os.sep, "/"),
+                                       _zip_date_time(entry.mtime_ns))
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = (entry.mode & 0xFFFF) << 16
+                # Known size lets zipfile decide on ZIP64 headers up front
+                info.file_size = entry.size
+                with archive.open(info, "w") as member:
+                    for chunk in reader.file_chunks():
+                        member.write(chunk)
+                        report(len(chunk))
+    finally:
+        reader.close()
+
+def _zip_date_time(mtime_ns: int):
+    # ZIP cannot store dates before 1980
+    return max(time.localtime(mtime_ns / 1e9)[:6], (1980, 1, 1, 0, 0, 0))
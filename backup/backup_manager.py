@@ -1,142 +1,891 @@
+import errno
 import os
 import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Optional, Callable
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 from utils.path_utils import mask_game_path_in_savegame_location
 from utils.logger import logger
+from utils.constants import COPY_WORKERS, SNAPSHOT_NAME_FORMAT
+from backup.scanner import FileEntry, SourceManifest, mtimes_match, scan_sources, scan_tree
+from backup.snapshot_store import STORE_DIR_NAME, SnapshotStore, link_limit_reached
+from backup.archive_writer import ARCHIVE_EXTENSIONS, write_tar_xz, write_zip
+from backup.progress import ProgressThrottle
+from backup.delta import DELTA_MIN_FILE_SIZE, clone_file, delta_update
+from backup.integrity import (CHECKSUM_FILE_NAME, VerifyResult, find_checksum_folders, hash_file, load_checksums,
+                              new_hasher, remove_checksums, write_checksums)
+from backup.staging import (STAGING_PREFIX, BackgroundDeleter, background_deleter, clear_leftovers,
+                            clear_replaced, move_aside, staging_path, swap_into_place)
+from backup.retention import (RetentionPolicy, SnapshotSizeCache, manifest_contents, select_snapshots_to_prune,
+                              snapshot_contents)
+
+# Folder in a game's backup folder that keeps the files a restore replaced
+SAFETY_FOLDER_NAME = "Before Restore"
+
+FILE_COPY_BUFFER_SIZE = 1024 * 1024  # 1MB buffer for the read/write fallback
+KERNEL_COPY_CHUNK_SIZE = 64 * 1024 * 1024  # Bytes per copy_file_range/sendfile call
+# Errors meaning the kernel copy call cannot be used for this pair of files
+KERNEL_COPY_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP,
+                           errno.ENOTSUP, errno.EBADF, errno.EPERM}
+
+class BackupTarget(NamedTuple):
+    """Where a backup run writes to and which preferences apply to it"""
+    game_folder: str
+    base_folder: str
+    timestamp: Optional[str]
+    incremental: bool
+    snapshot_mode: str
+    archive_format: str
+    integrity_manifest: bool
+
+class RestoreResult(NamedTuple):
+    """What a restore changed in the live savegame location"""
+    restored: int
+    unchanged: int
+    removed: int
+    safety_folder: Optional[str]
 
 class BackupManager:
     def __init__(self, config_manager, progress_callback: Optional[Callable[[float], None]] = None, 
-                 log_callback: Optional[Callable[[str], None]] = None):
+                 log_callback: Optional[Callable[[str], None]] = None,
+                 max_workers: int = COPY_WORKERS, deleter: BackgroundDeleter = background_deleter):
         self.config_manager = config_manager
         self.progress_callback = progress_callback
         self.log_callback = log_callback
+        self.max_workers = max(1, max_workers)
+        # Per-file and per-chunk progress is coalesced before it reaches the callback
+        self._progress = ProgressThrottle(progress_callback)
+        # Replaced backups are deleted in the background instead of before copying
+        self.deleter = deleter
+        # Hashes of files written during the current backup run, by destination path
+        self._hash_files = False
+        self._digests: Dict[str, str] = {}
+        # Bytes written to the backup drive during the current run, added up on the calling thread
+        self._bytes_written = 0
+        # Each copy thread keeps one copy buffer for all the files it copies
+        self._thread_state = threading.local()
     
     def log(self, message):
         """Log message using callback if available"""
         if self.log_callback:
+            # Deliver held-back progress first so the callbacks see events in order
+            self._progress.flush()
             self.log_callback(message)
     
     def update_progress(self, progress):
         """Update progress using callback if available"""
-        if self.progress_callback:
-            self.progress_callback(progress)
+        self._progress.update(progress)
     
     def create_backup(self, game_title, savegame_location, backup_location, 
                      timestamp_option="Disable", path_display_option="Auto", 
-                     author="Smothy", credit_note="", backup_mode="Folder"):
-        """Create backup for the specified game"""
+                     author="Smothy", credit_note="", backup_mode="Folder", incremental=None):
+        """
+        Create backup for the specified game. incremental overrides the
+        incremental_backup preference when given.
+        """
+        self._progress.reset()
+        self._digests = {}
+        self._bytes_written = 0
+        run_start = (datetime.now(), time.monotonic())
+        backup_base_folder = ""
+        manifest = None
         try:
-            if not os.path.exists(savegame_location):
-                if backup_mode == "Folder":
-                    raise FileNotFoundError(f"Source savegame folder not found: {savegame_location}")
-                else:
-                    raise FileNotFoundError(f"Source savegame file not found: {savegame_location}")
-
-            # Check if we should use default backup directory
-            preferences = self.config_manager.get_preferences()
-            if preferences.get("save_output_directory", False):
-                default_backup_dir = self.config_manager.config.get("default_backup_directory", "")
-                if default_backup_dir and os.path.exists(default_backup_dir):
-                    backup_location = default_backup_dir
-                    self.log(f"Using default backup directory: {backup_location}")
-
-            if not os.path.exists(backup_location):
-                os.makedirs(backup_location)
-                self.log(f"Created backup directory: {backup_location}")
-
-            game_folder = os.path.join(backup_location, game_title)
-            
-            if not os.path.exists(game_folder):
-                os.makedirs(game_folder)
-                self.log(f"Created game folder: {game_folder}")
-
-            backup_base_folder = game_folder
-            if timestamp_option == "Enable":
-                timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                backup_base_folder = os.path.join(game_folder, timestamp)
-                os.makedirs(backup_base_folder)
-                self.log(f"Created timestamped folder: {backup_base_folder}")
+            self._validate_source(savegame_location, backup_mode)
+            target = self._prepare_backup_target(game_title, backup_location, timestamp_option, incremental)
+            backup_base_folder = target.base_folder
+            previous_folder = None
+            if target.snapshot_mode == "Hardlink":
+                previous_folder = self.find_previous_snapshot(target.game_folder, target.timestamp)
+            backup_names = [self._item_name(savegame_location)]
             
-            if backup_mode == "Folder":
+            if target.archive_format in ARCHIVE_EXTENSIONS:
+                # Archive backup: one compressed file next to Readme.txt
+                source_name = self._item_name(savegame_location)
+                archive_path = os.path.join(backup_base_folder, source_name + ARCHIVE_EXTENSIONS[target.archive_format])
+                manifest = self.create_archive(archive_path, [(savegame_location, backup_mode)], target.archive_format)
+                backup_names = [os.path.basename(archive_path)]
+                self.log(f"Backup successful! Savegame archived to: {archive_path}")
+            elif target.snapshot_mode == "Deduplicated":
+                # Deduplicated snapshot: contents go to the game's snapshot store
+                manifest = self.create_snapshot(target.game_folder, target.timestamp, backup_base_folder,
+                                                [(savegame_location, backup_mode)])
+                self.log(f"Backup successful! Snapshot created at: {backup_base_folder}")
+            elif backup_mode == "Folder":
                 # Folder backup logic
-                source_folder_name = os.path.basename(savegame_location.rstrip("/\\"))
+                source_folder_name = self._item_name(savegame_location)
                 destination_folder = os.path.join(backup_base_folder, source_folder_name)
 
-                if os.path.exists(destination_folder):
-                    shutil.rmtree(destination_folder)
-                    self.log(f"Removed existing backup at: {destination_folder}")
-                
-                # Copy with progress
-                self.copy_with_progress(savegame_location, destination_folder)
+                if target.snapshot_mode == "Hardlink":
+                    previous = os.path.join(previous_folder, source_folder_name) if previous_folder else None
+                    manifest = self.link_with_progress(savegame_location, destination_folder, previous)
+                elif target.incremental:
+                    manifest = self.sync_with_progress(savegame_location, destination_folder)
+                else:
+                    # Copy with progress into staging, then swap it in place of the old backup
+                    manifest = self.replace_with_copy(destination_folder,
+                                                      lambda staged: self.copy_with_progress(savegame_location, staged))
                 
                 self.log(f"Backup successful! Savegame folder copied to: {destination_folder}")
             else:
-                # File backup logic
+                # File backup logic; scanning a single file is one stat
+                manifest = scan_sources([(savegame_location, backup_mode)])[0]
                 source_file_name = os.path.basename(savegame_location)
                 destination_file = os.path.join(backup_base_folder, source_file_name)
 
-                if os.path.exists(destination_file):
-                    os.remove(destination_file)
-                    self.log(f"Removed existing backup file at: {destination_file}")
-                
-                # Copy file with progress
-                self.copy_file_with_progress(savegame_location, destination_file)
-                
-                self.log(f"Backup successful! Savegame file copied to: {destination_file}")
+                if target.incremental and self.is_file_unchanged(savegame_location, destination_file):
+                    self.update_progress(100)
+                    self.log(f"Backup is up to date, savegame file unchanged: {destination_file}")
+                elif target.snapshot_mode == "Hardlink" and self.link_unchanged_file(
+                        savegame_location, destination_file, previous_folder):
+                    self.update_progress(100)
+                    self.log(f"Savegame file unchanged, linked from previous snapshot: {destination_file}")
+                elif (target.incremental and os.path.isfile(destination_file)
+                      and os.path.getsize(savegame_location) >= DELTA_MIN_FILE_SIZE
+                      and self.delta_copy_file(savegame_location, destination_file,
+                                               os.path.join(target.game_folder, STORE_DIR_NAME, "blocks",
+                                                            source_file_name + ".json"))):
+                    self.log(f"Backup successful! Savegame file updated at: {destination_file}")
+                else:
+                    # Copy file with progress into staging, then swap it in place of the old backup
+                    self.replace_with_copy(destination_file,
+                                           lambda staged: self.copy_file_with_progress(savegame_location, staged))
+                    
+                    self.log(f"Backup successful! Savegame file copied to: {destination_file}")
 
+            self.update_checksums(target, backup_names, previous_folder)
+            
             # Create credit file
             self.create_credit_file(backup_base_folder, game_title, savegame_location, 
                                   path_display_option, author, credit_note, backup_mode)
+            
+            if target.timestamp:
+                self.apply_retention(game_title, target.game_folder)
 
         except Exception as e:
+            self.record_run(game_title, backup_base_folder, manifest, run_start, e)
             raise Exception(f"Backup failed: {str(e)}")
+        else:
+            self.record_run(game_title, backup_base_folder, manifest, run_start)
+        finally:
+            self._progress.flush()
+    
+    def create_backup_multiple(self, game_title, items, backup_location,
+                               timestamp_option="Disable", path_display_option="Auto",
+                               author="Smothy", credit_note=""):
+        """
+        Create one backup of several savegame items, a list of {'path', 'mode'} dicts
+        with mode 'Folder' or 'File'. All items are scanned together, copied on one
+        thread pool with a single progress stream and described in one Readme.txt.
+        """
+        self._progress.reset()
+        self._digests = {}
+        self._bytes_written = 0
+        run_start = (datetime.now(), time.monotonic())
+        backup_base_folder = ""
+        manifest = None
+        try:
+            sources = [(item["path"], item.get("mode", "Folder")) for item in items]
+            if not sources:
+                raise ValueError("No savegame paths to back up")
+            names = set()
+            for path, mode in sources:
+                self._validate_source(path, mode)
+                name = self._item_name(path)
+                if name in names:
+                    raise ValueError(f"More than one savegame path is named '{name}'")
+                names.add(name)
+            
+            target = self._prepare_backup_target(game_title, backup_location, timestamp_option)
+            backup_base_folder = target.base_folder
+            previous = None
+            backup_names = [self._item_name(path) for path, _ in sources]
+            
+            if target.archive_format in ARCHIVE_EXTENSIONS:
+                archive_path = os.path.join(backup_base_folder, game_title + ARCHIVE_EXTENSIONS[target.archive_format])
+                manifest = self.create_archive(archive_path, sources, target.archive_format)
+                backup_names = [os.path.basename(archive_path)]
+                self.log(f"Backup successful! {len(sources)} savegame paths archived to: {archive_path}")
+            elif target.snapshot_mode == "Deduplicated":
+                manifest = self.create_snapshot(target.game_folder, target.timestamp, backup_base_folder, sources)
+                self.log(f"Backup successful! Snapshot created at: {backup_base_folder}")
+            else:
+                if target.snapshot_mode == "Hardlink":
+                    previous = self.find_previous_snapshot(target.game_folder, target.timestamp)
+                    manifest = self.copy_items_with_progress(sources, backup_base_folder, "link", previous)
+                elif target.incremental:
+                    manifest = self.copy_items_with_progress(sources, backup_base_folder, "sync")
+                else:
+                    manifest = self.copy_items_with_progress(sources, backup_base_folder, "copy")
+                self.log(f"Backup successful! {len(sources)} savegame paths copied to: {backup_base_folder}")
+            
+            self.update_checksums(target, backup_names, previous)
+            self.create_credit_file(backup_base_folder, game_title, None,
+                                    path_display_option, author, credit_note, sources=sources)
+            
+            if target.timestamp:
+                self.apply_retention(game_title, target.game_folder)
+            
+        except Exception as e:
+            self.record_run(game_title, backup_base_folder, manifest, run_start, e)
+            raise Exception(f"Backup failed: {str(e)}")
+        else:
+            self.record_run(game_title, backup_base_folder, manifest, run_start)
+        finally:
+            self._progress.flush()
+    
+    def record_run(self, game_title, path, manifest: Optional[SourceManifest], run_start: Tuple[datetime, float],
+                   error: Optional[Exception] = None) -> None:
+        """
+        Add a finished backup to the game's run history: the size and file count
+        of the savegame, from the manifest the run built, and the bytes the run
+        actually wrote. A history that cannot be written never fails the backup.
+        """
+        started_at, started = run_start
+        duration = time.monotonic() - started
+        try:
+            game_id = self.config_manager.get_game_id_by_title(game_title)
+            if not game_id:
+                return
+            size = manifest.total_size if manifest else 0
+            file_count = manifest.file_count if manifest else 0
+            self.config_manager.record_backup_run(
+                game_id, started_at.strftime("%Y-%m-%d %H:%M:%S"), path, size, file_count,
+                round(duration, 3), "failed" if error else "success", str(error) if error else None,
+                self._bytes_written
+            )
+        except Exception as e:
+            logger.warning(f"Could not record backup run of {game_title}: {e}")
+    
+    def _validate_source(self, path, backup_mode) -> None:
+        if not os.path.exists(path):
+            if backup_mode == "Folder":
+                raise FileNotFoundError(f"Source savegame folder not found: {path}")
+            else:
+                raise FileNotFoundError(f"Source savegame file not found: {path}")
+        if backup_mode == "Folder" and not os.path.isdir(path):
+            raise NotADirectoryError(f"Source savegame path is not a folder: {path}")
+        if backup_mode != "Folder" and not os.path.isfile(path):
+            raise IsADirectoryError(f"Source savegame path is not a file: {path}")
     
-    def copy_with_progress(self, src, dst):
-        """Copy directory with progress bar"""
-        try:
-            # Count total files for progress calculation
-            total_files = sum([len(files) for _, _, files in os.walk(src)])
-            copied_files = 0
-            
-            def copy_progress(src, dst):
-                nonlocal copied_files
-                if os.path.isdir(src):
-                    if not os.path.exists(dst):
-                        os.makedirs(dst)
-                    for item in os.listdir(src):
-                        s = os.path.join(src, item)
-                        d = os.path.join(dst, item)
-                        copy_progress(s, d)
+    def _item_name(self, path) -> str:
+        """Name a savegame path gets inside the backup folder"""
+        return os.path.basename(path.rstrip("/\\"))
+    
+    def _prepare_backup_target(self, game_title, backup_location, timestamp_option,
+                               incremental: Optional[bool] = None) -> BackupTarget:
+        """Apply preferences and create the game folder (and timestamped folder) for a backup run"""
+        # Check if we should use default backup directory
+        preferences = self.config_manager.get_preferences()
+        if preferences.get("save_output_directory", False):
+            default_backup_dir = self.config_manager.config.get("default_backup_directory", "")
+            if default_backup_dir and os.path.exists(default_backup_dir):
+                backup_location = default_backup_dir
+                self.log(f"Using default backup directory: {backup_location}")
+
+        # Incremental mode only applies when the backup is updated in place,
+        # snapshot storage only when every run gets its own timestamped folder
+        if incremental is None:
+            incremental = preferences.get("incremental_backup", False)
+        incremental = timestamp_option != "Enable" and incremental
+        snapshot_mode = preferences.get("snapshot_mode", "Full") if timestamp_option == "Enable" else "Full"
+        archive_format = preferences.get("archive_format", "None")
+        integrity_manifest = preferences.get("integrity_manifest", True)
+        self._hash_files = integrity_manifest
+
+        if not os.path.exists(backup_location):
+            os.makedirs(backup_location)
+            self.log(f"Created backup directory: {backup_location}")
+
+        game_folder = os.path.join(backup_location, game_title)
+        
+        if not os.path.exists(game_folder):
+            os.makedirs(game_folder)
+            self.log(f"Created game folder: {game_folder}")
+
+        backup_base_folder = game_folder
+        timestamp = None
+        if timestamp_option == "Enable":
+            timestamp = datetime.now().strftime(SNAPSHOT_NAME_FORMAT)
+            backup_base_folder = os.path.join(game_folder, timestamp)
+            os.makedirs(backup_base_folder)
+            self.log(f"Created timestamped folder: {backup_base_folder}")
+        
+        return BackupTarget(game_folder, backup_base_folder, timestamp, incremental, snapshot_mode,
+                            archive_format, integrity_manifest)
+    
+    def copy_with_progress(self, src, dst, manifest: Optional[SourceManifest] = None) -> SourceManifest:
+        """Copy directory with progress bar, using a thread pool for the file copies"""
+        try:
+            # A single scan provides the file list, sizes and progress totals
+            if manifest is None:
+                manifest = scan_tree(src)
+            
+            os.makedirs(dst, exist_ok=True)
+            self._make_directories(dst, manifest)
+            self._copy_entries(manifest.files, self._source_paths(src, manifest), dst)
+            return manifest
+            
+        except Exception as e:
+            raise Exception(f"Copy operation failed: {str(e)}")
+    
+    def sync_with_progress(self, src, dst, manifest: Optional[SourceManifest] = None) -> SourceManifest:
+        """Update an existing directory backup, copying only new or changed files"""
+        try:
+            if manifest is None:
+                manifest = scan_tree(src)
+            if not os.path.isdir(dst):
+                if os.path.exists(dst):
+                    os.remove(dst)
+                return self.copy_with_progress(src, dst, manifest)
+            
+            changed, removed = self._apply_sync(dst, manifest, scan_tree(dst))
+            self._copy_entries(changed, self._source_paths(src, manifest), dst)
+            self.log(f"Incremental backup: {len(changed)} copied, {removed} removed, "
+                     f"{manifest.file_count - len(changed)} unchanged")
+            return manifest
+            
+        except Exception as e:
+            raise Exception(f"Copy operation failed: {str(e)}")
+    
+    def link_with_progress(self, src, dst, previous: Optional[str],
+                           manifest: Optional[SourceManifest] = None) -> SourceManifest:
+        """
+        Copy directory into a new snapshot, hardlinking files that are unchanged
+        since the previous snapshot instead of copying them
+        """
+        try:
+            if manifest is None:
+                manifest = scan_tree(src)
+            if not previous or not os.path.isdir(previous):
+                return self.copy_with_progress(src, dst, manifest)
+            
+            os.makedirs(dst, exist_ok=True)
+            self._make_directories(dst, manifest)
+            self._link_entries(manifest.files, self._source_paths(src, manifest), dst,
+                               previous, scan_tree(previous))
+            return manifest
+            
+        except Exception as e:
+            raise Exception(f"Copy operation failed: {str(e)}")
+    
+    def copy_items_with_progress(self, sources: List[Tuple[str, str]], dst, strategy="copy",
+                                 previous: Optional[str] = None) -> SourceManifest:
+        """
+        Copy several (path, backup_mode) items into dst as one job with one progress stream.
+        strategy is 'copy' (replace), 'sync' (incremental) or 'link' (hardlink from previous).
+        """
+        try:
+            manifest, source_paths = scan_sources(sources)
+            names = [self._item_name(path) for path, _ in sources]
+            
+            if strategy == "sync":
+                changed, removed = self._apply_sync(dst, manifest, self._scan_existing_items(dst, names))
+                self._copy_entries(changed, source_paths, dst)
+                self.log(f"Incremental backup: {len(changed)} copied, {removed} removed, "
+                         f"{manifest.file_count - len(changed)} unchanged")
+                return manifest
+            
+            # Items are written into one staging folder and then swapped into place
+            staged_root = os.path.join(dst, STAGING_PREFIX.rstrip("-"))
+            for name in names:
+                clear_leftovers(os.path.join(dst, name), self.deleter)
+            if os.path.lexists(staged_root):
+                shutil.rmtree(staged_root)
+            try:
+                os.makedirs(staged_root)
+                self._make_directories(staged_root, manifest)
+                if strategy == "link" and previous and os.path.isdir(previous):
+                    self._link_entries(manifest.files, source_paths, staged_root, previous,
+                                       self._scan_existing_items(previous, names))
                 else:
-                    shutil.copy2(src, dst)
+                    self._copy_entries(manifest.files, source_paths, staged_root)
+                for name in names:
+                    destination = os.path.join(dst, name)
+                    if swap_into_place(os.path.join(staged_root, name), destination, self.deleter):
+                        self.log(f"Replaced existing backup at: {destination}")
+                    self._move_digests(os.path.join(staged_root, name), destination)
+                os.rmdir(staged_root)
+            except Exception:
+                if os.path.lexists(staged_root):
+                    self.deleter.delete(staged_root)
+                raise
+            return manifest
+            
+        except Exception as e:
+            raise Exception(f"Copy operation failed: {str(e)}")
+    
+    def replace_with_copy(self, destination, write_copy: Callable[[str], Any]) -> Any:
+        """
+        Let write_copy write a new backup to a staging path, then swap it in place
+        of destination. The old backup stays complete until the swap and is
+        deleted in the background afterwards. Returns what write_copy returned.
+        """
+        clear_leftovers(destination, self.deleter)
+        staged = staging_path(destination)
+        try:
+            result = write_copy(staged)
+            replaced = swap_into_place(staged, destination, self.deleter)
+            self._move_digests(staged, destination)
+        except Exception:
+            # Renamed away at once, so a retry can stage a new copy under the same name
+            if os.path.lexists(staged):
+                move_aside(staged, self.deleter)
+            raise
+        if replaced:
+            self.log(f"Replaced existing backup at: {destination}")
+        return result
+    
+    def _move_digests(self, old_path, new_path) -> None:
+        """Re-key recorded hashes after a staged copy was renamed into place"""
+        prefix = old_path + os.sep
+        for path in [path for path in self._digests if path == old_path or path.startswith(prefix)]:
+            self._digests[new_path + path[len(old_path):]] = self._digests.pop(path)
+    
+    def update_checksums(self, target: BackupTarget, names: List[str], previous_folder: Optional[str] = None) -> None:
+        """
+        Write the checksum manifest of the named items in the backup folder. Files
+        copied in this run were hashed while copying; unchanged or linked files reuse
+        the hash recorded for them before, and only the rest are read again.
+        """
+        folder = target.base_folder
+        if not target.integrity_manifest:
+            remove_checksums(folder)
+            return
+        try:
+            known = {}
+            for old_folder in (previous_folder, folder):
+                if old_folder:
+                    try:
+                        known.update(load_checksums(old_folder))
+                    except ValueError as e:
+                        logger.warning(f"Ignoring checksum manifest: {e}")
+            
+            manifest = self._scan_existing_items(folder, names)
+            records = {}
+            to_hash = []
+            for entry in manifest.files:
+                key = entry.rel_path.replace(os.sep, "/")
+                digest = self._digests.get(os.path.join(folder, entry.rel_path))
+                old = known.get(key)
+                if digest is None and old and old["size"] == entry.size and old["mtime_ns"] == entry.mtime_ns:
+                    digest = old["hash"]
+                if digest is None:
+                    to_hash.append(entry)
+                else:
+                    records[key] = {"hash": digest, "size": entry.size, "mtime_ns": entry.mtime_ns}
+            
+            if to_hash:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(to_hash))) as executor:
+                    paths = [os.path.join(folder, entry.rel_path) for entry in to_hash]
+                    for entry, digest in zip(to_hash, executor.map(hash_file, paths)):
+                        records[entry.rel_path.replace(os.sep, "/")] = {
+                            "hash": digest, "size": entry.size, "mtime_ns": entry.mtime_ns}
+            
+            write_checksums(folder, dict(sorted(records.items())))
+            self.log(f"Checksums recorded for {len(records)} files ({len(to_hash)} hashed separately)")
+        except Exception as e:
+            raise Exception(f"Checksum manifest failed: {str(e)}")
+    
+    def verify_backups(self, root) -> List[VerifyResult]:
+        """
+        Re-hash every backup under root that has a checksum manifest, on the thread
+        pool, and report missing or corrupt files per backup folder
+        """
+        try:
+            folders = find_checksum_folders(root)
+            entries = []
+            expected = {}
+            owners = {}
+            unreadable = set()
+            for folder in folders:
+                try:
+                    records = load_checksums(folder)
+                except ValueError as e:
+                    self.log(f"Cannot read checksum manifest: {e}")
+                    unreadable.add(folder)
+                    continue
+                for rel_path, record in records.items():
+                    # Entries are keyed by their path relative to root
+                    path = os.path.relpath(os.path.join(folder, rel_path), root)
+                    entries.append(FileEntry(path, record["size"], record["mtime_ns"], 0))
+                    expected[path] = record["hash"]
+                    owners[path] = folder
+            
+            def check(entry: FileEntry) -> str:
+                try:
+                    actual = hash_file(os.path.join(root, entry.rel_path))
+                    return "ok" if actual == expected[entry.rel_path] else "corrupt"
+                except (FileNotFoundError, NotADirectoryError):
+                    return "missing"
+                except OSError as e:
+                    logger.warning(f"Cannot read {entry.rel_path}: {e}")
+                    return "corrupt"
+            
+            self.log(f"Verifying {len(entries)} files in {len(folders)} backups...")
+            outcomes = self._run_file_jobs(entries, check)
+            
+            checked = {folder: 0 for folder in folders}
+            missing = {folder: [] for folder in folders}
+            corrupt = {folder: [CHECKSUM_FILE_NAME] if folder in unreadable else [] for folder in folders}
+            for entry in entries:
+                folder = owners[entry.rel_path]
+                checked[folder] += 1
+                outcome = outcomes[entry.rel_path]
+                if outcome != "ok":
+                    (missing if outcome == "missing" else corrupt)[folder].append(
+                        os.path.relpath(os.path.join(root, entry.rel_path), folder))
+            results = [VerifyResult(folder, checked[folder], missing[folder], corrupt[folder]) for folder in folders]
+            
+            bad = [result for result in results if not result.ok]
+            self.log(f"Verification finished: {len(results) - len(bad)} of {len(results)} backups intact, "
+                     f"{sum(len(r.missing) for r in bad)} files missing, {sum(len(r.corrupt) for r in bad)} corrupt")
+            return results
+            
+        except Exception as e:
+            raise Exception(f"Verification failed: {str(e)}")
+    
+    def _source_paths(self, src, manifest: SourceManifest) -> Dict[str, str]:
+        return {entry.rel_path: os.path.join(src, entry.rel_path) for entry in manifest.files}
+    
+    def _scan_existing_items(self, folder, names: List[str]) -> SourceManifest:
+        """Scan the copies of the named items that already exist in folder"""
+        existing = []
+        for name in names:
+            path = os.path.join(folder, name)
+            if os.path.isdir(path):
+                existing.append((path, "Folder"))
+            elif os.path.isfile(path):
+                existing.append((path, "File"))
+        return scan_sources(existing)[0]
+    
+    def _make_directories(self, dst, manifest: SourceManifest) -> None:
+        for rel_dir in manifest.directories:
+            os.makedirs(os.path.join(dst, rel_dir), exist_ok=True)
+    
+    def _apply_sync(self, dst, manifest: SourceManifest, existing: SourceManifest) -> Tuple[List[FileEntry], int]:
+        """
+        Bring the folders of an existing backup in dst in line with manifest and delete
+        what is gone from the source. Returns the entries still to copy and the number
+        of files removed.
+        """
+        existing_files = {entry.rel_path: entry for entry in existing.files}
+        existing_dirs = set(existing.directories)
+        source_dirs = set(manifest.directories)
+        
+        # A file may have become a folder or the other way around
+        for rel_dir in manifest.directories:
+            if rel_dir in existing_files:
+                os.remove(os.path.join(dst, rel_dir))
+                del existing_files[rel_dir]
+            os.makedirs(os.path.join(dst, rel_dir), exist_ok=True)
+        
+        changed = []
+        for entry in manifest.files:
+            if entry.rel_path in existing_dirs:
+                shutil.rmtree(os.path.join(dst, entry.rel_path))
+                changed.append(entry)
+                continue
+            previous = existing_files.pop(entry.rel_path, None)
+            if (previous is None or previous.size != entry.size
+                    or not mtimes_match(entry.mtime_ns, previous.mtime_ns)):
+                changed.append(entry)
+        
+        # Whatever is left in the backup no longer exists in the source
+        removed = 0
+        for rel_path in existing_files:
+            os.remove(os.path.join(dst, rel_path))
+            removed += 1
+        for rel_dir in sorted(existing_dirs - source_dirs):
+            stale_dir = os.path.join(dst, rel_dir)
+            if os.path.isdir(stale_dir):
+                shutil.rmtree(stale_dir)
+        return changed, removed
+    
+    def _link_entries(self, entries: List[FileEntry], source_paths: Dict[str, str], dst,
+                      previous: str, previous_manifest: SourceManifest) -> None:
+        """Hardlink entries unchanged since the copy in previous, copy the others"""
+        previous_files = {entry.rel_path: entry for entry in previous_manifest.files}
+        links_supported = threading.Event()
+        links_supported.set()
+        
+        def link_or_copy(entry: FileEntry) -> bool:
+            destination_file = os.path.join(dst, entry.rel_path)
+            old = previous_files.get(entry.rel_path)
+            if (links_supported.is_set() and old is not None and old.size == entry.size
+                    and mtimes_match(entry.mtime_ns, old.mtime_ns)):
+                try:
+                    os.link(os.path.join(previous, entry.rel_path), destination_file)
+                    return True
+                except OSError as e:
+                    # Too many links only affects this file; anything else means no hardlinks here
+                    if not link_limit_reached(e):
+                        links_supported.clear()
+            self._copy_file(source_paths[entry.rel_path], destination_file)
+            return False
+        
+        results = self._run_file_jobs(entries, link_or_copy)
+        self._bytes_written += sum(entry.size for entry in entries if not results[entry.rel_path])
+        linked = sum(1 for was_linked in results.values() if was_linked)
+        if not links_supported.is_set():
+            self.log("Hardlinks are not supported on the backup drive, files were copied instead")
+        self.log(f"Hardlink snapshot: {linked} linked, {len(results) - linked} copied")
+    
+    def link_unchanged_file(self, src, dst, previous_folder: Optional[str]) -> bool:
+        """Hardlink dst to the previous snapshot's copy of src if src has not changed"""
+        if not previous_folder:
+            return False
+        previous_file = os.path.join(previous_folder, os.path.basename(dst))
+        if not self.is_file_unchanged(src, previous_file):
+            return False
+        try:
+            os.link(previous_file, dst)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not hardlink {previous_file}: {e}")
+            return False
+    
+    def list_snapshots(self, game_folder) -> List[str]:
+        """Return the names of the timestamped snapshot folders of a game, oldest first"""
+        names = []
+        if not os.path.isdir(game_folder):
+            return names
+        for name in os.listdir(game_folder):
+            if not os.path.isdir(os.path.join(game_folder, name)):
+                continue
+            try:
+                datetime.strptime(name, SNAPSHOT_NAME_FORMAT)
+            except ValueError:
+                continue
+            names.append(name)
+        return sorted(names)
+    
+    def apply_retention(self, game_title, game_folder) -> List[str]:
+        """
+        Remove the timestamped snapshots of a game that its retention policy does not keep.
+        Snapshot folders are renamed away at once and deleted in the background.
+        The size limit counts files shared by Hardlink or Deduplicated snapshots once.
+        Returns the names of the removed snapshots; failures are logged, not raised.
+        """
+        try:
+            policy = RetentionPolicy.from_dict(self.config_manager.get_retention_policy(
+                self.config_manager.get_game_id_by_title(game_title)))
+            if not policy.enabled:
+                return []
+            clear_replaced(game_folder, self.deleter)
+            
+            names = self.list_snapshots(game_folder)
+            store = None
+            if os.path.isdir(os.path.join(game_folder, STORE_DIR_NAME, "snapshots")):
+                store = SnapshotStore(game_folder)
+            contents = None
+            cache = None
+            if policy.max_size_mb:
+                # Only snapshots not measured before are read. A snapshot with a store
+                # manifest is measured from it, any other by the inodes of its files.
+                cache = SnapshotSizeCache(game_folder)
+                stored = set(store.list_snapshots()) if store else set()
+                contents = {}
+                for name in names:
+                    if name not in cache.contents:
+                        if name in stored:
+                            cache.contents[name] = manifest_contents(store.load_manifest(name))
+                        else:
+                            cache.contents[name] = snapshot_contents(os.path.join(game_folder, name))
+                    contents[name] = cache.contents[name]
+            
+            prune = select_snapshots_to_prune(names, {}, policy, contents)
+            for name in prune:
+                move_aside(os.path.join(game_folder, name), self.deleter)
+                if store:
+                    store.delete_manifest(name)
+            if store and prune:
+                # Objects only the removed snapshots used are freed after their views are gone
+                self.deleter.submit(store.collect_garbage)
+            
+            if cache:
+                cache.contents = {name: contents[name] for name in names if name not in prune}
+                cache.save()
+            if prune:
+                self.log(f"Retention: removed {len(prune)} old snapshots, {len(names) - len(prune)} kept")
+            return prune
+            
+        except Exception as e:
+            logger.warning(f"Retention for {game_title} failed: {e}")
+            self.log(f"Warning: old snapshots could not be pruned: {str(e)}")
+            return []
+    
+    def find_previous_snapshot(self, game_folder, current_name) -> Optional[str]:
+        """Return the newest timestamped snapshot folder older than current_name"""
+        previous = [name for name in self.list_snapshots(game_folder) if name < current_name]
+        return os.path.join(game_folder, previous[-1]) if previous else None
+    
+    def create_archive(self, archive_path, sources: List[Tuple[str, str]], archive_format) -> SourceManifest:
+        """
+        Stream sources, a list of (path, backup_mode) pairs, into one compressed archive.
+        The archive is written to a temporary name and only replaces archive_path when complete.
+        Returns the manifest of the archived sources.
+        """
+        temp_path = f"{archive_path}.tmp"
+        try:
+            manifest, source_paths = scan_sources(sources)
+            report = self._byte_progress(manifest.total_size)
+            if archive_format == "tar.xz":
+                write_tar_xz(temp_path, manifest, source_paths, report, self.max_workers)
+            elif archive_format == "zip":
+                write_zip(temp_path, manifest, source_paths, report)
+            else:
+                raise ValueError(f"Unknown archive format: {archive_format}")
+            os.replace(temp_path, archive_path)
+            self.update_progress(100)
+            
+            archive_size = os.path.getsize(archive_path)
+            self._bytes_written += archive_size
+            self.log(f"Archived {manifest.file_count} files: {manifest.total_size} bytes "
+                     f"compressed to {archive_size} bytes")
+            return manifest
+            
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise Exception(f"Archive operation failed: {str(e)}")
+    
+    def _copy_entries(self, entries: List[FileEntry], source_paths: Dict[str, str], dst) -> None:
+        """Copy manifest entries into dst on the thread pool, reporting progress"""
+        self._run_file_jobs(entries, lambda entry: self._copy_file(
+            source_paths[entry.rel_path], os.path.join(dst, entry.rel_path)))
+        self._bytes_written += sum(entry.size for entry in entries)
+    
+    def _copy_file(self, src, dst) -> None:
+        """Copy one file with its metadata, hashing it on the way when checksums are kept"""
+        if not self._hash_files:
+            shutil.copy2(src, dst)
+            return
+        hasher = new_hasher()
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            self._copy_file_buffered(fsrc, fdst, lambda count: None, hasher)
+        shutil.copystat(src, dst)
+        self._digests[dst] = hasher.hexdigest()
+    
+    def _run_file_jobs(self, entries: List[FileEntry], job: Callable[[FileEntry], Any]) -> Dict[str, Any]:
+        """Run job for every entry on the thread pool, reporting progress; returns results by rel_path"""
+        total_files = len(entries)
+        results = {}
+        if total_files == 0:
+            self.update_progress(100)
+            return results
+        
+        # Progress is weighted by bytes so a few large files do not stall the bar;
+        # folders of empty files fall back to counting files
+        total_bytes = sum(entry.size for entry in entries)
+        copied_files = 0
+        copied_bytes = 0
+        
+        # Workers only copy; progress is reported from this thread so the
+        # callback always sees an increasing, aggregate value
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, total_files)) as executor:
+            futures = {executor.submit(job, entry): entry for entry in entries}
+            try:
+                for future in as_completed(futures):
+                    entry = futures[future]
+                    results[entry.rel_path] = future.result()
                     copied_files += 1
-                    progress = min(100, (copied_files / total_files) * 100)
+                    copied_bytes += entry.size
+                    if total_bytes:
+                        progress = min(100, (copied_bytes / total_bytes) * 100)
+                    else:
+                        progress = min(100, (copied_files / total_files) * 100)
                     self.update_progress(progress)
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+        return results
+    
+    def create_snapshot(self, game_folder, snapshot_name, snapshot_folder,
+                        sources: List[Tuple[str, str]]) -> SourceManifest:
+        """
+        Store a deduplicated snapshot of sources, a list of (path, backup_mode) pairs,
+        and build its browsable view in snapshot_folder. Returns the sources' manifest.
+        """
+        try:
+            store = SnapshotStore(game_folder)
+            # Garbage collection waits until the new objects are in a written manifest
+            with store.lock():
+                previous = store.latest_manifest()
+                known = {record["path"]: record for record in previous.get("files", [])} if previous else {}
+            
+                manifest, source_paths = scan_sources(sources)
+                directories = manifest.directories
+                entries = manifest.files
             
-            copy_progress(src, dst)
+                # Files with the same size and mtime as in the previous snapshot are not read again
+                digests = {}
+                to_store = []
+                for entry in entries:
+                    record = known.get(entry.rel_path.replace(os.sep, "/"))
+                    if (record and record["size"] == entry.size and record["mtime_ns"] == entry.mtime_ns
+                            and store.has_object(record["hash"])):
+                        digests[entry.rel_path] = record["hash"]
+                    else:
+                        to_store.append(entry)
+                digests.update(self._run_file_jobs(to_store, lambda entry: store.store_file(source_paths[entry.rel_path])))
+                self._bytes_written += sum(entry.size for entry in to_store)
+            
+                store.write_manifest(snapshot_name, {
+                    "name": snapshot_name,
+                    "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "directories": [rel_dir.replace(os.sep, "/") for rel_dir in directories],
+                    "files": [
+                        {"path": entry.rel_path.replace(os.sep, "/"), "hash": digests[entry.rel_path],
+                         "size": entry.size, "mtime_ns": entry.mtime_ns, "mode": entry.mode}
+                        for entry in entries
+                    ]
+                })
+                self.log(f"Snapshot stored: {len(to_store)} files read, {len(entries) - len(to_store)} unchanged")
+            
+                try:
+                    copied = store.materialize(snapshot_name, snapshot_folder)
+                except Exception:
+                    # Without its folder the snapshot cannot be restored, so it is not kept
+                    store.delete_manifest(snapshot_name)
+                    raise
+                # The store hash is the checksum hash, so the view needs no extra read
+                for entry in entries:
+                    self._digests[os.path.join(snapshot_folder, entry.rel_path)] = digests[entry.rel_path]
+                if copied:
+                    self._bytes_written += sum(record["size"] for record in copied)
+                    self.log(f"Snapshot {snapshot_name}: {len(copied)} files could not be hardlinked "
+                             f"and were copied instead")
+            return manifest
             
         except Exception as e:
-            raise Exception(f"Copy operation failed: {str(e)}")
+            raise Exception(f"Snapshot operation failed: {str(e)}")
     
     def copy_file_with_progress(self, src, dst):
         """Copy single file with progress bar"""
         try:
-            # For single file, we'll show progress in chunks
             file_size = os.path.getsize(src)
-            chunk_size = 1024 * 1024  # 1MB chunks
-            copied_bytes = 0
+            report = self._byte_progress(file_size)
             
             with open(src, 'rb') as fsrc:
                 with open(dst, 'wb') as fdst:
-                    while True:
-                        chunk = fsrc.read(chunk_size)
-                        if not chunk:
-                            break
-                        fdst.write(chunk)
-                        copied_bytes += len(chunk)
-                        progress = min(100, (copied_bytes / file_size) * 100)
-                        self.update_progress(progress)
+                    if self._hash_files:
+                        # The data has to pass through Python to be hashed in the same read
+                        hasher = new_hasher()
+                        self._copy_file_buffered(fsrc, fdst, report, hasher)
+                        self._digests[dst] = hasher.hexdigest()
+                    # Let the kernel move the data when it can, then finish with a
+                    # buffered loop from wherever the fast path stopped
+                    elif not self._copy_file_kernel(fsrc, fdst, file_size, report):
+                        self._copy_file_buffered(fsrc, fdst, report)
+            # The file may have changed size since it was measured
+            self._bytes_written += os.path.getsize(dst)
+            
+            # Keep timestamps so incremental backups can detect unchanged files
+            shutil.copystat(src, dst)
             
             # Ensure progress reaches 100%
             self.update_progress(100)
@@ -144,9 +893,218 @@ class BackupManager:
         except Exception as e:
             raise Exception(f"File copy operation failed: {str(e)}")
     
+    def delta_copy_file(self, src, dst, signature_path) -> bool:
+        """
+        Update an existing backup file, rewriting only the blocks that changed.
+        The blocks are written to a copy of dst that then replaces it, so an
+        interrupted update leaves the old backup whole.
+        Returns False if dst cannot be updated this way and should be copied instead.
+        """
+        def update_copy(staged):
+            copied = 0 if clone_file(dst, staged) else os.path.getsize(staged)
+            result = delta_update(src, staged, signature_path, self._byte_progress(os.path.getsize(src)))
+            self._digests[staged] = result.digest
+            self._bytes_written += copied + result.bytes_written
+            return result
+        
+        try:
+            result = self.replace_with_copy(dst, update_copy)
+        except OSError as e:
+            logger.warning(f"Delta update of {dst} failed, copying the whole file: {e}")
+            return False
+        self.update_progress(100)
+        self.log(f"Delta backup: {result.bytes_written} bytes written, "
+                 f"{result.blocks_changed} of {result.block_count} blocks changed")
+        return True
+    
+    def _byte_progress(self, total_bytes) -> Callable[[int], None]:
+        """Return a callback that adds up copied bytes and reports whole-percent changes"""
+        copied_bytes = 0
+        reported = -1
+        
+        def report(count):
+            nonlocal copied_bytes, reported
+            copied_bytes += count
+            progress = min(100, int(copied_bytes * 100 / total_bytes)) if total_bytes else 100
+            if progress > reported:
+                reported = progress
+                self.update_progress(progress)
+        
+        return report
+    
+    def _copy_file_kernel(self, fsrc, fdst, expected, report: Callable[[int], None]) -> bool:
+        """
+        Copy with os.copy_file_range or os.sendfile (Linux) without passing the data
+        through Python, up to the end of fsrc even if it grew past expected bytes.
+        Returns False if neither is usable or the copy stopped short of expected;
+        the file positions then point at the first byte still to copy.
+        """
+        if not sys.platform.startswith("linux"):
+            return False
+        src_fd = fsrc.fileno()
+        dst_fd = fdst.fileno()
+        copied = 0
+        for copy_call in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+            if copy_call is None:
+                continue
+            try:
+                while True:
+                    if copy_call is os.sendfile:
+                        sent = os.sendfile(dst_fd, src_fd, None, KERNEL_COPY_CHUNK_SIZE)
+                    else:
+                        sent = copy_call(src_fd, dst_fd, KERNEL_COPY_CHUNK_SIZE)
+                    if sent == 0:
+                        break
+                    copied += sent
+                    report(sent)
+                # Some files (e.g. in /proc) report no data to these calls; the buffered
+                # loop reads whatever is left, which is nothing if the file shrank
+                return copied >= expected
+            except OSError as e:
+                if e.errno not in KERNEL_COPY_UNSUPPORTED:
+                    raise
+        return False
+    
+    def _copy_file_buffered(self, fsrc, fdst, report: Callable[[int], None], hasher=None) -> None:
+        """Copy the rest of fsrc to fdst through the thread's reused buffer, feeding hasher if given"""
+        view = getattr(self._thread_state, "copy_buffer", None)
+        if view is None:
+            view = self._thread_state.copy_buffer = memoryview(bytearray(FILE_COPY_BUFFER_SIZE))
+        while True:
+            count = fsrc.readinto(view)
+            if not count:
+                break
+            fdst.write(view[:count])
+            if hasher is not None:
+                hasher.update(view[:count])
+            report(count)
+    
+    def restore_backup(self, backup_folder, savegame_location) -> RestoreResult:
+        """
+        Restore savegame_location from a backup folder (one containing Readme.txt).
+        Only files that differ from the live copy are copied back, on the thread pool.
+        Live files that are overwritten or not part of the backup are first moved to a
+        safety folder, "Before Restore/<time>" in the game's backup folder.
+        """
+        self._progress.reset()
+        try:
+            item_name = self._item_name(savegame_location)
+            source = os.path.join(backup_folder, item_name)
+            if not os.path.exists(source):
+                if any(os.path.exists(source + extension) for extension in ARCHIVE_EXTENSIONS.values()):
+                    raise ValueError("Restoring from an archive backup is not supported, extract it first")
+                raise FileNotFoundError(f"Backup does not contain {item_name}: {backup_folder}")
+            try:
+                checksums = load_checksums(backup_folder)
+            except ValueError as e:
+                logger.warning(f"Restoring without checksums: {e}")
+                checksums = {}
+            
+            if os.path.isdir(source):
+                backup = scan_tree(source)
+                live_root = savegame_location
+                live = scan_tree(live_root) if os.path.isdir(live_root) else SourceManifest(live_root)
+                key_prefix = item_name + "/"
+                safety_root = item_name
+            else:
+                st = os.stat(source)
+                backup = SourceManifest(backup_folder)
+                backup.add_file(FileEntry(item_name, st.st_size, st.st_mtime_ns, st.st_mode))
+                live_root = os.path.dirname(savegame_location)
+                live = SourceManifest(live_root)
+                if os.path.isfile(savegame_location):
+                    st = os.stat(savegame_location)
+                    live.add_file(FileEntry(item_name, st.st_size, st.st_mtime_ns, st.st_mode))
+                source = backup_folder
+                key_prefix = ""
+                safety_root = ""
+            
+            # Safety copies go into the game folder, next to its timestamped snapshots
+            game_folder = backup_folder
+            try:
+                datetime.strptime(os.path.basename(backup_folder.rstrip("/\\")), SNAPSHOT_NAME_FORMAT)
+                game_folder = os.path.dirname(backup_folder.rstrip("/\\"))
+            except ValueError:
+                pass
+            safety_name = datetime.now().strftime(SNAPSHOT_NAME_FORMAT)
+            safety_folder = os.path.join(game_folder, SAFETY_FOLDER_NAME, safety_name)
+            suffix = 1
+            while os.path.exists(safety_folder):
+                suffix += 1
+                safety_folder = os.path.join(game_folder, SAFETY_FOLDER_NAME, f"{safety_name}_{suffix}")
+            live_files = {entry.rel_path: entry for entry in live.files}
+            
+            def keep_safety_copy(rel_path):
+                destination = os.path.join(safety_folder, safety_root, rel_path)
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                shutil.move(os.path.join(live_root, rel_path), destination)
+            
+            def restore_file(entry: FileEntry) -> str:
+                live_path = os.path.join(live_root, entry.rel_path)
+                current = live_files.get(entry.rel_path)
+                if current is not None and current.size == entry.size:
+                    if current.mtime_ns == entry.mtime_ns:
+                        return "unchanged"
+                    # Any other mtime, even within a filesystem tick, is settled by the checksum
+                    record = checksums.get((key_prefix + entry.rel_path).replace(os.sep, "/"))
+                    if record and hash_file(live_path) == record["hash"]:
+                        return "unchanged"
+                outcome = "restored"
+                if current is not None or os.path.isdir(live_path):
+                    keep_safety_copy(entry.rel_path)
+                    outcome = "replaced"
+                shutil.copy2(os.path.join(source, entry.rel_path), live_path)
+                return outcome
+            
+            # Files added since the backup are moved out of the way, not deleted
+            backup_paths = {entry.rel_path for entry in backup.files}
+            extra = [rel_path for rel_path in live_files if rel_path not in backup_paths]
+            for rel_path in extra:
+                keep_safety_copy(rel_path)
+            
+            backup_dirs = set(backup.directories)
+            for rel_dir in sorted(live.directories, reverse=True):
+                if rel_dir not in backup_dirs:
+                    try:
+                        os.rmdir(os.path.join(live_root, rel_dir))
+                    except OSError:
+                        pass
+            
+            os.makedirs(live_root, exist_ok=True)
+            for rel_dir in backup.directories:
+                live_dir = os.path.join(live_root, rel_dir)
+                if os.path.isfile(live_dir):
+                    keep_safety_copy(rel_dir)
+                os.makedirs(live_dir, exist_ok=True)
+            
+            outcomes = list(self._run_file_jobs(backup.files, restore_file).values())
+            self._progress.flush()
+            
+            replaced = outcomes.count("replaced")
+            result = RestoreResult(replaced + outcomes.count("restored"), outcomes.count("unchanged"),
+                                   len(extra), safety_folder if os.path.isdir(safety_folder) else None)
+            self.log(f"Restore finished: {result.restored} files restored, {result.unchanged} unchanged, "
+                     f"{result.removed} removed")
+            if result.safety_folder:
+                self.log(f"{replaced + len(extra)} replaced or removed files were kept in: {result.safety_folder}")
+            return result
+            
+        except Exception as e:
+            raise Exception(f"Restore failed: {str(e)}")
+    
+    def is_file_unchanged(self, src, dst):
+        """Check whether dst already holds the current copy of src (same size and mtime)"""
+        if not os.path.isfile(dst):
+            return False
+        src_stat = os.stat(src)
+        dst_stat = os.stat(dst)
+        return (src_stat.st_size == dst_stat.st_size
+                and mtimes_match(src_stat.st_mtime_ns, dst_stat.st_mtime_ns))
+    
     def create_credit_file(self, backup_base_folder, game_name, source_folder, 
-                          path_display_option, author, credit_note, backup_mode="Folder"):
-        """Create credit file with backup information"""
+                          path_display_option, author, credit_note, backup_mode="Folder",
+                          sources: Optional[List[Tuple[str, str]]] = None):
+        """Create credit file with backup information; sources lists every item of a multi-path backup"""
         credit_file_path = os.path.join(backup_base_folder, "Readme.txt")
         backup_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         separator = "=" * 60
@@ -158,6 +1116,9 @@ class BackupManager:
             "**********************************************************\n"
         )
         try:
+            # Never write through a hardlink that may be shared with other snapshots
+            if os.path.isfile(credit_file_path):
+                os.remove(credit_file_path)
             with open(credit_file_path, "w", encoding='utf-8') as credit_file:
                 credit_file.write(f"Backup savegame for {game_name}.\n")
                 credit_file.write(f"{separator}\n")
@@ -179,12 +1140,19 @@ class BackupManager:
                 credit_file.write(f"Update on:\n")
                 credit_file.write(f"{backup_time}\n")
                 credit_file.write(f"\n")
-                if backup_mode == "Folder":
-                    credit_file.write(f"Savegame Location:\n")
+                if sources:
+                    credit_file.write(f"Savegame Locations:\n")
+                    for path, mode in sources:
+                        masked_path = mask_game_path_in_savegame_location(path, path_display_option)
+                        credit_file.write(f"[{mode}] {masked_path}\n")
+                    credit_file.write(f"\n")
                 else:
-                    credit_file.write(f"Savegame File:\n")
-                masked_path = mask_game_path_in_savegame_location(source_folder, path_display_option)
-                credit_file.write(f"{masked_path}\n\n")
+                    if backup_mode == "Folder":
+                        credit_file.write(f"Savegame Location:\n")
+                    else:
+                        credit_file.write(f"Savegame File:\n")
+                    masked_path = mask_game_path_in_savegame_location(source_folder, path_display_option)
+                    credit_file.write(f"{masked_path}\n\n")
                 credit_file.write(additional_info)
             self.log(f"Credit file added: {credit_file_path}")
         except Exception as e:
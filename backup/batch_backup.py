@@ -0,0 +1,117 @@
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+from backup.backup_manager import BackupManager
+from utils.constants import BATCH_PARALLEL_GAMES, COPY_WORKERS
+from utils.logger import logger
+
+class BatchResult(NamedTuple):
+    """Outcome of backing up one game in a batch"""
+    game_id: str
+    game_title: str
+    success: bool
+    error: Optional[str] = None
+
+class BatchBackup:
+    """
+    Back up many games from the library with a bounded number running at once.
+
+    Games are queued as jobs for a thread pool. Progress and log events from the
+    jobs are passed back through a queue and delivered on the thread that calls
+    run(), so callbacks never run concurrently. A failing game is recorded and
+    the batch moves on.
+    """
+
+    def __init__(self, config_manager, game_ids: Optional[List[str]] = None,
+                 progress_callback: Optional[Callable[[str, float, float], None]] = None,
+                 log_callback: Optional[Callable[[str], None]] = None,
+                 max_parallel: int = BATCH_PARALLEL_GAMES):
+        self.config_manager = config_manager
+        self.game_ids = list(game_ids) if game_ids is not None else list(config_manager.config["games"])
+        self.progress_callback = progress_callback
+        self.log_callback = log_callback
+        self.max_parallel = max(1, max_parallel)
+
+    def log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+
+    def run(self) -> List[BatchResult]:
+        """Back up every selected game and return one result per game"""
+        preferences = self.config_manager.get_preferences()
+        author = self.config_manager.get_author()
+        jobs = []
+        for gid in self.game_ids:
+            game = self.config_manager.get_game_by_id(gid)
+            if game:
+                jobs.append(dict(game, id=gid))
+        if not jobs:
+            return []
+
+        events = queue.Queue()
+        game_progress: Dict[str, float] = {job["id"]: 0.0 for job in jobs}
+        titles = {job["id"]: job.get("game_title", job["id"]) for job in jobs}
+        results = []
+        # Split the copy threads between the games that run at the same time
+        copy_workers = max(1, COPY_WORKERS // min(self.max_parallel, len(jobs)))
+
+        self.log(f"Batch backup started for {len(jobs)} games")
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            for job in jobs:
+                executor.submit(self._run_job, job, preferences, author, copy_workers, events)
+
+            while len(results) < len(jobs):
+                kind, gid, payload = events.get()
+                if kind == "progress":
+                    game_progress[gid] = payload
+                    self._report_progress(gid, game_progress)
+                elif kind == "log":
+                    self.log(f"[{titles[gid]}] {payload}")
+                else:
+                    results.append(payload)
+                    game_progress[gid] = 100.0
+                    if payload.success:
+                        self.config_manager.update_backup_history(
+                            gid, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                        self.log(f"[{titles[gid]}] Backup finished")
+                    else:
+                        self.log(f"[{titles[gid]}] Backup failed: {payload.error}")
+                    self._report_progress(gid, game_progress)
+
+        failed = sum(1 for result in results if not result.success)
+        self.log(f"Batch backup finished: {len(results) - failed} succeeded, {failed} failed")
+        try:
+            self.config_manager.save_config()
+        except Exception as e:
+            logger.error(f"Could not save backup history after batch backup: {e}")
+        return results
+
+    def _report_progress(self, gid, game_progress: Dict[str, float]) -> None:
+        if self.progress_callback:
+            overall = sum(game_progress.values()) / len(game_progress)
+            self.progress_callback(gid, game_progress[gid], overall)
+
+    def _run_job(self, game, preferences, author, copy_workers, events: "queue.Queue") -> None:
+        gid = game["id"]
+        title = game.get("game_title", gid)
+        try:
+            savegame_location = game.get("savegame_location", "")
+            # add_game does not always record the mode, so go by what is on disk
+            backup_mode = "File" if os.path.isfile(savegame_location) else "Folder"
+            backup_manager = BackupManager(
+                self.config_manager,
+                progress_callback=lambda progress: events.put(("progress", gid, progress)),
+                log_callback=lambda message: events.put(("log", gid, message)),
+                max_workers=copy_workers
+            )
+            backup_manager.create_backup(
+                title, savegame_location, game.get("backup_location", ""),
+                preferences.get("timestamp_option", "Disable"), preferences.get("path_display", "Auto"),
+                author, "", backup_mode
+            )
+            events.put(("done", gid, BatchResult(gid, title, True)))
+        except Exception as e:
+            logger.error(f"Batch backup failed for {title}: {e}")
+            events.put(("done", gid, BatchResult(gid, title, False, str(e))))
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import zlib
+from typing import Callable, List, NamedTuple, Optional
+from utils.logger import logger
+from backup.integrity import new_hasher
+
+DELTA_BLOCK_SIZE = 1024 * 1024
+DELTA_MIN_FILE_SIZE = 16 * 1024 * 1024  # Smaller files are simply copied again
+STRONG_DIGEST_SIZE = 16
+FICLONE = 0x40049409  # Linux ioctl that makes a copy sharing the data blocks of its source
+
+class DeltaResult(NamedTuple):
+    """What a delta update changed in the backup copy"""
+    bytes_written: int
+    blocks_changed: int
+    block_count: int
+    digest: str
+
+def _strong_hash(block: bytes) -> str:
+    return hashlib.blake2b(block, digest_size=STRONG_DIGEST_SIZE).hexdigest()
+
+def file_signature(path: str, block_size: int = DELTA_BLOCK_SIZE) -> List[List]:
+    """Return [weak, strong] checksums for each block of a file"""
+    blocks = []
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            blocks.append([zlib.adler32(block), _strong_hash(block)])
+    return blocks
+
+def load_signature(signature_path: str, dst: str, block_size: int) -> Optional[List[List]]:
+    """Return the stored signature of dst, or None if it is missing or dst has changed since"""
+    try:
+        with open(signature_path, "r", encoding="utf-8") as f:
+            signature = json.load(f)
+        st = os.stat(dst)
+        if (signature["block_size"] == block_size and signature["size"] == st.st_size
+                and signature["mtime_ns"] == st.st_mtime_ns):
+            return signature["blocks"]
+    except (OSError, ValueError, KeyError) as e:
+        logger.debug(f"Block signature not usable for {dst}: {e}")
+    return None
+
+def save_signature(signature_path: str, dst: str, block_size: int, blocks: List[List]) -> None:
+    st = os.stat(dst)
+    os.makedirs(os.path.dirname(signature_path), exist_ok=True)
+    temp_path = f"{signature_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"block_size": block_size, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                   "blocks": blocks}, f, separators=(",", ":"))
+    os.replace(temp_path, signature_path)
+
+def clone_file(src: str, dst: str) -> bool:
+    """
+    Copy src to dst with its metadata. Where the filesystem supports it (Btrfs,
+    XFS) the copy shares the data blocks of src, so only blocks that are written
+    to later take space. Returns True if it did, False if the data was copied.
+    """
+    if sys.platform.startswith("linux"):
+        import fcntl
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return True
+        except OSError as e:
+            logger.debug(f"Cannot clone {src}, copying it: {e}")
+    shutil.copy2(src, dst)
+    return False
+
+def delta_update(src: str, dst: str, signature_path: str, report: Callable[[int], None],
+                 block_size: int = DELTA_BLOCK_SIZE) -> DeltaResult:
+    """
+    Bring the existing copy dst up to date with src by rewriting only the blocks that differ.
+
+    Blocks are compared at the same offsets by their weak and strong checksums.
+    The block signature of dst is kept at signature_path so the next run only
+    has to read src, not the backup copy as well.
+    """
+    old_blocks = load_signature(signature_path, dst, block_size)
+    if old_blocks is None:
+        old_blocks = file_signature(dst, block_size)
+
+    new_blocks = []
+    bytes_written = 0
+    blocks_changed = 0
+    # Whole-file hash for the checksum manifest, taken from the same reads
+    hasher = new_hasher()
+    with open(src, "rb") as fsrc, open(dst, "r+b") as fdst:
+        index = 0
+        while True:
+            block = fsrc.read(block_size)
+            if not block:
+                break
+            weak = zlib.adler32(block)
+            strong = _strong_hash(block)
+            old = old_blocks[index] if index < len(old_blocks) else None
+            if old is None or old[0] != weak or old[1] != strong:
+                fdst.seek(index * block_size)
+                fdst.write(block)
+                bytes_written += len(block)
+                blocks_changed += 1
+            new_blocks.append([weak, strong])
+            hasher.update(block)
+            report(len(block))
+            index += 1
+        fdst.truncate(fsrc.tell())
+
+    shutil.copystat(src, dst)
+    save_signature(signature_path, dst, block_size, new_blocks)
+    return DeltaResult(bytes_written, blocks_changed, len(new_blocks), hasher.hexdigest())
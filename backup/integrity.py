@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple
+from backup.snapshot_store import STORE_DIR_NAME
+
+CHECKSUM_FILE_NAME = "Checksums.json"
+HASH_ALGORITHM = "blake2b-256"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+class VerifyResult(NamedTuple):
+    """Outcome of verifying one backup folder against its checksum manifest"""
+    folder: str
+    checked: int
+    missing: List[str]
+    corrupt: List[str]
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.corrupt
+
+def new_hasher():
+    # Same hash as the snapshot store, so digests can be shared
+    return hashlib.blake2b(digest_size=32)
+
+def hash_file(path: str) -> str:
+    hasher = new_hasher()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def load_checksums(folder: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the checksum records of a backup folder by relative path ('/' separated).
+    Returns an empty dict if the folder has no manifest; raises ValueError if it is unreadable.
+    """
+    try:
+        with open(os.path.join(folder, CHECKSUM_FILE_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if manifest.get("algorithm") != HASH_ALGORITHM or not isinstance(manifest.get("files"), dict):
+        raise ValueError(f"Unsupported checksum manifest in {folder}")
+    return manifest["files"]
+
+def write_checksums(folder: str, files: Dict[str, Dict[str, Any]]) -> None:
+    manifest_path = os.path.join(folder, CHECKSUM_FILE_NAME)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "algorithm": HASH_ALGORITHM,
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "files": files
+        }, f, indent=1)
+    os.replace(temp_path, manifest_path)
+
+def remove_checksums(folder: str) -> None:
+    manifest_path = os.path.join(folder, CHECKSUM_FILE_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+def find_checksum_folders(root: str) -> List[str]:
+    """Return every folder under root (root included) that has a checksum manifest"""
+    folders = []
+    for folder, dirnames, filenames in os.walk(root):
+        # Store internals and staged or replaced copies are not backups themselves
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith(STORE_DIR_NAME))
+        if CHECKSUM_FILE_NAME in filenames:
+            folders.append(folder)
+    return folders
@@ -0,0 +1,53 @@
+import threading
+import time
+from typing import Callable, Optional
+from utils.constants import PROGRESS_UPDATE_INTERVAL
+
+class ProgressThrottle:
+    """
+    Forward progress values to a callback at a bounded rate.
+
+    A value is passed on when it moves to a new whole percent and at least
+    min_interval seconds have gone by since the last one. 100% and values that
+    go backwards (a new phase) are always passed on. Anything held back is
+    delivered by flush(), so the callback always ends on the latest value.
+    """
+
+    def __init__(self, callback: Optional[Callable[[float], None]],
+                 min_interval: float = PROGRESS_UPDATE_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Start over for a new operation"""
+        self.sent = None
+        self.sent_at = float("-inf")
+        self.pending = None
+
+    def update(self, progress: float) -> None:
+        if not self.callback:
+            return
+        with self.lock:
+            now = self.clock()
+            if (self.sent is None or progress >= 100 or progress < self.sent
+                    or (int(progress) != int(self.sent) and now - self.sent_at >= self.min_interval)):
+                self._send(progress, now)
+            else:
+                self.pending = progress
+
+    def flush(self) -> None:
+        """Deliver the value held back, if any"""
+        with self.lock:
+            if self.pending is not None and self.pending != self.sent:
+                self._send(self.pending, self.clock())
+            self.pending = None
+
+    def _send(self, progress: float, now: float) -> None:
+        self.sent = progress
+        self.sent_at = now
+        self.pending = None
+        self.callback(progress)
@@ -0,0 +1,145 @@
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+from utils.constants import SNAPSHOT_NAME_FORMAT
+from utils.logger import logger
+from backup.snapshot_store import STORE_DIR_NAME
+
+SIZE_CACHE_NAME = "snapshot_sizes.json"
+
+class RetentionPolicy(NamedTuple):
+    """
+    Which timestamped snapshots of a game to keep; 0 turns a rule off.
+    A snapshot is kept if any count rule keeps it, then the oldest are
+    dropped until the total fits max_size_mb. The newest is always kept.
+    The total is disk usage: files shared by hardlinked or deduplicated
+    snapshots count once.
+    """
+    keep_last: int = 0
+    keep_daily: int = 0
+    keep_weekly: int = 0
+    max_size_mb: int = 0
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> "RetentionPolicy":
+        return cls(*(max(0, int(values.get(field, 0) or 0)) for field in cls._fields))
+
+    @property
+    def enabled(self) -> bool:
+        return any(self)
+
+def select_snapshots_to_prune(names: List[str], sizes: Dict[str, int], policy: RetentionPolicy,
+                              contents: Optional[Dict[str, Dict[Any, int]]] = None) -> List[str]:
+    """
+    Return the snapshot names the policy removes, oldest first. sizes holds
+    the size of each snapshot. For snapshots that share files, pass contents
+    instead: the size of each file of a snapshot, keyed by what identifies it
+    across snapshots (an inode or a store hash), so shared files are counted once.
+    """
+    if not names or not policy.enabled:
+        return []
+    newest_first = sorted(names, reverse=True)
+    keep = {newest_first[0]}
+    if policy.keep_last or policy.keep_daily or policy.keep_weekly:
+        keep.update(newest_first[:policy.keep_last])
+        # Newest snapshot of each of the last N days (weeks) that have snapshots
+        for count, period in ((policy.keep_daily, lambda moment: moment.date()),
+                              (policy.keep_weekly, lambda moment: moment.isocalendar()[:2])):
+            periods = set()
+            for name in newest_first:
+                if len(periods) >= count:
+                    break
+                key = period(datetime.strptime(name, SNAPSHOT_NAME_FORMAT))
+                if key not in periods:
+                    periods.add(key)
+                    keep.add(name)
+    else:
+        # Only a size limit is set
+        keep.update(names)
+
+    prune = [name for name in sorted(names) if name not in keep]
+    if policy.max_size_mb:
+        limit = policy.max_size_mb * 1024 * 1024
+        if contents is None:
+            total = sum(sizes.get(name, 0) for name in keep)
+
+            def release(name):
+                return sizes.get(name, 0)
+        else:
+            # A shared file is only freed with the last kept snapshot that has it
+            references = Counter()
+            file_sizes = {}
+            for name in keep:
+                for key, size in contents.get(name, {}).items():
+                    references[key] += 1
+                    file_sizes[key] = size
+            total = sum(file_sizes.values())
+
+            def release(name):
+                freed = 0
+                for key in contents.get(name, {}):
+                    references[key] -= 1
+                    if not references[key]:
+                        freed += file_sizes[key]
+                return freed
+        for name in sorted(keep):
+            if total <= limit or name == newest_first[0]:
+                break
+            prune.append(name)
+            total -= release(name)
+    return sorted(prune)
+
+def snapshot_contents(folder: str) -> Dict[str, int]:
+    """
+    Size of each file in a snapshot folder by inode, so hardlinks to one file
+    match. All snapshots of a game are on one drive, and the device number of
+    a removable drive can change between mounts, so it is left out.
+    """
+    contents = {}
+    pending = [folder]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    # DirEntry.stat() leaves st_ino zero on Windows
+                    st = os.stat(entry.path) if os.name == 'nt' else entry.stat(follow_symlinks=False)
+                    contents[str(st.st_ino)] = st.st_size
+    return contents
+
+def manifest_contents(manifest: Dict[str, Any]) -> Dict[str, int]:
+    """Size of each object a snapshot store manifest refers to, by hash"""
+    # A hash is 64 hex digits, so it never equals an inode number from snapshot_contents
+    return {record["hash"]: record["size"] for record in manifest.get("files", [])}
+
+class SnapshotSizeCache:
+    """
+    The contents of each timestamped snapshot of a game, as snapshot_contents
+    or manifest_contents return them, kept in the store folder so only new
+    snapshots have to be measured
+    """
+
+    def __init__(self, game_folder: str):
+        self.path = os.path.join(game_folder, STORE_DIR_NAME, SIZE_CACHE_NAME)
+        self.contents: Dict[str, Dict[str, int]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("not a JSON object")
+            # Entries in any other form are measured again
+            self.contents = {name: files for name, files in data.items() if isinstance(files, dict)}
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.warning(f"Rebuilding snapshot size cache {self.path}: {e}")
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.contents, f, separators=(",", ":"))
+        os.replace(temp_path, self.path)
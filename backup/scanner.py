@@ -0,0 +1,101 @@
+import os
+import stat
+from typing import Dict, List, NamedTuple, Tuple
+from utils.constants import MTIME_GRANULARITIES_NS
+
+class FileEntry(NamedTuple):
+    """A file found while scanning a source folder"""
+    rel_path: str
+    size: int
+    mtime_ns: int
+    mode: int
+
+class SourceManifest:
+    """Directories and files of a folder collected in a single scan"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.directories: List[str] = []
+        self.files: List[FileEntry] = []
+        self.total_size = 0
+
+    @property
+    def file_count(self) -> int:
+        return len(self.files)
+
+    def add_file(self, entry: FileEntry) -> None:
+        self.files.append(entry)
+        self.total_size += entry.size
+
+def mtimes_match(source_mtime_ns: int, backup_mtime_ns: int) -> bool:
+    """
+    Whether a backed-up file's mtime is the one copied from the source. The
+    times must be equal, unless the backup time lies on a boundary of a coarser
+    filesystem clock (FAT, NTFS) and is less than one tick away from the source.
+    """
+    if source_mtime_ns == backup_mtime_ns:
+        return True
+    for granularity in MTIME_GRANULARITIES_NS:
+        if backup_mtime_ns % granularity == 0 and abs(source_mtime_ns - backup_mtime_ns) < granularity:
+            return True
+    return False
+
+def scan_tree(root: str) -> SourceManifest:
+    """
+    Scan a folder once with os.scandir and return its manifest.
+
+    The walk is iterative so deep save trees cannot hit the recursion limit.
+    Symlinked folders are followed once per target so link loops end.
+    """
+    manifest = SourceManifest(root)
+    visited_links = set()
+    pending = [""]
+
+    while pending:
+        rel_dir = pending.pop()
+        current = os.path.join(root, rel_dir) if rel_dir else root
+        with os.scandir(current) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                # DirEntry caches stat data; only symlinks need an extra call
+                st = entry.stat()
+                if stat.S_ISDIR(st.st_mode):
+                    if entry.is_symlink():
+                        # Cached DirEntry stats have no inode on Windows, so ask os.stat
+                        target = os.stat(entry.path)
+                        key = (target.st_dev, target.st_ino)
+                        if key in visited_links:
+                            continue
+                        visited_links.add(key)
+                    manifest.directories.append(rel_path)
+                    pending.append(rel_path)
+                else:
+                    manifest.add_file(FileEntry(rel_path, st.st_size, st.st_mtime_ns, st.st_mode))
+
+    return manifest
+
+def scan_sources(sources: List[Tuple[str, str]]) -> Tuple[SourceManifest, Dict[str, str]]:
+    """
+    Scan a list of (path, backup_mode) pairs into one manifest.
+
+    Folders appear under their own name and files by their file name, as they
+    do inside a backup folder. Also returns the source path of every file.
+    """
+    combined = SourceManifest("")
+    source_paths = {}
+    for path, mode in sources:
+        if mode == "Folder":
+            folder_name = os.path.basename(path.rstrip("/\\"))
+            manifest = scan_tree(path)
+            combined.directories.append(folder_name)
+            combined.directories.extend(os.path.join(folder_name, rel_dir) for rel_dir in manifest.directories)
+            for entry in manifest.files:
+                rel_path = os.path.join(folder_name, entry.rel_path)
+                source_paths[rel_path] = os.path.join(path, entry.rel_path)
+                combined.add_file(entry._replace(rel_path=rel_path))
+        else:
+            st = os.stat(path)
+            rel_path = os.path.basename(path)
+            source_paths[rel_path] = path
+            combined.add_file(FileEntry(rel_path, st.st_size, st.st_mtime_ns, st.st_mode))
+    return combined, source_paths
@@ -0,0 +1,208 @@
+import errno
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Set
+from utils.logger import logger
+from utils.exceptions import BackupError
+
+STORE_DIR_NAME = ".sweet-progress"
+HASH_CHUNK_SIZE = 1024 * 1024
+LOCK_FILE_NAME = "lock"
+TEMP_OBJECT_MIN_AGE = 3600  # Seconds before an unfinished temp object counts as left over
+# Windows error code for exceeding the NTFS limit of 1023 links per file
+ERROR_TOO_MANY_LINKS = 1142
+
+def link_limit_reached(e: OSError) -> bool:
+    """True if a failed os.link only hit the link limit of that one file"""
+    return e.errno == errno.EMLINK or getattr(e, "winerror", None) == ERROR_TOO_MANY_LINKS
+
+# One lock per store folder for the threads of this process; the lock file covers other processes
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+def _thread_lock(store_dir: str) -> threading.Lock:
+    key = os.path.normcase(os.path.abspath(store_dir))
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(key, threading.Lock())
+
+def _lock_file(f) -> None:
+    if os.name == 'nt':
+        import msvcrt
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue  # LK_LOCK gives up after about 10 seconds; keep waiting
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+class SnapshotStore:
+    """
+    Content-addressed storage for the timestamped backups of one game.
+
+    File contents are stored once under objects/, keyed by their BLAKE2b hash.
+    Each snapshot is a small JSON manifest in snapshots/ that maps the paths of
+    the snapshot to those objects. The timestamped folder users browse is built
+    from hardlinks to the objects, so it takes no extra space; editing a file
+    in that folder therefore changes every snapshot that shares it. Where a
+    link cannot be made the object is copied into the folder instead.
+
+    Writing a snapshot and collecting garbage both hold lock(), so objects
+    stored for a snapshot whose manifest is not written yet are never collected.
+    """
+
+    def __init__(self, game_folder: str):
+        self.game_folder = game_folder
+        self.store_dir = os.path.join(game_folder, STORE_DIR_NAME)
+        self.objects_dir = os.path.join(self.store_dir, "objects")
+        self.snapshots_dir = os.path.join(self.store_dir, "snapshots")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+
+    @contextmanager
+    def lock(self):
+        """Hold the store exclusively, against other threads and other processes"""
+        with _thread_lock(self.store_dir):
+            # Closing the file releases the OS lock
+            with open(os.path.join(self.store_dir, LOCK_FILE_NAME), "a+b") as f:
+                _lock_file(f)
+                yield
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def has_object(self, digest: str) -> bool:
+        return os.path.isfile(self.object_path(digest))
+
+    def store_file(self, path: str) -> str:
+        """Store a file's contents and return its hash; the file is read only once"""
+        temp_path = os.path.join(self.objects_dir, f"tmp-{uuid.uuid4().hex}")
+        hasher = hashlib.blake2b(digest_size=32)
+        try:
+            with open(path, "rb") as fsrc, open(temp_path, "wb") as fdst:
+                while True:
+                    chunk = fsrc.read(HASH_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    fdst.write(chunk)
+            digest = hasher.hexdigest()
+            object_path = self.object_path(digest)
+            if os.path.exists(object_path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                shutil.copystat(path, temp_path)
+                os.replace(temp_path, object_path)
+            return digest
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def list_snapshots(self) -> List[str]:
+        """Return snapshot names, oldest first"""
+        names = [name[:-5] for name in os.listdir(self.snapshots_dir) if name.endswith(".json")]
+        return sorted(names)
+
+    def load_manifest(self, name: str) -> Dict[str, Any]:
+        manifest_path = os.path.join(self.snapshots_dir, f"{name}.json")
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise BackupError(f"Snapshot not found: {name}")
+
+    def latest_manifest(self) -> Optional[Dict[str, Any]]:
+        snapshots = self.list_snapshots()
+        if not snapshots:
+            return None
+        try:
+            return self.load_manifest(snapshots[-1])
+        except (BackupError, ValueError) as e:
+            logger.warning(f"Could not read latest snapshot manifest: {e}")
+            return None
+
+    def write_manifest(self, name: str, manifest: Dict[str, Any]) -> None:
+        manifest_path = os.path.join(self.snapshots_dir, f"{name}.json")
+        temp_path = f"{manifest_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(temp_path, manifest_path)
+
+    def delete_manifest(self, name: str) -> None:
+        manifest_path = os.path.join(self.snapshots_dir, f"{name}.json")
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+    def materialize(self, name: str, target: str) -> List[Dict[str, Any]]:
+        """
+        Build the browsable folder of a snapshot from hardlinks to its objects.
+        Objects that cannot be linked, because the drive has no hardlinks or an
+        object is at its link limit, are copied, so the folder is always complete.
+        Returns the manifest records of the copied files. If the folder cannot
+        be completed it is removed; a missing object raises BackupError.
+        """
+        manifest = self.load_manifest(name)
+        links_supported = True
+        copied = []
+        try:
+            for rel_dir in manifest.get("directories", []):
+                os.makedirs(os.path.join(target, rel_dir), exist_ok=True)
+            for record in manifest.get("files", []):
+                destination = os.path.join(target, record["path"])
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                object_path = self.object_path(record["hash"])
+                if not os.path.isfile(object_path):
+                    raise BackupError(f"Snapshot {name} refers to a missing object: {record['path']}")
+                if links_supported:
+                    try:
+                        os.link(object_path, destination)
+                        continue
+                    except OSError as e:
+                        if not link_limit_reached(e):
+                            logger.warning(f"Hardlinks not available for snapshot {name}: {e}")
+                            links_supported = False
+                shutil.copy2(object_path, destination)
+                copied.append(record)
+        except Exception:
+            # A partial folder would restore as a snapshot that lost files
+            shutil.rmtree(target, ignore_errors=True)
+            raise
+        return copied
+
+    def referenced_objects(self) -> Set[str]:
+        digests = set()
+        for name in self.list_snapshots():
+            for record in self.load_manifest(name).get("files", []):
+                digests.add(record["hash"])
+        return digests
+
+    def collect_garbage(self) -> int:
+        """Delete objects no snapshot refers to and return how many were removed"""
+        with self.lock():
+            referenced = self.referenced_objects()
+            removed = 0
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                if not os.path.isdir(prefix_dir):
+                    # Leftover temp file from an interrupted store_file. A writer that
+                    # ignores the lock could still be filling a recent one, so keep those.
+                    if (prefix.startswith("tmp-")
+                            and time.time() - os.path.getmtime(prefix_dir) > TEMP_OBJECT_MIN_AGE):
+                        os.remove(prefix_dir)
+                    continue
+                for rest in os.listdir(prefix_dir):
+                    if prefix + rest not in referenced:
+                        os.remove(os.path.join(prefix_dir, rest))
+                        removed += 1
+            return removed
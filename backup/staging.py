@@ -0,0 +1,145 @@
+import os
+import queue
+import shutil
+import sys
+import threading
+from typing import Callable
+from utils.logger import logger
+
+# Staged copies and replaced backups live next to the backup under these prefixes
+STAGING_PREFIX = ".sweet-progress-new-"
+REPLACED_PREFIX = ".sweet-progress-old-"
+BACKGROUND_NICENESS = 10
+
+class BackgroundDeleter:
+    """
+    Delete replaced backups one at a time on a low-priority daemon thread.
+    Other cleanup work can be queued behind the deletions with submit().
+
+    Anything still queued when the program exits is left on disk under the
+    REPLACED_PREFIX name and removed by clear_leftovers on the next backup.
+    """
+
+    def __init__(self):
+        self.paths = queue.Queue()
+        self.lock = threading.Lock()
+        self.queued = set()
+        self.thread = None
+
+    def delete(self, path: str) -> None:
+        with self.lock:
+            if path in self.queued:
+                return
+            self.queued.add(path)
+        self._put(path)
+
+    def submit(self, task: Callable[[], object]) -> None:
+        """Run task on the cleanup thread after everything queued before it"""
+        self._put(task)
+
+    def _put(self, item) -> None:
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="backup-cleanup", daemon=True)
+                self.thread.start()
+        self.paths.put(item)
+
+    def wait(self) -> None:
+        """Block until every queued deletion has finished"""
+        self.paths.join()
+
+    def _run(self) -> None:
+        self._lower_priority()
+        while True:
+            item = self.paths.get()
+            try:
+                if callable(item):
+                    item()
+                elif os.path.isdir(item) and not os.path.islink(item):
+                    shutil.rmtree(item)
+                elif os.path.lexists(item):
+                    os.remove(item)
+            except Exception as e:
+                logger.warning(f"Background cleanup of {item} failed: {e}")
+            finally:
+                if not callable(item):
+                    with self.lock:
+                        self.queued.discard(item)
+                self.paths.task_done()
+
+    def _lower_priority(self) -> None:
+        # On Linux the priority of a single thread can be changed through its thread id
+        if sys.platform.startswith("linux") and hasattr(threading, "get_native_id"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), BACKGROUND_NICENESS)
+            except OSError:
+                pass
+
+background_deleter = BackgroundDeleter()
+
+def staging_path(destination: str) -> str:
+    """Path a new copy of destination is written to before it replaces destination"""
+    parent, name = os.path.split(destination)
+    return os.path.join(parent, STAGING_PREFIX + name)
+
+def _replaced_path(path: str) -> str:
+    """Unique name next to path that a replaced backup is renamed to before it is deleted"""
+    import uuid
+    parent, name = os.path.split(path)
+    return os.path.join(parent, f"{REPLACED_PREFIX}{uuid.uuid4().hex[:8]}-{name}")
+
+def clear_leftovers(destination: str, deleter: BackgroundDeleter = background_deleter) -> None:
+    """Remove a staged copy or replaced backup of destination left by an interrupted run"""
+    parent, name = os.path.split(destination)
+    if not os.path.isdir(parent):
+        return
+    with os.scandir(parent) as entries:
+        for entry in entries:
+            if entry.name == STAGING_PREFIX + name:
+                # Stale staging is removed right away; the new copy is written there next
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+            elif entry.name.startswith(REPLACED_PREFIX) and entry.name.endswith("-" + name):
+                deleter.delete(entry.path)
+
+def move_aside(path: str, deleter: BackgroundDeleter = background_deleter) -> None:
+    """Rename path out of the way right away and delete it in the background"""
+    replaced = _replaced_path(path)
+    os.replace(path, replaced)
+    deleter.delete(replaced)
+
+def clear_replaced(folder: str, deleter: BackgroundDeleter = background_deleter) -> None:
+    """Queue every replaced backup left in folder by an interrupted run for deletion"""
+    if not os.path.isdir(folder):
+        return
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.startswith(REPLACED_PREFIX):
+                deleter.delete(entry.path)
+
+def swap_into_place(staged: str, destination: str, deleter: BackgroundDeleter = background_deleter) -> bool:
+    """
+    Move a finished copy from staged to destination.
+
+    A file replaces a file atomically. Otherwise the old backup is first
+    renamed aside and queued for deletion, so there is always one complete
+    backup on disk. Returns True when an old backup was replaced.
+    """
+    if not os.path.lexists(destination):
+        os.replace(staged, destination)
+        return False
+    if os.path.isfile(staged) and os.path.isfile(destination) and not os.path.islink(destination):
+        os.replace(staged, destination)
+        return True
+
+    replaced = _replaced_path(destination)
+    os.replace(destination, replaced)
+    try:
+        os.replace(staged, destination)
+    except OSError:
+        os.replace(replaced, destination)
+        raise
+    deleter.delete(replaced)
+    return True
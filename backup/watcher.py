@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from backup.backup_manager import BackupManager
+from utils.constants import AUTO_BACKUP_DEBOUNCE_SECONDS
+from utils.logger import logger
+
+WATCH_TICK_SECONDS = 1.0
+WATCH_POLL_INTERVAL = 5.0  # Seconds between checks of a game that changed recently
+WATCH_MAX_POLL_INTERVAL = 60.0  # Idle games are checked less and less often, up to this
+WATCH_FULL_SCAN_INTERVAL = 300.0  # Seconds between full re-indexes of a save folder
+WATCH_HOT_FILES = 16  # Recently changed files that are stat'ed on every check
+
+class GameWatch:
+    """
+    Change index of one savegame location.
+
+    A full scan records the mtime of every directory and the size and mtime of
+    every file. Quick checks between full scans only stat the directories and
+    the few files that changed most recently, which catches saves written by
+    replacing files as well as saves rewritten in place.
+    """
+
+    def __init__(self, game_id: str, path: str):
+        self.game_id = game_id
+        self.path = path
+        self.dirs: Dict[str, int] = {}
+        self.files: Dict[str, Tuple[int, int]] = {}
+        self.hot: List[str] = []
+        self.indexed = False
+        self.next_check = 0.0
+        self.next_full_scan = 0.0
+        self.interval = WATCH_POLL_INTERVAL
+        self.changed_at: Optional[float] = None
+
+    def full_scan(self) -> bool:
+        """Re-index the save location; returns True if anything changed since the last index"""
+        dirs: Dict[str, int] = {}
+        files: Dict[str, Tuple[int, int]] = {}
+        if os.path.isfile(self.path):
+            st = os.stat(self.path)
+            files[self.path] = (st.st_size, st.st_mtime_ns)
+        elif os.path.isdir(self.path):
+            pending = [self.path]
+            while pending:
+                current = pending.pop()
+                try:
+                    dirs[current] = os.stat(current).st_mtime_ns
+                    with os.scandir(current) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif entry.is_file():
+                                st = entry.stat()
+                                files[entry.path] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    # Files can disappear while a game is saving; the next check sees the result
+                    continue
+
+        changed_files = [path for path, state in files.items() if self.files.get(path) != state]
+        changed = self.indexed and (dirs != self.dirs or bool(changed_files) or len(files) != len(self.files))
+        if changed_files or not self.indexed:
+            # Files that changed last are the ones most likely to change again
+            newest = sorted(files, key=lambda path: files[path][1], reverse=True)
+            self.hot = (changed_files + [path for path in newest if path not in changed_files])[:WATCH_HOT_FILES]
+        self.dirs = dirs
+        self.files = files
+        self.indexed = True
+        return changed
+
+    def quick_check(self) -> bool:
+        """Stat only the directories and hot files; returns True if any of them changed"""
+        for path, mtime_ns in self.dirs.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime_ns:
+                    return True
+            except OSError:
+                return True
+        for path in self.hot:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return True
+            if (st.st_size, st.st_mtime_ns) != self.files.get(path):
+                return True
+        return False
+
+class SaveWatcher:
+    """
+    Watch the savegame location of every configured game and run an incremental
+    backup once a game's save has stopped changing for debounce_seconds
+    (the auto_backup_debounce_seconds preference by default).
+
+    Backups run one at a time on the watcher thread and are recorded in the
+    backup history through the ConfigManager.
+    """
+
+    def __init__(self, config_manager, debounce_seconds: Optional[float] = None,
+                 log_callback: Optional[Callable[[str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.config_manager = config_manager
+        if debounce_seconds is None:
+            debounce_seconds = config_manager.get_preferences().get(
+                "auto_backup_debounce_seconds", AUTO_BACKUP_DEBOUNCE_SECONDS)
+        self.debounce_seconds = debounce_seconds
+        self.log_callback = log_callback
+        self.clock = clock
+        self.watches: Dict[str, GameWatch] = {}
+        self.stop_event = threading.Event()
+
+    def log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+
+    def run(self) -> None:
+        """Watch until stop() is called"""
+        self.log(f"Watching {len(self.config_manager.config['games'])} games for save changes")
+        while not self.stop_event.is_set():
+            self.poll()
+            self.stop_event.wait(WATCH_TICK_SECONDS)
+        self.log("Stopped watching for save changes")
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def poll(self) -> List[str]:
+        """Check every game that is due and back up the settled ones; returns the ids backed up"""
+        self._sync_games()
+        backed_up = []
+        for watch in list(self.watches.values()):
+            if self.stop_event.is_set():
+                break
+            now = self.clock()
+            if now < watch.next_check:
+                continue
+            if not os.path.exists(watch.path):
+                watch.next_check = now + WATCH_MAX_POLL_INTERVAL
+                continue
+
+            if not watch.indexed or now >= watch.next_full_scan or watch.quick_check():
+                changed = watch.full_scan()
+                watch.next_full_scan = now + WATCH_FULL_SCAN_INTERVAL
+            else:
+                changed = False
+
+            if changed:
+                watch.changed_at = now
+                watch.interval = WATCH_POLL_INTERVAL
+            elif watch.changed_at is None:
+                watch.interval = min(watch.interval * 2, WATCH_MAX_POLL_INTERVAL)
+
+            if watch.changed_at is not None and now - watch.changed_at >= self.debounce_seconds:
+                watch.changed_at = None
+                if self.backup_game(watch.game_id):
+                    backed_up.append(watch.game_id)
+            # A game waiting for its save to settle is checked at the fast rate
+            watch.next_check = now + (WATCH_POLL_INTERVAL if watch.changed_at is not None else watch.interval)
+        return backed_up
+
+    def _sync_games(self) -> None:
+        """Follow games being added, removed or moved in the config"""
+        games = self.config_manager.config["games"]
+        for gid in list(self.watches):
+            if gid not in games:
+                del self.watches[gid]
+        for gid, game in games.items():
+            path = game.get("savegame_location", "")
+            if not path:
+                continue
+            watch = self.watches.get(gid)
+            if watch is None or watch.path != path:
+                self.watches[gid] = GameWatch(gid, path)
+
+    def backup_game(self, game_id: str) -> bool:
+        game = self.config_manager.get_game_by_id(game_id)
+        if not game:
+            return False
+        title = game.get("game_title", game_id)
+        savegame_location = game.get("savegame_location", "")
+        preferences = self.config_manager.get_preferences()
+        try:
+            backup_mode = "File" if os.path.isfile(savegame_location) else "Folder"
+            backup_manager = BackupManager(
+                self.config_manager,
+                log_callback=lambda message: self.log(f"[{title}] {message}")
+            )
+            self.log(f"[{title}] Save changed, starting backup")
+            backup_manager.create_backup(
+                title, savegame_location, game.get("backup_location", ""),
+                preferences.get("timestamp_option", "Disable"), preferences.get("path_display", "Auto"),
+                self.config_manager.get_author(), "", backup_mode, incremental=True
+            )
+            self.config_manager.update_backup_history(game_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            self.config_manager.save_config()
+            return True
+        except Exception as e:
+            logger.error(f"Auto backup failed for {title}: {e}")
+            self.log(f"[{title}] Auto backup failed: {str(e)}")
+            return False
@@ -1,20 +1,37 @@
+import atexit
+import bisect
 import json
 import os
+import threading
+import time
 from typing import Dict, List, Tuple, Optional, Any
 from utils.path_utils import replace_username_in_path
-from utils.resource_utils import CONFIG_PATH, RESOURCE_DIR
 from utils.logger import logger
 from utils.exceptions import ConfigError
-from utils.constants import MAX_RECENT_GAMES
-import uuid
+from utils.constants import (MAX_RECENT_GAMES, AUTO_BACKUP_DEBOUNCE_SECONDS, ARCHIVE_FORMATS, SNAPSHOT_MODES,
+                             get_default_author)
+from config.storage import BackupRun, ConfigChanges, ConfigStore, create_store
+
+CONFIG_SAVE_DELAY = 1.0  # Saves within this many seconds of the last write are coalesced into one
+NEVER_BACKED_UP = "1970-01-01 00:00:00"  # Sorts games without a backup after all others
 
 class ConfigManager:
-    def __init__(self):
-        self.config_file = CONFIG_PATH
+    def __init__(self, store: Optional[ConfigStore] = None):
+        # JSON file by default; SQLite once Resource/savegame_config.db exists
+        self.store = store or create_store()
+        self.config_file = self.store.path
+        self._save_lock = threading.RLock()
+        self._save_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._changes = ConfigChanges()
+        self._last_write = 0.0
         self.config = self.load_config()
+        self._rebuild_indexes()
+        # Changes still waiting for their coalesced write are saved on exit
+        atexit.register(self.flush)
     
     def load_config(self) -> Dict[str, Any]:
-        """Load configuration from file"""
+        """Load configuration from the config store"""
         default_config = {
             "games": {},
             "last_used": {},
@@ -22,20 +39,28 @@ class ConfigManager:
             "preferences": {
                 "path_display": "Auto",
                 "timestamp_option": "Disable",
-                "save_output_directory": False
+                "save_output_directory": False,
+                "incremental_backup": False,
+                "snapshot_mode": "Full",
+                "archive_format": "None",
+                "integrity_manifest": True,
+                "retention_keep_last": 0,
+                "retention_keep_daily": 0,
+                "retention_keep_weekly": 0,
+                "retention_max_size_mb": 0,
+                "auto_backup_debounce_seconds": AUTO_BACKUP_DEBOUNCE_SECONDS,
+                "compact_config": False
             }
         }
         
         try:
-            if os.path.exists(CONFIG_PATH):
-                with open(CONFIG_PATH, "r", encoding='utf-8') as f:
-                    config = json.load(f)
-                    
+            config = self.store.load()
+            if config is not None:
                 # MIGRATION: If using the old format (based on game_title), migrate to the new format (based on id)
                 if config.get("games") and all(isinstance(v, dict) and "id" not in v for v in config["games"].values()):
                     migrated_games = {}
                     for game_title, game_data in config["games"].items():
-                        new_id = str(uuid.uuid4())
+                        new_id = self.generate_game_id()
                         migrated_games[new_id] = {
                             "id": new_id,
                             "game_title": game_title,
@@ -52,25 +77,38 @@ class ConfigManager:
                     if "game_title" not in game:
                         game["game_title"] = gid
                 
-                for game in config["games"]:
-                    game_config = config["games"][game]
+                # One pass over every stored path; games often share a backup location,
+                # so each distinct path is rewritten once
+                rewritten: Dict[str, str] = {}
+                def rewrite(path):
+                    if path not in rewritten:
+                        rewritten[path] = replace_username_in_path(path)
+                    return rewritten[path]
+                
+                for game_config in config["games"].values():
                     if isinstance(game_config, dict):
-                        game_config["savegame_location"] = replace_username_in_path(game_config.get("savegame_location", ""))
-                        game_config["backup_location"] = replace_username_in_path(game_config.get("backup_location", ""))
+                        game_config["savegame_location"] = rewrite(game_config.get("savegame_location", ""))
+                        game_config["backup_location"] = rewrite(game_config.get("backup_location", ""))
                 
                 if "last_used" in config and isinstance(config["last_used"], dict):
                     last_used = config["last_used"]
-                    last_used["savegame_location"] = replace_username_in_path(last_used.get("savegame_location", ""))
-                    last_used["backup_location"] = replace_username_in_path(last_used.get("backup_location", ""))
+                    last_used["savegame_location"] = rewrite(last_used.get("savegame_location", ""))
+                    last_used["backup_location"] = rewrite(last_used.get("backup_location", ""))
+                
+                # A hand-edited config or another version may name a mode this one does not have
+                preferences = config.get("preferences")
+                if isinstance(preferences, dict):
+                    for key, allowed, fallback in (("snapshot_mode", SNAPSHOT_MODES, "Full"),
+                                                   ("archive_format", ARCHIVE_FORMATS, "None")):
+                        if key in preferences and preferences[key] not in allowed:
+                            logger.warning(f"Unknown {key} {preferences[key]!r} in config, using {fallback}")
+                            preferences[key] = fallback
                 
-                logger.info(f"Configuration loaded successfully from: {CONFIG_PATH}")
+                logger.info(f"Configuration loaded successfully from: {self.store.path}")
                 return config
             else:
-                # Create config directory if it doesn't exist
-                os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
-                with open(CONFIG_PATH, "w", encoding='utf-8') as f:
-                    json.dump(default_config, f, indent=4)
-                logger.info(f"Created new config file at: {CONFIG_PATH}")
+                self._write_config(default_config)
+                logger.info(f"Created new config file at: {self.store.path}")
                 return default_config
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in config file: {e}")
@@ -83,15 +121,52 @@ class ConfigManager:
             raise ConfigError(f"Failed to load configuration: {e}")
     
     def save_config(self) -> None:
-        """Save configuration to file"""
+        """
+        Save configuration to file. The first save writes right away; saves that
+        follow within CONFIG_SAVE_DELAY are coalesced into one write at the end
+        of that window. Use flush() when the file must be up to date now.
+        """
+        with self._save_lock:
+            self._dirty = True
+            if self._save_timer is not None:
+                return
+            wait = self._last_write + CONFIG_SAVE_DELAY - time.monotonic()
+            if wait <= 0:
+                self.flush()
+                return
+            self._save_timer = threading.Timer(wait, self._flush_pending)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush(self) -> None:
+        """Write pending configuration changes now"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            changes, self._changes = self._changes, ConfigChanges()
+            try:
+                self._write_config(self.config, changes)
+            except ConfigError:
+                self._changes.update(changes)
+                raise
+            self._dirty = False
+            self._last_write = time.monotonic()
+            logger.info(f"Config saved successfully to: {self.store.path}")
+    
+    def _flush_pending(self) -> None:
         try:
-            if not os.path.exists(RESOURCE_DIR):
-                os.makedirs(RESOURCE_DIR)
-                logger.info(f"Created Resource directory at: {RESOURCE_DIR}")
-                
-            with open(CONFIG_PATH, "w", encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4)
-            logger.info(f"Config saved successfully to: {CONFIG_PATH}")
+            self.flush()
+        except ConfigError:
+            # Already logged; the changes stay pending for the next save or exit
+            pass
+    
+    def _write_config(self, config, changes: Optional[ConfigChanges] = None) -> None:
+        """Write config to the store; changes lets a store write only what changed"""
+        try:
+            self.store.save(config, changes)
         except PermissionError as e:
             logger.error(f"Permission denied saving config: {e}")
             raise ConfigError(f"Cannot save configuration file: {e}")
@@ -99,92 +174,237 @@ class ConfigManager:
             logger.error(f"Error saving config: {e}")
             raise ConfigError(f"Failed to save configuration: {str(e)}")
     
+    def _mark_changed(self, game_id, history=False) -> None:
+        # Recorded under the save lock so a flush on the timer thread cannot lose it
+        with self._save_lock:
+            (self._changes.history if history else self._changes.games).add(game_id)
+    
+    @property
+    def storage_backend(self) -> str:
+        return self.store.name
+    
+    def switch_storage(self, backend) -> None:
+        """
+        Move the config to another storage backend ("json" or "sqlite"). The new
+        store gets a full copy before the old one is removed.
+        """
+        with self._save_lock:
+            if backend == self.store.name:
+                return
+            new_store = create_store(backend)
+            try:
+                new_store.save(self.config)
+                new_store.import_runs(self.store.all_runs())
+            except Exception as e:
+                new_store.close()
+                logger.error(f"Error moving config to {backend}: {e}")
+                raise ConfigError(f"Failed to move configuration to {backend}: {str(e)}")
+            old_store, self.store = self.store, new_store
+            self.config_file = new_store.path
+            self._changes = ConfigChanges()
+            self._dirty = False
+            old_store.retire()
+            logger.info(f"Config moved from {old_store.path} to {new_store.path}")
+    
     def save_config_migrated(self, config):
         try:
-            with open(CONFIG_PATH, "w", encoding='utf-8') as f:
-                json.dump(config, f, indent=4)
-            print(f"Config migrated and saved to: {CONFIG_PATH}")
+            self._write_config(config)
+            print(f"Config migrated and saved to: {self.store.path}")
         except Exception as e:
             print(f"Error saving migrated config: {e}")
     
     def generate_game_id(self):
+        import uuid  # Pulls in platform; only needed when a game is added
         return str(uuid.uuid4())
     
+    def _rebuild_indexes(self) -> None:
+        """
+        Build the title and save path lookups over config["games"].
+        add_game, rename_game and delete_game keep them up to date, so game
+        entries must be changed through those methods.
+        """
+        self._title_index: Dict[str, List[str]] = {}
+        self._folded_title_index: Dict[str, List[str]] = {}
+        self._path_index: Dict[str, List[str]] = {}
+        for gid, game in self.config["games"].items():
+            self._index_game(gid, game)
+        
+        # Recency order: (last backup, -insertion number, id) kept sorted, newest last.
+        # The insertion number keeps games with the same time in config order.
+        history = self.config.get("backup_history", {})
+        self._recency_keys: Dict[str, Tuple[str, int, str]] = {}
+        for position, gid in enumerate(self.config["games"]):
+            self._recency_keys[gid] = (history.get(gid, NEVER_BACKED_UP), -position, gid)
+        self._recency = sorted(self._recency_keys.values())
+        self._next_position = len(self._recency)
+    
+    def _set_recency(self, game_id, timestamp) -> None:
+        """Move a game to its place in the recency order in O(log n) search plus one list shift"""
+        old_key = self._recency_keys.get(game_id)
+        if old_key is not None:
+            del self._recency[bisect.bisect_left(self._recency, old_key)]
+            position = old_key[1]
+        else:
+            position = -self._next_position
+            self._next_position += 1
+        key = (timestamp, position, game_id)
+        self._recency_keys[game_id] = key
+        bisect.insort(self._recency, key)
+    
+    def _remove_recency(self, game_id) -> None:
+        old_key = self._recency_keys.pop(game_id, None)
+        if old_key is not None:
+            del self._recency[bisect.bisect_left(self._recency, old_key)]
+    
+    def _index_keys(self, game):
+        title = game.get("game_title", "")
+        yield self._title_index, title
+        yield self._folded_title_index, title.casefold()
+        if game.get("savegame_location"):
+            yield self._path_index, self._path_key(game["savegame_location"])
+    
+    @staticmethod
+    def _path_key(path) -> str:
+        return os.path.normcase(os.path.normpath(path))
+    
+    def _index_game(self, game_id, game) -> None:
+        # Each key maps to its ids in insertion order, so a duplicate title resolves like a scan would
+        for index, key in self._index_keys(game):
+            index.setdefault(key, []).append(game_id)
+    
+    def _unindex_game(self, game_id, game) -> None:
+        for index, key in self._index_keys(game):
+            ids = index.get(key)
+            if ids and game_id in ids:
+                ids.remove(game_id)
+                if not ids:
+                    del index[key]
+    
     def get_game_by_id(self, game_id):
         return self.config["games"].get(game_id)
     
-    def get_game_id_by_title(self, game_title):
-        for gid, game in self.config["games"].items():
-            if game.get("game_title") == game_title:
-                return gid
-        return None
+    def get_game_id_by_title(self, game_title, ignore_case=False):
+        if ignore_case:
+            ids = self._folded_title_index.get(game_title.casefold())
+        else:
+            ids = self._title_index.get(game_title)
+        return ids[0] if ids else None
+    
+    def get_game_id_by_path(self, savegame_location):
+        """Get the id of the game backed up from savegame_location"""
+        ids = self._path_index.get(self._path_key(savegame_location)) if savegame_location else None
+        return ids[0] if ids else None
     
     def get_recent_games(self, max_count=10):
-        """Get games ordered by last backup time"""
-        if not self.config["games"]:
-            return []
-        
-        games_with_time = []
-        for gid, game in self.config["games"].items():
-            last_backup_time = self.config.get("backup_history", {}).get(gid, "1970-01-01 00:00:00")
-            games_with_time.append((gid, game.get("game_title", ""), last_backup_time))
-        
-        games_with_time.sort(key=lambda x: x[2], reverse=True)
-        
-        return [(gid, game_title) for gid, game_title, _ in games_with_time[:max_count]]
+        """
+        Get (id, title) of the max_count most recently backed up games, newest
+        first; all games if max_count is None. Reads the maintained recency order
+        instead of sorting the library.
+        """
+        games = self.config["games"]
+        count = len(self._recency) if max_count is None else min(max_count, len(self._recency))
+        newest = self._recency[len(self._recency) - count:]
+        return [(gid, games[gid].get("game_title", "")) for _, _, gid in reversed(newest)]
     
     def add_game(self, game_title, savegame_location, backup_location, game_id=None, backup_mode="Folder"):
         """Add or update game configuration by id. If game_id is None, create new. Prevent duplicate game titles."""
-        # Check if there is already a game with the same title
-        if game_id is None:
-            existing_id = self.get_game_id_by_title(game_title)
-            if existing_id is not None:
-                game_id = existing_id
-            else:
-                game_id = self.generate_game_id()
-        self.config["games"][game_id] = {
-            "id": game_id,
-            "game_title": game_title,
-            "savegame_location": savegame_location,
-            "backup_location": backup_location,
-            "backup_mode": backup_mode
-        }
-        return game_id
+        with self._save_lock:
+            # Check if there is already a game with the same title
+            if game_id is None:
+                existing_id = self.get_game_id_by_title(game_title)
+                if existing_id is not None:
+                    game_id = existing_id
+                else:
+                    game_id = self.generate_game_id()
+            # Update in place so per-game settings such as "retention" are kept
+            game = self.config["games"].setdefault(game_id, {})
+            self._unindex_game(game_id, game)
+            game.update({
+                "id": game_id,
+                "game_title": game_title,
+                "savegame_location": savegame_location,
+                "backup_location": backup_location,
+                "backup_mode": backup_mode
+            })
+            self._index_game(game_id, game)
+            self._mark_changed(game_id)
+            if game_id not in self._recency_keys:
+                self._set_recency(game_id, self.config.get("backup_history", {}).get(game_id, NEVER_BACKED_UP))
+            return game_id
     
     def update_last_used(self, game_title, savegame_location, backup_location, game_id=None):
         """Update last used configuration without removing other fields such as author"""
-        if "last_used" not in self.config or not isinstance(self.config["last_used"], dict):
-            self.config["last_used"] = {}
+        with self._save_lock:
+            if "last_used" not in self.config or not isinstance(self.config["last_used"], dict):
+                self.config["last_used"] = {}
         
-        # If game_id is not provided, try to find it by game_title
-        if game_id is None:
-            game_id = self.get_game_id_by_title(game_title)
+            # If game_id is not provided, try to find it by game_title
+            if game_id is None:
+                game_id = self.get_game_id_by_title(game_title)
         
-        self.config["last_used"]["game_id"] = game_id
-        self.config["last_used"]["game_title"] = game_title
-        self.config["last_used"]["savegame_location"] = savegame_location
-        self.config["last_used"]["backup_location"] = backup_location
+            self.config["last_used"]["game_id"] = game_id
+            self.config["last_used"]["game_title"] = game_title
+            self.config["last_used"]["savegame_location"] = savegame_location
+            self.config["last_used"]["backup_location"] = backup_location
     
     def validate_last_used(self):
         """Validate last_used and clear it if the game_id no longer exists in games list"""
-        if "last_used" in self.config and isinstance(self.config["last_used"], dict):
-            last_used = self.config["last_used"]
-            game_id = last_used.get("game_id")
+        with self._save_lock:
+            if "last_used" in self.config and isinstance(self.config["last_used"], dict):
+                last_used = self.config["last_used"]
+                game_id = last_used.get("game_id")
             
-            # If game_id exists but the game is no longer in the games list, clear last_used
-            if game_id and game_id not in self.config["games"]:
-                logger.info(f"Clearing last_used because game_id {game_id} no longer exists in games list")
+                # If game_id exists but the game is no longer in the games list, clear last_used
+                if game_id and game_id not in self.config["games"]:
+                    logger.info(f"Clearing last_used because game_id {game_id} no longer exists in games list")
+                    self.config["last_used"] = {}
+                    # Save config after clearing last_used
+                    self.save_config()
+                    return True
+            return False
+    
+    def set_author(self, author):
+        """Set the credit author kept in last_used; an empty author stays empty"""
+        with self._save_lock:
+            if "last_used" not in self.config or not isinstance(self.config["last_used"], dict):
                 self.config["last_used"] = {}
-                # Save config after clearing last_used
-                self.save_config()
-                return True
-        return False
+            self.config["last_used"]["author"] = author
+    
+    def clear_last_used(self):
+        """Forget the last used game and its paths"""
+        with self._save_lock:
+            self.config["last_used"] = {}
+    
+    def set_default_backup_directory(self, directory):
+        """Set the backup location offered for new games"""
+        with self._save_lock:
+            self.config["default_backup_directory"] = directory
     
     def update_backup_history(self, game_id, timestamp):
         """Update backup history with timestamp"""
-        if "backup_history" not in self.config:
-            self.config["backup_history"] = {}
-        self.config["backup_history"][game_id] = timestamp
+        with self._save_lock:
+            if "backup_history" not in self.config:
+                self.config["backup_history"] = {}
+            self.config["backup_history"][game_id] = timestamp
+            self._mark_changed(game_id, history=True)
+            if game_id in self.config["games"]:
+                self._set_recency(game_id, timestamp)
+    
+    def record_backup_run(self, game_id, timestamp, path, size, file_count, duration, outcome, error=None,
+                          written=0) -> None:
+        """Append a run to the game's backup run history; it is written now, not with the next save"""
+        run = BackupRun(game_id, timestamp, path, size, file_count, duration, outcome, error, written)
+        try:
+            with self._save_lock:
+                self.store.append_run(run)
+        except Exception as e:
+            logger.error(f"Error recording backup run: {e}")
+            raise ConfigError(f"Failed to record backup run: {str(e)}")
+    
+    def get_backup_runs(self, game_id, start=None, end=None, limit=None) -> List[BackupRun]:
+        """Backup runs of a game started between start and end, oldest first; limit keeps the newest"""
+        with self._save_lock:
+            return self.store.query_runs(game_id, start, end, limit)
     
     def get_game_config(self, game_id):
         """Get configuration for specific game"""
@@ -192,36 +412,85 @@ class ConfigManager:
     
     def delete_game(self, game_id):
         """Delete game from configuration"""
-        if game_id in self.config["games"]:
-            del self.config["games"][game_id]
-        if "backup_history" in self.config and game_id in self.config["backup_history"]:
-            del self.config["backup_history"][game_id]
+        with self._save_lock:
+            if game_id in self.config["games"]:
+                self._unindex_game(game_id, self.config["games"].pop(game_id))
+                self._remove_recency(game_id)
+                self._mark_changed(game_id)
+            if "backup_history" in self.config and game_id in self.config["backup_history"]:
+                del self.config["backup_history"][game_id]
+                self._mark_changed(game_id, history=True)
+            try:
+                self.store.delete_runs(game_id)
+            except Exception as e:
+                logger.warning(f"Could not delete backup runs of {game_id}: {e}")
         
-        # Validate and clean up last_used if the deleted game was the last used game
-        self.validate_last_used()
+            # Validate and clean up last_used if the deleted game was the last used game
+            self.validate_last_used()
     
     def rename_game(self, game_id, new_title):
         """Rename game title for existing game"""
-        if game_id in self.config["games"]:
-            # Check if new title already exists for different game
-            existing_id = self.get_game_id_by_title(new_title)
-            if existing_id and existing_id != game_id:
-                raise ValueError(f"Game title '{new_title}' already exists")
+        with self._save_lock:
+            if game_id in self.config["games"]:
+                # Check if new title already exists for different game
+                existing_id = self.get_game_id_by_title(new_title)
+                if existing_id and existing_id != game_id:
+                    raise ValueError(f"Game title '{new_title}' already exists")
             
-            self.config["games"][game_id]["game_title"] = new_title
-            return True
-        return False
+                game = self.config["games"][game_id]
+                self._unindex_game(game_id, game)
+                game["game_title"] = new_title
+                self._index_game(game_id, game)
+                self._mark_changed(game_id)
+                return True
+            return False
     
     def get_preferences(self):
         """Get user preferences"""
         return self.config.get("preferences", {
             "path_display": "Auto",
             "timestamp_option": "Disable",
-            "save_output_directory": False
+            "save_output_directory": False,
+            "incremental_backup": False,
+            "snapshot_mode": "Full",
+            "archive_format": "None",
+            "integrity_manifest": True,
+            "retention_keep_last": 0,
+            "retention_keep_daily": 0,
+            "retention_keep_weekly": 0,
+            "retention_max_size_mb": 0,
+            "auto_backup_debounce_seconds": AUTO_BACKUP_DEBOUNCE_SECONDS,
+            "compact_config": False
         })
     
+    def get_author(self):
+        """Get the credit author; an author the user cleared stays empty"""
+        last_used = self.config.get("last_used", {})
+        author = last_used.get("author", "").strip()
+        if not author and "author" not in last_used:
+            author = get_default_author()
+        return author
+    
+    def get_retention_policy(self, game_id=None):
+        """
+        Get the snapshot retention settings for a game: the global retention_*
+        preferences, overridden by the game's own "retention" entry if it has one
+        """
+        preferences = self.get_preferences()
+        policy = {
+            "keep_last": preferences.get("retention_keep_last", 0),
+            "keep_daily": preferences.get("retention_keep_daily", 0),
+            "keep_weekly": preferences.get("retention_keep_weekly", 0),
+            "max_size_mb": preferences.get("retention_max_size_mb", 0)
+        }
+        game = self.get_game_by_id(game_id) if game_id else None
+        if game and isinstance(game.get("retention"), dict):
+            policy.update(game["retention"])
+        return policy
+    
     def save_preferences(self, preferences):
         """Save user preferences"""
-        if "preferences" not in self.config:
-            self.config["preferences"] = {}
-        self.config["preferences"].update(preferences) 
\ No newline at end of file
+        with self._save_lock:
+            if "preferences" not in self.config:
+                self.config["preferences"] = {}
+            self.config["preferences"].update(preferences) 
\ No newline at end of file
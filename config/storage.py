@@ -0,0 +1,400 @@
+import json
+import os
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
+from utils.resource_utils import CONFIG_PATH, CONFIG_DB_PATH
+from utils.logger import logger
+
+STORAGE_BACKENDS = ["json", "sqlite"]
+SQLITE_SCHEMA_VERSION = 1
+MIGRATED_SUFFIX = ".migrated"  # A JSON config moved into SQLite is kept under this name
+RUNS_DIR_NAME = "backup_runs"  # The JSON store keeps one run log per game here, next to the config file
+
+class BackupRun(NamedTuple):
+    """One backup of a game, as kept in its backup run history"""
+    game_id: str
+    timestamp: str  # Start time as "%Y-%m-%d %H:%M:%S", like backup_history
+    path: str  # Backup folder the run wrote to
+    size: int  # Bytes in the savegame
+    file_count: int
+    duration: float  # Seconds
+    outcome: str  # "success" or "failed"
+    error: Optional[str] = None
+    written: int = 0  # Bytes actually written; less than size for incremental, linked or deduplicated runs
+
+    @property
+    def throughput(self) -> float:
+        """Bytes written per second; 0 when the run took no measurable time"""
+        return self.written / self.duration if self.duration > 0 else 0.0
+
+class ConfigChanges:
+    """Game ids whose entry or backup history changed since the last save"""
+
+    def __init__(self):
+        self.games: Set[str] = set()
+        self.history: Set[str] = set()
+
+    def update(self, other: "ConfigChanges") -> None:
+        self.games |= other.games
+        self.history |= other.history
+
+class ConfigStore(ABC):
+    """
+    Where ConfigManager keeps its config. load() returns the whole config dict,
+    or None if nothing is stored yet. save() gets the whole config and, when it
+    is known, what changed since the last save (None means write everything).
+
+    Each store also keeps an append-only history of backup runs, written as
+    runs happen rather than with the config, and read one game at a time.
+    """
+    name = ""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @abstractmethod
+    def load(self) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def save(self, config: Dict[str, Any], changes: Optional[ConfigChanges] = None) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def append_run(self, run: BackupRun) -> None:
+        pass
+
+    @abstractmethod
+    def query_runs(self, game_id, start: Optional[str] = None, end: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[BackupRun]:
+        """
+        Runs of game_id that started between start and end (inclusive, same
+        format as BackupRun.timestamp), oldest first; with limit only the newest
+        """
+
+    @abstractmethod
+    def delete_runs(self, game_id) -> None:
+        pass
+
+    @abstractmethod
+    def all_runs(self) -> Iterator[BackupRun]:
+        pass
+
+    def import_runs(self, runs: Iterable[BackupRun]) -> None:
+        for run in runs:
+            self.append_run(run)
+
+    @abstractmethod
+    def retire(self) -> None:
+        """Remove this store after the config has been moved to another backend"""
+
+    def _make_folder(self) -> None:
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+            logger.info(f"Created Resource directory at: {folder}")
+
+class JsonConfigStore(ConfigStore):
+    """
+    The whole config as one JSON document, rewritten on every save. Backup runs
+    go to one file per game under RUNS_DIR_NAME, a compact JSON array per line.
+    """
+    name = "json"
+
+    def __init__(self, path: str = CONFIG_PATH):
+        super().__init__(path)
+        self.runs_folder = os.path.join(os.path.dirname(path), RUNS_DIR_NAME)
+        self.runs_lock = threading.Lock()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, config: Dict[str, Any], changes: Optional[ConfigChanges] = None) -> None:
+        """Write config to a temporary file and atomically replace the config file with it"""
+        self._make_folder()
+        # ConfigManager holds its save lock while saving, so no other thread changes config meanwhile
+        if config.get("preferences", {}).get("compact_config", False):
+            data = json.dumps(config, separators=(",", ":"))
+        else:
+            data = json.dumps(config, indent=4)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # A crash leaves either the old or the new file, never a truncated one
+        os.replace(temp_path, self.path)
+
+    def _runs_file(self, game_id) -> str:
+        return os.path.join(self.runs_folder, f"{game_id}.jsonl")
+
+    def _read_runs(self, game_id) -> Iterator[BackupRun]:
+        path = self._runs_file(game_id)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield BackupRun(game_id, *json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # A line cut short by a crash
+
+    def append_run(self, run: BackupRun) -> None:
+        # The game id is the file name, so it is left out of the line
+        line = json.dumps(list(run[1:]), separators=(",", ":"), ensure_ascii=False)
+        with self.runs_lock:
+            os.makedirs(self.runs_folder, exist_ok=True)
+            with open(self._runs_file(run.game_id), "a", encoding='utf-8') as f:
+                f.write(line + "\n")
+
+    def query_runs(self, game_id, start: Optional[str] = None, end: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[BackupRun]:
+        with self.runs_lock:
+            runs = [run for run in self._read_runs(game_id)
+                    if (start is None or run.timestamp >= start) and (end is None or run.timestamp <= end)]
+        # Parallel backups can finish, and so be appended, out of start order
+        runs.sort(key=lambda run: run.timestamp)
+        return runs[-limit:] if limit else runs
+
+    def delete_runs(self, game_id) -> None:
+        with self.runs_lock:
+            if os.path.exists(self._runs_file(game_id)):
+                os.remove(self._runs_file(game_id))
+
+    def all_runs(self) -> Iterator[BackupRun]:
+        if not os.path.isdir(self.runs_folder):
+            return
+        for name in sorted(os.listdir(self.runs_folder)):
+            if name.endswith(".jsonl"):
+                yield from self._read_runs(name[:-len(".jsonl")])
+
+    def retire(self) -> None:
+        if os.path.exists(self.path):
+            os.replace(self.path, self.path + MIGRATED_SUFFIX)
+        if os.path.isdir(self.runs_folder):
+            migrated = self.runs_folder + MIGRATED_SUFFIX
+            if os.path.isdir(migrated):
+                shutil.rmtree(migrated)
+            os.replace(self.runs_folder, migrated)
+
+class SqliteConfigStore(ConfigStore):
+    """
+    The config in a SQLite database: one row per game and per backup history
+    entry, indexed by title, save path and time, and one row per other top-level
+    key. Backup runs are rows indexed by game and start time. A save only writes
+    the games and history entries that changed, plus the settings whose value
+    differs from what was last written, in one transaction.
+
+    A new database is filled from the JSON config if there is one, and the JSON
+    file is then renamed with MIGRATED_SUFFIX.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str = CONFIG_DB_PATH, json_path: str = CONFIG_PATH):
+        super().__init__(path)
+        self.json_path = json_path
+        self.lock = threading.Lock()
+        self.connection = None
+        self._saved_settings: Dict[str, str] = {}
+        self._next_position = 0
+
+    def _connect(self):
+        if self.connection is None:
+            import sqlite3  # Only loaded when this backend is in use
+            self._make_folder()
+            # Deferred saves run on a timer thread; self.lock serializes all use
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS games (
+                    id TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    title TEXT NOT NULL,
+                    savegame_location TEXT NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS games_title ON games (title COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS games_savegame_location ON games (savegame_location);
+                CREATE TABLE IF NOT EXISTS backup_history (
+                    game_id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS backup_history_timestamp ON backup_history (timestamp);
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS backup_runs (
+                    game_id TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    file_count INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    outcome TEXT NOT NULL,
+                    error TEXT,
+                    written INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS backup_runs_game_timestamp ON backup_runs (game_id, timestamp);
+            """)
+            columns = {row[1] for row in self.connection.execute("PRAGMA table_info(backup_runs)")}
+            if "written" not in columns:
+                # Run tables created before bytes written were recorded
+                self.connection.execute("ALTER TABLE backup_runs ADD COLUMN written INTEGER NOT NULL DEFAULT 0")
+        return self.connection
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            connection = self._connect()
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version > SQLITE_SCHEMA_VERSION:
+                raise ValueError(f"{self.path} was written by a newer version (schema {version})")
+            if version == 0:
+                return self._migrate_from_json(connection)
+
+            config: Dict[str, Any] = {}
+            self._saved_settings = {}
+            for key, value in connection.execute("SELECT key, value FROM settings"):
+                config[key] = json.loads(value)
+                self._saved_settings[key] = value
+            config["games"] = {
+                gid: json.loads(data)
+                for gid, data in connection.execute("SELECT id, data FROM games ORDER BY position")
+            }
+            config["backup_history"] = dict(connection.execute("SELECT game_id, timestamp FROM backup_history"))
+            self._next_position = connection.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM games").fetchone()[0]
+            return config
+
+    def _migrate_from_json(self, connection) -> Optional[Dict[str, Any]]:
+        """Fill a new database from the JSON config; returns None if there is none"""
+        json_store = JsonConfigStore(self.json_path)
+        config = json_store.load()
+        if config is None:
+            return None
+        self._save(connection, config, None)
+        self._insert_runs(connection, json_store.all_runs())
+        json_store.retire()
+        logger.info(f"Migrated {self.json_path} to {self.path}")
+        return config
+
+    def save(self, config: Dict[str, Any], changes: Optional[ConfigChanges] = None) -> None:
+        with self.lock:
+            self._save(self._connect(), config, changes)
+
+    def _save(self, connection, config: Dict[str, Any], changes: Optional[ConfigChanges]) -> None:
+        games = config.get("games", {})
+        history = config.get("backup_history", {})
+        # Settings are small, so compare them all instead of tracking their changes
+        settings = {key: json.dumps(value) for key, value in config.items()
+                    if key not in ("games", "backup_history")}
+        with connection:
+            if changes is None:
+                connection.execute("DELETE FROM games")
+                connection.execute("DELETE FROM backup_history")
+                connection.execute("DELETE FROM settings")
+                self._saved_settings = {}
+                self._next_position = 0
+                game_ids, history_ids = list(games), list(history)
+            else:
+                game_ids, history_ids = list(changes.games), list(changes.history)
+
+            for gid in game_ids:
+                game = games.get(gid)
+                if game is None:
+                    connection.execute("DELETE FROM games WHERE id = ?", (gid,))
+                    continue
+                # New games go last; existing ones keep their place
+                connection.execute(
+                    "INSERT INTO games (id, position, title, savegame_location, data) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET title = excluded.title, "
+                    "savegame_location = excluded.savegame_location, data = excluded.data",
+                    (gid, self._next_position, game.get("game_title", gid), game.get("savegame_location", ""),
+                     json.dumps(game))
+                )
+                self._next_position += 1
+            for gid in history_ids:
+                if gid in history:
+                    connection.execute("INSERT OR REPLACE INTO backup_history (game_id, timestamp) VALUES (?, ?)",
+                                       (gid, history[gid]))
+                else:
+                    connection.execute("DELETE FROM backup_history WHERE game_id = ?", (gid,))
+            for key, value in settings.items():
+                if self._saved_settings.get(key) != value:
+                    connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+            for key in set(self._saved_settings) - set(settings):
+                connection.execute("DELETE FROM settings WHERE key = ?", (key,))
+            connection.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")
+        self._saved_settings = settings
+
+    def _insert_runs(self, connection, runs: Iterable[BackupRun]) -> None:
+        with connection:
+            connection.executemany(
+                "INSERT INTO backup_runs (game_id, timestamp, path, size, file_count, duration, outcome, error, written) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", runs
+            )
+
+    def append_run(self, run: BackupRun) -> None:
+        self.import_runs([run])
+
+    def import_runs(self, runs: Iterable[BackupRun]) -> None:
+        with self.lock:
+            self._insert_runs(self._connect(), runs)
+
+    def query_runs(self, game_id, start: Optional[str] = None, end: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[BackupRun]:
+        query = "SELECT * FROM backup_runs WHERE game_id = ?"
+        params: List[Any] = [game_id]
+        if start is not None:
+            query += " AND timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND timestamp <= ?"
+            params.append(end)
+        # Newest first so LIMIT keeps the latest runs; -1 means no limit
+        query += " ORDER BY timestamp DESC, rowid DESC LIMIT ?"
+        params.append(limit or -1)
+        with self.lock:
+            rows = self._connect().execute(query, params).fetchall()
+        return [BackupRun(*row) for row in reversed(rows)]
+
+    def delete_runs(self, game_id) -> None:
+        with self.lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM backup_runs WHERE game_id = ?", (game_id,))
+
+    def all_runs(self) -> Iterator[BackupRun]:
+        with self.lock:
+            rows = self._connect().execute("SELECT * FROM backup_runs ORDER BY rowid").fetchall()
+        return (BackupRun(*row) for row in rows)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def retire(self) -> None:
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+def create_store(backend: Optional[str] = None) -> ConfigStore:
+    """Return the store for backend; by default SQLite if its database exists, else JSON"""
+    if backend is None:
+        backend = "sqlite" if os.path.exists(CONFIG_DB_PATH) else "json"
+    if backend == "sqlite":
+        return SqliteConfigStore()
+    if backend == "json":
+        return JsonConfigStore()
+    raise ValueError(f"Unknown config storage '{backend}', expected one of: {', '.join(STORAGE_BACKENDS)}")
@@ -43,6 +43,7 @@ setup(
     entry_points={
         "console_scripts": [
             "sweet-progress=program:main",
+            "sweet-progress-cli=sweet_progress.cli:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for Sweet Progress.
+
+Imports each entry point in a fresh interpreter with `python -X importtime`,
+reports the median cumulative import time against its budget and the
+slowest modules, and checks that importing created no files. Exits with
+status 1 when a budget is exceeded or an import had side effects.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Median cumulative import time budgets in milliseconds
+IMPORT_BUDGETS_MS = {
+    "program": 120,                 # GUI entry point (tkinter and the whole ui package)
+    "sweet_progress.cli": 70,       # Headless command line
+    "backup.backup_manager": 80,    # Backup engine, loaded by the CLI backup commands
+}
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def measure_import(module, workdir):
+    """Import module in a new interpreter; return (cumulative ms, {module: self ms})"""
+    env = dict(os.environ, PYTHONPATH=PROJECT_DIR)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    cumulative = None
+    self_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = [field.strip() for field in line[len("import time:"):].split("|")]
+        if not fields[0].isdigit():
+            continue  # Header line
+        name = fields[2]
+        self_times[name.strip()] = int(fields[0]) / 1000
+        if name == module:
+            cumulative = int(fields[1]) / 1000
+    return cumulative, self_times
+
+def benchmark(module, runs, top):
+    """Return (median ms, files created) and print the slowest modules"""
+    timings = []
+    slowest = {}
+    created = set()
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            cumulative, self_times = measure_import(module, workdir)
+            created.update(os.listdir(workdir))
+        timings.append(cumulative)
+        for name, value in self_times.items():
+            slowest[name] = max(slowest.get(name, 0), value)
+
+    median = statistics.median(timings)
+    print(f"{module}: {median:.1f} ms median of {runs} runs (budget {IMPORT_BUDGETS_MS[module]} ms)")
+    for name, value in sorted(slowest.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"    {value:7.1f} ms  {name}")
+    return median, sorted(created)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Sweet Progress import times against their budgets.")
+    parser.add_argument("modules", nargs="*", default=list(IMPORT_BUDGETS_MS),
+                        help="entry points to measure (default: all budgeted ones)")
+    parser.add_argument("--runs", type=int, default=5, help="imports per module")
+    parser.add_argument("--top", type=int, default=8, help="slowest modules to list per entry point")
+    args = parser.parse_args()
+
+    print("Sweet Progress - Startup Benchmark")
+    print("=" * 40)
+    failed = False
+    for module in args.modules:
+        if module not in IMPORT_BUDGETS_MS:
+            parser.error(f"no budget for {module}; known: {', '.join(IMPORT_BUDGETS_MS)}")
+        median, created = benchmark(module, max(1, args.runs), args.top)
+        if median > IMPORT_BUDGETS_MS[module]:
+            print(f"  OVER BUDGET by {median - IMPORT_BUDGETS_MS[module]:.1f} ms")
+            failed = True
+        if created:
+            print(f"  Import created files in the working directory: {', '.join(created)}")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
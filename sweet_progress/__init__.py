@@ -0,0 +1 @@
+# Command-line interface for Sweet Progress 
\ No newline at end of file
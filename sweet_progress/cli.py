@@ -0,0 +1,258 @@
+"""
+Headless command line for Sweet Progress.
+
+Drives ConfigManager and BackupManager directly, so backups can run from
+cron, systemd timers or CI without a display. Nothing here may import
+tkinter or the ui package. The backup modules are imported by the commands
+that use them, so quick commands like list start fast.
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+from datetime import datetime
+from typing import Any, List, Optional
+from config.config_manager import ConfigManager
+from config.storage import STORAGE_BACKENDS
+from utils.constants import BATCH_PARALLEL_GAMES, TIMESTAMP_OPTIONS
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1  # A backup failed or an unexpected error occurred
+EXIT_USAGE = 2  # Bad arguments or unknown game (same code argparse uses)
+EXIT_VERIFY_FAILED = 3  # Verification found missing or corrupt files
+EXIT_PARTIAL = 4  # Some games in a batch failed
+
+class Output:
+    """
+    Writes results to stdout, either as readable lines or as one JSON object
+    per line ("event" tells them apart). Calls from worker threads are serialized.
+    """
+
+    def __init__(self, as_json: bool = False, stream=None):
+        self.as_json = as_json
+        self.stream = stream or sys.stdout
+        self.lock = threading.Lock()
+
+    def emit(self, event: str, text: str = "", **fields: Any) -> None:
+        with self.lock:
+            if self.as_json:
+                self.stream.write(json.dumps(dict(event=event, **fields), ensure_ascii=False) + "\n")
+            elif text:
+                self.stream.write(text + "\n")
+            self.stream.flush()
+
+    def log(self, message: str, game: Optional[str] = None) -> None:
+        self.emit("log", message, message=message, game=game)
+
+    def progress(self, game: str, percent: float, overall: Optional[float] = None) -> None:
+        # Progress is only useful to programs; readable output sticks to log lines
+        self.emit("progress", game=game, percent=round(percent, 1),
+                  overall=round(overall, 1) if overall is not None else None)
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def _find_game(config_manager, name: str) -> Optional[str]:
+    """Return the id of the game with this id, title (any case) or savegame location"""
+    if config_manager.get_game_by_id(name):
+        return name
+    return (config_manager.get_game_id_by_title(name)
+            or config_manager.get_game_id_by_title(name, ignore_case=True)
+            or config_manager.get_game_id_by_path(os.path.abspath(name)))
+
+def cmd_list(args, config_manager, out: Output) -> int:
+    history = config_manager.config.get("backup_history", {})
+    for gid, game in config_manager.config["games"].items():
+        title = game.get("game_title", gid)
+        last_backup = history.get(gid)
+        out.emit("game", f"{title}\t{game.get('savegame_location', '')}\t{last_backup or 'never'}",
+                 id=gid, title=title, savegame_location=game.get("savegame_location", ""),
+                 backup_location=game.get("backup_location", ""), last_backup=last_backup)
+    return EXIT_OK
+
+def cmd_backup(args, config_manager, out: Output) -> int:
+    from backup.backup_manager import BackupManager
+    gid = _find_game(config_manager, args.game)
+    if not gid:
+        out.emit("error", f"Unknown game: {args.game}", message=f"Unknown game: {args.game}")
+        return EXIT_USAGE
+    game = config_manager.get_game_by_id(gid)
+    title = game.get("game_title", gid)
+    savegame_location = game.get("savegame_location", "")
+    backup_location = args.backup_location or game.get("backup_location", "")
+    preferences = config_manager.get_preferences()
+    timestamp_option = args.timestamp or preferences.get("timestamp_option", "Disable")
+    backup_manager = BackupManager(
+        config_manager,
+        progress_callback=lambda progress: out.progress(title, progress),
+        log_callback=lambda message: out.log(message, title)
+    )
+    try:
+        backup_manager.create_backup(
+            title, savegame_location, backup_location, timestamp_option,
+            preferences.get("path_display", "Auto"), config_manager.get_author(), "",
+            "File" if os.path.isfile(savegame_location) else "Folder", incremental=args.incremental
+        )
+    except Exception as e:
+        out.emit("result", f"Backup failed: {str(e)}", game=title, success=False, error=str(e))
+        return EXIT_FAILED
+    config_manager.update_backup_history(gid, _now())
+    config_manager.save_config()
+    out.emit("result", f"Backup finished: {title}", game=title, success=True)
+    return EXIT_OK
+
+def cmd_batch(args, config_manager, out: Output) -> int:
+    from backup.batch_backup import BatchBackup
+    game_ids = None
+    if args.games:
+        game_ids = []
+        for name in args.games:
+            gid = _find_game(config_manager, name)
+            if not gid:
+                out.emit("error", f"Unknown game: {name}", message=f"Unknown game: {name}")
+                return EXIT_USAGE
+            game_ids.append(gid)
+    titles = {gid: game.get("game_title", gid) for gid, game in config_manager.config["games"].items()}
+    batch = BatchBackup(
+        config_manager, game_ids,
+        progress_callback=lambda gid, percent, overall: out.progress(titles.get(gid, gid), percent, overall),
+        log_callback=out.log,
+        max_parallel=args.parallel
+    )
+    results = batch.run()
+    for result in results:
+        text = f"{result.game_title}: {'ok' if result.success else 'failed: ' + str(result.error)}"
+        out.emit("result", text, game=result.game_title, success=result.success, error=result.error)
+    failed = sum(1 for result in results if not result.success)
+    if not failed:
+        return EXIT_OK
+    return EXIT_FAILED if failed == len(results) else EXIT_PARTIAL
+
+def cmd_verify(args, config_manager, out: Output) -> int:
+    from backup.backup_manager import BackupManager
+    folder = args.target
+    gid = None if os.path.isdir(folder) else _find_game(config_manager, folder)
+    if gid:
+        game = config_manager.get_game_by_id(gid)
+        folder = os.path.join(game.get("backup_location", ""), game.get("game_title", gid))
+    if not os.path.isdir(folder):
+        out.emit("error", f"Backup folder not found: {folder}", message=f"Backup folder not found: {folder}")
+        return EXIT_USAGE
+    backup_manager = BackupManager(config_manager, log_callback=out.log)
+    try:
+        results = backup_manager.verify_backups(folder)
+    except Exception as e:
+        out.emit("error", str(e), message=str(e))
+        return EXIT_FAILED
+    for result in results:
+        text = (f"{result.folder}: {'ok' if result.ok else 'FAILED'} ({result.checked} checked, "
+                f"{len(result.missing)} missing, {len(result.corrupt)} corrupt)")
+        out.emit("result", text, folder=result.folder, ok=result.ok, checked=result.checked,
+                 missing=result.missing, corrupt=result.corrupt)
+    if not results:
+        out.emit("result", f"No backups with checksums found in {folder}", folder=folder, ok=False, checked=0,
+                 missing=[], corrupt=[])
+        return EXIT_VERIFY_FAILED
+    return EXIT_OK if all(result.ok for result in results) else EXIT_VERIFY_FAILED
+
+def cmd_watch(args, config_manager, out: Output) -> int:
+    from backup.watcher import SaveWatcher
+    watcher = SaveWatcher(config_manager, debounce_seconds=args.debounce, log_callback=out.log)
+    # SIGTERM (systemd, docker stop) ends the watch like Ctrl+C does
+    signal.signal(signal.SIGTERM, lambda signum, frame: watcher.stop())
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+    return EXIT_OK
+
+def cmd_history(args, config_manager, out: Output) -> int:
+    gid = _find_game(config_manager, args.game)
+    if not gid:
+        out.emit("error", f"Unknown game: {args.game}", message=f"Unknown game: {args.game}")
+        return EXIT_USAGE
+    until = args.until
+    if until and len(until) == len("YYYY-MM-DD"):
+        until += " 23:59:59"  # A date alone includes that whole day
+    for run in config_manager.get_backup_runs(gid, args.since, until, args.limit):
+        text = (f"{run.timestamp}\t{run.outcome}\t{run.size} bytes\t{run.file_count} files\t"
+                f"{run.written} bytes written\t{run.duration:.1f} s\t{run.throughput / 1048576:.1f} MB/s\t"
+                f"{run.error or run.path}")
+        out.emit("run", text, throughput=round(run.throughput), **run._asdict())
+    return EXIT_OK
+
+def cmd_storage(args, config_manager, out: Output) -> int:
+    if args.backend:
+        config_manager.switch_storage(args.backend)
+    out.emit("storage", f"Config storage: {config_manager.storage_backend} ({config_manager.config_file})",
+             backend=config_manager.storage_backend, path=config_manager.config_file)
+    return EXIT_OK
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="sweet_progress", description="Back up game saves without the GUI.")
+    parser.add_argument("--json", action="store_true",
+                        help="print one JSON object per line (log, progress, result and error events)")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    commands.add_parser("list", help="list the configured games").set_defaults(func=cmd_list)
+
+    backup = commands.add_parser("backup", help="back up one game")
+    backup.add_argument("game", help="game title (any case), id or savegame location")
+    backup.add_argument("--backup-location", help="back up here instead of the game's backup location")
+    backup.add_argument("--timestamp", choices=TIMESTAMP_OPTIONS,
+                        help="override the timestamp_option preference")
+    incremental = backup.add_mutually_exclusive_group()
+    incremental.add_argument("--incremental", action="store_true", default=None,
+                             help="only copy new or changed files")
+    incremental.add_argument("--full", dest="incremental", action="store_false",
+                             help="copy everything again")
+    backup.set_defaults(func=cmd_backup)
+
+    batch = commands.add_parser("batch", help="back up several games (all by default)")
+    batch.add_argument("games", nargs="*", help="game titles, ids or savegame locations")
+    batch.add_argument("--parallel", type=int, default=BATCH_PARALLEL_GAMES, help="games backed up at once")
+    batch.set_defaults(func=cmd_batch)
+
+    verify = commands.add_parser("verify", help="check backups against their checksums")
+    verify.add_argument("target", help="backup folder, or a game title or id")
+    verify.set_defaults(func=cmd_verify)
+
+    watch = commands.add_parser("watch", help="back up games automatically when their saves change")
+    watch.add_argument("--debounce", type=float, default=None,
+                       help="seconds a save must stay unchanged (default: auto_backup_debounce_seconds)")
+    watch.set_defaults(func=cmd_watch)
+
+    history = commands.add_parser("history", help="show a game's backup runs with their size and duration")
+    history.add_argument("game", help="game title (any case), id or savegame location")
+    history.add_argument("--since", help="only runs started at or after this time (YYYY-MM-DD[ HH:MM:SS])")
+    history.add_argument("--until", help="only runs started at or before this time (YYYY-MM-DD[ HH:MM:SS])")
+    history.add_argument("--limit", type=int, help="only the newest runs")
+    history.set_defaults(func=cmd_history)
+
+    storage = commands.add_parser("storage", help="show or change where the config is stored")
+    storage.add_argument("backend", nargs="?", choices=STORAGE_BACKENDS,
+                         help="move the config to this backend (sqlite suits large libraries)")
+    storage.set_defaults(func=cmd_storage)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    out = Output(args.json)
+    try:
+        config_manager = ConfigManager()
+        return args.func(args, config_manager, out)
+    except KeyboardInterrupt:
+        return EXIT_FAILED
+    except Exception as e:
+        out.emit("error", f"Error: {str(e)}", message=str(e))
+        return EXIT_FAILED
+    finally:
+        # Finish deleting replaced backups instead of leaving them for the next run
+        staging = sys.modules.get("backup.staging")
+        if staging:
+            staging.background_deleter.wait()
@@ -0,0 +1,9 @@
+import logging
+import os
+import sys
+
+# The packages live at the project root, which is not installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# With a handler already set, the app logger does not create Resource/logs in the working directory
+logging.getLogger("SweetProgress").addHandler(logging.NullHandler())
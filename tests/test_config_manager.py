@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+
+import pytest
+
+from config.config_manager import ConfigManager
+from config.storage import JsonConfigStore
+from utils.exceptions import ConfigError
+
+def load(tmp_path, preferences):
+    path = tmp_path / "savegame_config.json"
+    path.write_text(json.dumps({"games": {}, "last_used": {}, "backup_history": {}, "preferences": preferences}))
+    manager = ConfigManager(JsonConfigStore(str(path)))
+    return manager.get_preferences()
+
+@pytest.mark.parametrize("key, value, fallback", [
+    ("snapshot_mode", "Reflink", "Full"),
+    ("archive_format", "7z", "None"),
+    ("archive_format", None, "None"),
+])
+def test_unknown_modes_in_preferences_fall_back(tmp_path, key, value, fallback):
+    assert load(tmp_path, {key: value})[key] == fallback
+
+def test_known_modes_in_preferences_are_kept(tmp_path):
+    assert load(tmp_path, {"snapshot_mode": "Deduplicated"})["snapshot_mode"] == "Deduplicated"
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    # Long enough that the coalescing timer never fires during a test
+    monkeypatch.setattr("config.config_manager.CONFIG_SAVE_DELAY", 60)
+    manager = ConfigManager(JsonConfigStore(str(tmp_path / "savegame_config.json")))
+    manager._last_write = 0.0
+    return manager
+
+def recorded_saves(manager, monkeypatch):
+    saves = []
+    real_save = manager.store.save
+
+    def save(config, changes=None):
+        saves.append(set(changes.games) if changes else None)
+        real_save(config, changes)
+    monkeypatch.setattr(manager.store, "save", save)
+    return saves
+
+def stored(manager):
+    with open(manager.store.path, encoding="utf-8") as f:
+        return {game["game_title"] for game in json.load(f)["games"].values()}
+
+def test_saves_after_the_first_are_coalesced_until_flush(manager, monkeypatch):
+    saves = recorded_saves(manager, monkeypatch)
+    for title in ("One", "Two", "Three"):
+        manager.add_game(title, "/saves/" + title, "/backups")
+        manager.save_config()
+    assert len(saves) == 1
+    assert stored(manager) == {"One"}
+
+    manager.flush()
+    assert [len(games) for games in saves] == [1, 2]
+    assert stored(manager) == {"One", "Two", "Three"}
+    manager.flush()
+    assert len(saves) == 2
+
+def test_failed_write_keeps_the_old_file_and_the_pending_changes(manager, monkeypatch):
+    manager.add_game("One", "/saves/One", "/backups")
+    manager.save_config()
+    manager.add_game("Two", "/saves/Two", "/backups")
+    manager.save_config()
+    real_replace = os.replace
+
+    def replace(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "replace", replace)
+    with pytest.raises(ConfigError):
+        manager.flush()
+    assert stored(manager) == {"One"}
+
+    monkeypatch.setattr(os, "replace", real_replace)
+    manager.flush()
+    assert stored(manager) == {"One", "Two"}
+
+def test_games_added_while_saving_are_not_lost(manager):
+    def add_games():
+        for number in range(200):
+            manager.add_game(f"Game {number}", f"/saves/{number}", "/backups")
+            manager.save_config()
+
+    worker = threading.Thread(target=add_games)
+    worker.start()
+    while worker.is_alive():
+        manager.flush()
+    worker.join()
+    manager.flush()
+    assert len(stored(manager)) == 200
@@ -0,0 +1,40 @@
+import sys
+
+import pytest
+
+from backup.backup_manager import BackupManager
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="kernel copy calls are Linux only")
+
+def kernel_copy(tmp_path, data, expected):
+    src = tmp_path / "save.dat"
+    dst = tmp_path / "copy.dat"
+    src.write_bytes(data)
+    reported = []
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        done = BackupManager(None)._copy_file_kernel(fsrc, fdst, expected, reported.append)
+    return done, dst.read_bytes(), sum(reported)
+
+def test_kernel_copy_reads_past_the_expected_size(tmp_path):
+    # The file grew between measuring it and copying it
+    data = b"x" * 1000 + b"y" * 500
+    assert kernel_copy(tmp_path, data, 1000) == (True, data, 1500)
+
+def test_kernel_copy_of_a_shrunk_file_leaves_the_rest_to_the_buffered_loop(tmp_path):
+    assert kernel_copy(tmp_path, b"x" * 1000, 2000) == (False, b"x" * 1000, 1000)
+
+def test_copy_file_with_progress_copies_a_grown_file(tmp_path, monkeypatch):
+    src = tmp_path / "save.dat"
+    dst = tmp_path / "copy.dat"
+    src.write_bytes(b"x" * 4096)
+    manager = BackupManager(None)
+    real_kernel = manager._copy_file_kernel
+
+    def grow_then_copy(fsrc, fdst, expected, report):
+        with open(src, "ab") as f:
+            f.write(b"y" * 4096)
+        return real_kernel(fsrc, fdst, expected, report)
+    monkeypatch.setattr(manager, "_copy_file_kernel", grow_then_copy)
+    manager.copy_file_with_progress(str(src), str(dst))
+    assert dst.read_bytes() == src.read_bytes()
+    assert manager._bytes_written == 8192
@@ -0,0 +1,158 @@
+import json
+import os
+
+import pytest
+
+import backup.backup_manager
+import backup.delta
+from backup.backup_manager import BackupManager
+from backup.delta import clone_file, delta_update, file_signature, load_signature
+from backup.integrity import hash_file
+from backup.staging import BackgroundDeleter
+
+BLOCK = 16
+
+def blocks(*fills):
+    """One BLOCK-sized block per byte value, e.g. blocks(b"a", b"b")"""
+    return b"".join(fill * BLOCK for fill in fills)
+
+@pytest.fixture
+def files(tmp_path):
+    src = tmp_path / "save.dat"
+    dst = tmp_path / "backup" / "save.dat"
+    dst.parent.mkdir()
+    signature = tmp_path / "blocks" / "save.dat.json"
+    return src, dst, signature
+
+def update(src, dst, signature):
+    reported = []
+    result = delta_update(str(src), str(dst), str(signature), reported.append, BLOCK)
+    assert sum(reported) == src.stat().st_size
+    assert dst.read_bytes() == src.read_bytes()
+    assert dst.stat().st_mtime_ns == src.stat().st_mtime_ns
+    assert result.digest == hash_file(str(src))
+    return result
+
+def test_changed_block_in_the_middle_is_the_only_one_written(files):
+    src, dst, signature = files
+    dst.write_bytes(blocks(b"a", b"b", b"c", b"d"))
+    src.write_bytes(blocks(b"a", b"b", b"X", b"d"))
+    result = update(src, dst, signature)
+    assert (result.blocks_changed, result.bytes_written, result.block_count) == (1, BLOCK, 4)
+
+def test_grow_appends_new_blocks(files):
+    src, dst, signature = files
+    dst.write_bytes(blocks(b"a", b"b") + b"c" * 5)
+    src.write_bytes(blocks(b"a", b"b", b"c", b"d"))
+    result = update(src, dst, signature)
+    # The partial last block changed too
+    assert (result.blocks_changed, result.bytes_written, result.block_count) == (2, 2 * BLOCK, 4)
+
+def test_shrink_truncates_the_backup(files):
+    src, dst, signature = files
+    dst.write_bytes(blocks(b"a", b"b", b"c", b"d"))
+    src.write_bytes(blocks(b"a", b"b") + b"c" * 5)
+    result = update(src, dst, signature)
+    assert dst.stat().st_size == 2 * BLOCK + 5
+    assert (result.blocks_changed, result.bytes_written, result.block_count) == (1, 5, 3)
+
+def test_shrink_to_empty(files):
+    src, dst, signature = files
+    dst.write_bytes(blocks(b"a", b"b"))
+    src.write_bytes(b"")
+    result = update(src, dst, signature)
+    assert (result.blocks_changed, result.bytes_written, result.block_count) == (0, 0, 0)
+
+def test_signature_is_saved_and_used_on_the_next_run(files):
+    src, dst, signature = files
+    dst.write_bytes(blocks(b"a", b"b", b"c"))
+    src.write_bytes(blocks(b"a", b"b", b"X"))
+    update(src, dst, signature)
+    assert load_signature(str(signature), str(dst), BLOCK) == file_signature(str(dst), BLOCK)
+
+    src.write_bytes(blocks(b"a", b"Y", b"X"))
+    result = update(src, dst, signature)
+    assert (result.blocks_changed, result.bytes_written) == (1, BLOCK)
+
+def test_missing_signature_falls_back_to_reading_the_backup(files):
+    src, dst, signature = files
+    dst.write_bytes(blocks(b"a", b"b", b"c"))
+    src.write_bytes(blocks(b"a", b"b", b"c"))
+    assert not signature.exists()
+    result = update(src, dst, signature)
+    assert result.blocks_changed == 0
+    assert signature.exists()
+
+def test_signature_of_a_backup_changed_since_is_ignored(files):
+    src, dst, signature = files
+    dst.write_bytes(blocks(b"a", b"b", b"c"))
+    src.write_bytes(blocks(b"a", b"b", b"c"))
+    update(src, dst, signature)
+
+    # The backup copy is damaged after the signature was written; its mtime moves on
+    dst.write_bytes(blocks(b"a", b"Z", b"c"))
+    os.utime(dst, ns=(src.stat().st_mtime_ns + 5_000_000_000,) * 2)
+    assert load_signature(str(signature), str(dst), BLOCK) is None
+    result = update(src, dst, signature)
+    assert (result.blocks_changed, result.bytes_written) == (1, BLOCK)
+
+def test_signature_with_another_block_size_is_ignored(files):
+    src, dst, signature = files
+    dst.write_bytes(blocks(b"a", b"b"))
+    src.write_bytes(blocks(b"a", b"b"))
+    update(src, dst, signature)
+    data = json.loads(signature.read_text())
+    data["block_size"] = BLOCK * 2
+    signature.write_text(json.dumps(data))
+    assert load_signature(str(signature), str(dst), BLOCK) is None
+
+def test_unreadable_signature_is_ignored(files):
+    src, dst, signature = files
+    dst.write_bytes(blocks(b"a", b"b"))
+    src.write_bytes(blocks(b"a", b"X"))
+    signature.parent.mkdir()
+    signature.write_text("{not json")
+    result = update(src, dst, signature)
+    assert (result.blocks_changed, result.bytes_written) == (1, BLOCK)
+
+def manager():
+    return BackupManager(None, deleter=BackgroundDeleter())
+
+def test_backup_is_replaced_by_an_updated_copy(files):
+    src, dst, signature = files
+    dst.write_bytes(blocks(b"a", b"b", b"c"))
+    src.write_bytes(blocks(b"a", b"X", b"c"))
+    old_inode = dst.stat().st_ino
+    bm = manager()
+    assert bm.delta_copy_file(str(src), str(dst), str(signature))
+    bm.deleter.wait()
+    assert dst.read_bytes() == src.read_bytes()
+    assert dst.stat().st_ino != old_inode
+    assert os.listdir(dst.parent) == ["save.dat"]
+    assert bm._digests == {str(dst): hash_file(str(src))}
+    assert load_signature(str(signature), str(dst), backup.delta.DELTA_BLOCK_SIZE) is not None
+
+def test_interrupted_update_leaves_the_backup_whole(files, monkeypatch):
+    src, dst, signature = files
+    old = blocks(b"a", b"b", b"c")
+    dst.write_bytes(old)
+    src.write_bytes(blocks(b"a", b"X", b"c"))
+
+    def fail_halfway(src, dst, signature_path, report):
+        with open(dst, "r+b") as f:
+            f.write(b"X" * BLOCK)
+        raise OSError(28, "No space left on device")
+    monkeypatch.setattr(backup.backup_manager, "delta_update", fail_halfway)
+    bm = manager()
+    assert not bm.delta_copy_file(str(src), str(dst), str(signature))
+    bm.deleter.wait()
+    assert dst.read_bytes() == old
+    assert os.listdir(dst.parent) == ["save.dat"]
+
+def test_clone_file_keeps_data_and_mtime(tmp_path):
+    src = tmp_path / "a"
+    src.write_bytes(b"data" * 100)
+    os.utime(src, ns=(1_000_000_123, 1_000_000_123))
+    clone_file(str(src), str(tmp_path / "b"))
+    assert (tmp_path / "b").read_bytes() == src.read_bytes()
+    assert (tmp_path / "b").stat().st_mtime_ns == 1_000_000_123
@@ -0,0 +1,56 @@
+import errno
+import os
+import shutil
+
+import pytest
+
+from backup.backup_manager import BackupManager
+
+@pytest.fixture
+def snapshots(tmp_path):
+    """A savegame, its previous snapshot and where the next snapshot goes"""
+    src = tmp_path / "save"
+    (src / "slot").mkdir(parents=True)
+    for name in ("a.sav", "slot/b.sav", "slot/c.sav"):
+        (src / name).write_bytes(name.encode() * 100)
+    previous = tmp_path / "2024-01-01_10-00-00" / "save"
+    shutil.copytree(src, previous)
+    (src / "slot" / "c.sav").write_bytes(b"changed")
+    return src, previous, tmp_path / "2024-01-02_10-00-00" / "save"
+
+def link_failing_for(monkeypatch, error_number, names):
+    real_link = os.link
+
+    def link(src, dst):
+        if os.path.basename(dst) in names:
+            raise OSError(error_number, os.strerror(error_number))
+        real_link(src, dst)
+    monkeypatch.setattr(os, "link", link)
+
+def take_snapshot(src, previous, dst):
+    logged = []
+    manager = BackupManager(None, log_callback=logged.append)
+    manager.link_with_progress(str(src), str(dst), str(previous))
+    for name in ("a.sav", "slot/b.sav", "slot/c.sav"):
+        assert (dst / name).read_bytes() == (src / name).read_bytes()
+    linked = {name for name in ("a.sav", "slot/b.sav", "slot/c.sav")
+              if os.path.samefile(dst / name, previous / name)}
+    return linked, manager._bytes_written, logged
+
+def test_unchanged_files_are_linked_and_changed_ones_copied(snapshots):
+    linked, written, _ = take_snapshot(*snapshots)
+    assert linked == {"a.sav", "slot/b.sav"}
+    assert written == len(b"changed")
+
+def test_link_limit_copies_only_that_file(snapshots, monkeypatch):
+    link_failing_for(monkeypatch, errno.EMLINK, {"a.sav"})
+    linked, written, logged = take_snapshot(*snapshots)
+    assert linked == {"slot/b.sav"}
+    assert written == len(b"a.sav" * 100) + len(b"changed")
+    assert not any("not supported" in message for message in logged)
+
+def test_drive_without_hardlinks_copies_everything(snapshots, monkeypatch):
+    link_failing_for(monkeypatch, errno.EPERM, {"a.sav", "b.sav"})
+    linked, _, logged = take_snapshot(*snapshots)
+    assert linked == set()
+    assert any("Hardlinks are not supported" in message for message in logged)
@@ -0,0 +1,59 @@
+import os
+import shutil
+
+import pytest
+
+from backup.backup_manager import SAFETY_FOLDER_NAME, BackupManager
+
+@pytest.fixture
+def backup(tmp_path):
+    """A timestamped backup of a savegame folder and the live folder it came from"""
+    live = tmp_path / "live" / "Saves"
+    (live / "slot").mkdir(parents=True)
+    (live / "a.sav").write_text("a from backup")
+    (live / "slot" / "b.sav").write_text("b")
+    snapshot = tmp_path / "backups" / "Game" / "2024-01-01_10-00-00"
+    shutil.copytree(live, snapshot / "Saves")
+    return snapshot, live
+
+def safety_files(result):
+    root = result.safety_folder
+    return {os.path.relpath(os.path.join(folder, name), root).replace(os.sep, "/")
+            for folder, _, names in os.walk(root) for name in names}
+
+def test_changed_and_new_files_are_kept_in_before_restore(backup):
+    snapshot, live = backup
+    (live / "a.sav").write_text("a changed later")
+    (live / "slot" / "new.sav").write_text("added after the backup")
+
+    result = BackupManager(None).restore_backup(str(snapshot), str(live))
+    assert (result.restored, result.unchanged, result.removed) == (1, 1, 1)
+    assert (live / "a.sav").read_text() == "a from backup"
+    assert not (live / "slot" / "new.sav").exists()
+
+    # The safety folder sits in the game folder, next to the snapshots
+    assert os.path.dirname(result.safety_folder) == str(snapshot.parent / SAFETY_FOLDER_NAME)
+    assert safety_files(result) == {"Saves/a.sav", "Saves/slot/new.sav"}
+    assert open(os.path.join(result.safety_folder, "Saves", "a.sav")).read() == "a changed later"
+
+def test_unchanged_live_folder_is_left_alone(backup):
+    snapshot, live = backup
+    result = BackupManager(None).restore_backup(str(snapshot), str(live))
+    assert (result.restored, result.unchanged, result.removed, result.safety_folder) == (0, 2, 0, None)
+    assert not (snapshot.parent / SAFETY_FOLDER_NAME).exists()
+
+def test_missing_live_files_are_restored(backup):
+    snapshot, live = backup
+    shutil.rmtree(live)
+    result = BackupManager(None).restore_backup(str(snapshot), str(live))
+    assert (result.restored, result.unchanged, result.removed, result.safety_folder) == (2, 0, 0, None)
+    assert (live / "slot" / "b.sav").read_text() == "b"
+
+def test_same_size_file_with_another_mtime_is_restored_without_a_checksum(backup):
+    snapshot, live = backup
+    (live / "a.sav").write_text("a from BACKUP")
+    os.utime(live / "a.sav", ns=(5_000_000_000, 5_000_000_000))
+    result = BackupManager(None).restore_backup(str(snapshot), str(live))
+    assert result.restored == 1
+    assert (live / "a.sav").read_text() == "a from backup"
+    assert safety_files(result) == {"Saves/a.sav"}
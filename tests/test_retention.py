@@ -0,0 +1,174 @@
+import os
+
+import pytest
+
+import backup.backup_manager
+from backup.backup_manager import BackupManager
+from backup.retention import RetentionPolicy, select_snapshots_to_prune, snapshot_contents
+from backup.snapshot_store import SnapshotStore
+from backup.staging import BackgroundDeleter
+
+MB = 1024 * 1024
+
+def names(*stamps):
+    return [stamp.replace(" ", "_").replace(":", "-") for stamp in stamps]
+
+def test_no_snapshots_or_disabled_policy_prunes_nothing():
+    assert select_snapshots_to_prune([], {}, RetentionPolicy(keep_last=1)) == []
+    snapshots = names("2024-01-01 10:00:00", "2024-01-02 10:00:00")
+    assert select_snapshots_to_prune(snapshots, {}, RetentionPolicy()) == []
+
+def test_keep_last_prunes_oldest():
+    snapshots = names(*(f"2024-01-0{day} 10:00:00" for day in range(1, 6)))
+    assert select_snapshots_to_prune(snapshots, {}, RetentionPolicy(keep_last=2)) == snapshots[:3]
+
+def test_input_order_does_not_matter():
+    snapshots = names("2024-01-03 10:00:00", "2024-01-01 10:00:00", "2024-01-02 10:00:00")
+    assert select_snapshots_to_prune(snapshots, {}, RetentionPolicy(keep_last=1)) == sorted(snapshots)[:2]
+
+def test_keep_daily_keeps_newest_of_each_day_with_snapshots():
+    snapshots = names("2024-01-01 09:00:00", "2024-01-01 18:00:00",
+                      "2024-01-05 08:00:00", "2024-01-05 20:00:00",
+                      "2024-01-09 12:00:00")
+    # The last two days that have snapshots are Jan 9 and Jan 5; the gap days do not count
+    prune = select_snapshots_to_prune(snapshots, {}, RetentionPolicy(keep_daily=2))
+    assert prune == names("2024-01-01 09:00:00", "2024-01-01 18:00:00", "2024-01-05 08:00:00")
+
+def test_keep_daily_splits_at_midnight():
+    snapshots = names("2024-03-01 23:59:59", "2024-03-02 00:00:00")
+    assert select_snapshots_to_prune(snapshots, {}, RetentionPolicy(keep_daily=2)) == []
+    assert select_snapshots_to_prune(snapshots, {}, RetentionPolicy(keep_daily=1)) == snapshots[:1]
+
+def test_keep_weekly_uses_iso_weeks_across_new_year():
+    # Dec 28 2020 and Jan 3 2021 are both in ISO week 53 of 2020; Jan 4 2021 starts week 1
+    snapshots = names("2020-12-21 10:00:00", "2020-12-28 10:00:00", "2021-01-03 10:00:00",
+                      "2021-01-04 10:00:00")
+    prune = select_snapshots_to_prune(snapshots, {}, RetentionPolicy(keep_weekly=2))
+    assert prune == names("2020-12-21 10:00:00", "2020-12-28 10:00:00")
+
+def test_count_rules_are_combined():
+    snapshots = names("2024-01-01 10:00:00", "2024-01-02 10:00:00", "2024-01-02 11:00:00",
+                      "2024-01-03 10:00:00", "2024-01-03 11:00:00")
+    # keep_last keeps both of Jan 3, keep_daily adds the newest of Jan 2
+    prune = select_snapshots_to_prune(snapshots, {}, RetentionPolicy(keep_last=2, keep_daily=2))
+    assert prune == names("2024-01-01 10:00:00", "2024-01-02 10:00:00")
+
+def test_size_limit_alone_drops_oldest_until_total_fits():
+    snapshots = names("2024-01-01 10:00:00", "2024-01-02 10:00:00", "2024-01-03 10:00:00")
+    sizes = {name: MB for name in snapshots}
+    assert select_snapshots_to_prune(snapshots, sizes, RetentionPolicy(max_size_mb=2)) == snapshots[:1]
+    assert select_snapshots_to_prune(snapshots, sizes, RetentionPolicy(max_size_mb=3)) == []
+
+def test_size_limit_applies_to_snapshots_kept_by_count_rules():
+    snapshots = names(*(f"2024-01-0{day} 10:00:00" for day in range(1, 6)))
+    sizes = {name: MB for name in snapshots}
+    prune = select_snapshots_to_prune(snapshots, sizes, RetentionPolicy(keep_last=3, max_size_mb=2))
+    assert prune == snapshots[:3]
+
+def test_newest_snapshot_is_kept_even_over_the_size_limit():
+    snapshots = names("2024-01-01 10:00:00", "2024-01-02 10:00:00")
+    sizes = {name: 10 * MB for name in snapshots}
+    assert select_snapshots_to_prune(snapshots, sizes, RetentionPolicy(max_size_mb=1)) == snapshots[:1]
+
+def test_unmeasured_snapshots_count_as_empty():
+    snapshots = names("2024-01-01 10:00:00", "2024-01-02 10:00:00", "2024-01-03 10:00:00")
+    sizes = {snapshots[2]: 2 * MB}
+    assert select_snapshots_to_prune(snapshots, sizes, RetentionPolicy(max_size_mb=2)) == []
+
+def test_shared_files_count_once():
+    snapshots = names("2024-01-01 10:00:00", "2024-01-02 10:00:00", "2024-01-03 10:00:00")
+    # Every snapshot links the same 1 MB file and adds 100 KB of its own
+    contents = {name: {"shared": MB, name: 100 * 1024} for name in snapshots}
+    assert select_snapshots_to_prune(snapshots, {}, RetentionPolicy(max_size_mb=2), contents) == []
+
+def test_pruning_shared_snapshots_only_frees_their_own_files():
+    snapshots = names("2024-01-01 10:00:00", "2024-01-02 10:00:00", "2024-01-03 10:00:00")
+    contents = {name: {"shared": 2 * MB, name: MB} for name in snapshots}
+    # 5 MB in use; dropping the oldest frees 1 MB, the shared file stays with the others
+    prune = select_snapshots_to_prune(snapshots, {}, RetentionPolicy(max_size_mb=4), contents)
+    assert prune == snapshots[:1]
+    prune = select_snapshots_to_prune(snapshots, {}, RetentionPolicy(max_size_mb=3), contents)
+    assert prune == snapshots[:2]
+
+def test_policy_from_dict_ignores_bad_values():
+    policy = RetentionPolicy.from_dict({"keep_last": "3", "keep_daily": None, "keep_weekly": -2})
+    assert policy == RetentionPolicy(keep_last=3)
+    assert not RetentionPolicy.from_dict({}).enabled
+
+def test_snapshot_contents_matches_hardlinks(tmp_path):
+    first = tmp_path / "first"
+    second = tmp_path / "second" / "sub"
+    first.mkdir()
+    second.mkdir(parents=True)
+    (first / "save.dat").write_bytes(b"x" * 1000)
+    (first / "other.dat").write_bytes(b"y" * 10)
+    os.link(first / "save.dat", second / "save.dat")
+
+    first_contents = snapshot_contents(str(first))
+    second_contents = snapshot_contents(str(tmp_path / "second"))
+    assert sorted(first_contents.values()) == [10, 1000]
+    assert list(second_contents.values()) == [1000]
+    assert set(second_contents) < set(first_contents)
+
+class Config:
+    def __init__(self, policy):
+        self.policy = policy
+
+    def get_game_id_by_title(self, title):
+        return "1"
+
+    def get_retention_policy(self, game_id):
+        return self.policy
+
+@pytest.fixture
+def measured(monkeypatch):
+    """Folders snapshot_contents walks during a test"""
+    walked = []
+
+    def counting(folder):
+        walked.append(os.path.basename(folder))
+        return snapshot_contents(folder)
+    monkeypatch.setattr(backup.backup_manager, "snapshot_contents", counting)
+    return walked
+
+def retain(game_folder, policy):
+    deleter = BackgroundDeleter()
+    manager = BackupManager(Config(policy), deleter=deleter)
+    prune = manager.apply_retention("Game", str(game_folder))
+    deleter.wait()
+    return prune
+
+def test_retention_measures_each_hardlinked_snapshot_once(tmp_path, measured):
+    first, second, third = names("2024-01-01 10:00:00", "2024-01-02 10:00:00", "2024-01-03 10:00:00")
+    for name in (first, second, third):
+        (tmp_path / name).mkdir()
+    (tmp_path / first / "save.dat").write_bytes(b"x" * (600 * 1024))
+    os.link(tmp_path / first / "save.dat", tmp_path / second / "save.dat")
+    (tmp_path / second / "small.dat").write_bytes(b"y" * 10)
+    (tmp_path / third / "save.dat").write_bytes(b"z" * 10)
+
+    assert retain(tmp_path, {"max_size_mb": 1}) == []
+    assert sorted(measured) == [first, second, third]
+
+    # A new 600 KB file pushes the total over 1 MB; the shared file is only freed with both older snapshots
+    fourth = names("2024-01-04 10:00:00")[0]
+    (tmp_path / fourth).mkdir()
+    (tmp_path / fourth / "save.dat").write_bytes(b"w" * (600 * 1024))
+    del measured[:]
+    assert retain(tmp_path, {"max_size_mb": 1}) == [first, second]
+    assert measured == [fourth]
+    assert sorted(os.listdir(tmp_path)) == sorted([".sweet-progress", third, fourth])
+
+def test_retention_measures_store_snapshots_from_their_manifests(tmp_path, measured):
+    snapshots = names("2024-01-01 10:00:00", "2024-01-02 10:00:00", "2024-01-03 10:00:00")
+    files = [{"a" * 64: 600 * 1024}, {"a" * 64: 600 * 1024, "b" * 64: 10}, {"c" * 64: 600 * 1024}]
+    store = SnapshotStore(str(tmp_path))
+    for name, objects in zip(snapshots, files):
+        (tmp_path / name).mkdir()
+        store.write_manifest(name, {"name": name, "directories": [], "files": [
+            {"path": digest[:4], "hash": digest, "size": size, "mtime_ns": 0, "mode": 0o644}
+            for digest, size in objects.items()]})
+
+    assert retain(tmp_path, {"max_size_mb": 1}) == snapshots[:2]
+    assert measured == []
+    assert store.list_snapshots() == snapshots[2:]
@@ -0,0 +1,76 @@
+import errno
+import os
+
+import pytest
+
+from backup.backup_manager import BackupManager
+from backup.snapshot_store import SnapshotStore
+
+NAME = "2024-01-01_10-00-00"
+
+@pytest.fixture
+def source(tmp_path):
+    folder = tmp_path / "save"
+    (folder / "slot").mkdir(parents=True)
+    (folder / "a.sav").write_bytes(b"a" * 100)
+    (folder / "slot" / "b.sav").write_bytes(b"b" * 200)
+    (folder / "slot" / "c.sav").write_bytes(b"c" * 300)
+    return folder
+
+def snapshot(tmp_path, source):
+    game_folder = tmp_path / "backups" / "Game"
+    view = game_folder / NAME
+    view.mkdir(parents=True)
+    manager = BackupManager(None)
+    manager.create_snapshot(str(game_folder), NAME, str(view), [(str(source), "Folder")])
+    return SnapshotStore(str(game_folder)), view, manager
+
+def failing_link(error_number, fail_calls):
+    """os.link that raises error_number on the given calls (1-based)"""
+    real_link = os.link
+    calls = 0
+
+    def link(src, dst):
+        nonlocal calls
+        calls += 1
+        if calls in fail_calls:
+            raise OSError(error_number, os.strerror(error_number))
+        real_link(src, dst)
+    return link
+
+def contents(folder):
+    return {path.relative_to(folder).as_posix(): path.read_bytes() for path in folder.rglob("*.sav")}
+
+def test_view_is_hardlinked_to_store_objects(tmp_path, source):
+    store, view, _ = snapshot(tmp_path, source)
+    assert contents(view / "save") == contents(source)
+    record = store.load_manifest(NAME)["files"][0]
+    assert os.path.samefile(view / record["path"], store.object_path(record["hash"]))
+
+def test_link_limit_copies_only_that_file(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(os, "link", failing_link(errno.EMLINK, {2}))
+    store, view, manager = snapshot(tmp_path, source)
+    assert contents(view / "save") == contents(source)
+    records = store.load_manifest(NAME)["files"]
+    linked = [os.path.samefile(view / record["path"], store.object_path(record["hash"])) for record in records]
+    assert linked == [True, False, True]
+    # Stored objects plus the one copied into the view
+    assert manager._bytes_written == 600 + records[1]["size"]
+
+def test_no_hardlinks_copies_every_file(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(os, "link", failing_link(errno.EPERM, {1, 2, 3}))
+    store, view, _ = snapshot(tmp_path, source)
+    assert contents(view / "save") == contents(source)
+    for record in store.load_manifest(NAME)["files"]:
+        assert not os.path.samefile(view / record["path"], store.object_path(record["hash"]))
+
+def test_failed_view_is_removed_with_its_manifest(tmp_path, source, monkeypatch):
+    def copy2(src, dst, **kwargs):
+        raise OSError(errno.ENOSPC, "No space left on device")
+    monkeypatch.setattr(os, "link", failing_link(errno.EMLINK, {2}))
+    monkeypatch.setattr("shutil.copy2", copy2)
+    with pytest.raises(Exception, match="Snapshot operation failed"):
+        snapshot(tmp_path, source)
+    game_folder = tmp_path / "backups" / "Game"
+    assert not (game_folder / NAME).exists()
+    assert SnapshotStore(str(game_folder)).list_snapshots() == []
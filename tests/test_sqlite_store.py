@@ -0,0 +1,114 @@
+import os
+import sqlite3
+
+import pytest
+
+from config.config_manager import ConfigManager
+from config.storage import MIGRATED_SUFFIX, BackupRun, ConfigChanges, JsonConfigStore, SqliteConfigStore
+
+def run(game_id, timestamp, written=0):
+    return BackupRun(game_id, timestamp, "/backups/" + game_id, 100, 2, 1.5, "success", None, written)
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "savegame_config.db"), str(tmp_path / "savegame_config.json")
+
+def game(gid, title):
+    return {"id": gid, "game_title": title, "savegame_location": "/saves/" + title, "backup_location": "/backups"}
+
+def test_json_config_and_runs_are_migrated(paths):
+    db_path, json_path = paths
+    config = {"games": {"g1": game("g1", "One"), "g2": game("g2", "Two")},
+              "backup_history": {"g1": "2024-01-02 10:00:00"}, "last_used": {}, "preferences": {"compact_config": True}}
+    json_store = JsonConfigStore(json_path)
+    json_store.save(config)
+    json_store.append_run(run("g1", "2024-01-01 10:00:00"))
+    json_store.append_run(run("g1", "2024-01-02 10:00:00", written=40))
+
+    store = SqliteConfigStore(db_path, json_path)
+    assert store.load() == config
+    store.close()
+    assert not os.path.exists(json_path)
+    assert os.path.exists(json_path + MIGRATED_SUFFIX)
+
+    # The second open reads the database, not the JSON file
+    store = SqliteConfigStore(db_path, json_path)
+    loaded = store.load()
+    assert loaded == config
+    assert list(loaded["games"]) == ["g1", "g2"]
+    assert store.query_runs("g1") == [run("g1", "2024-01-01 10:00:00"), run("g1", "2024-01-02 10:00:00", 40)]
+    store.close()
+
+def test_without_a_json_config_there_is_nothing_to_load(paths):
+    store = SqliteConfigStore(*paths)
+    assert store.load() is None
+    store.close()
+
+def test_incremental_save_keeps_order_and_removes_deleted_games(paths):
+    store = SqliteConfigStore(*paths)
+    store.load()
+    config = {"games": {"g1": game("g1", "One"), "g2": game("g2", "Two")}, "backup_history": {}}
+    store.save(config)
+
+    changes = ConfigChanges()
+    config["games"]["g1"]["game_title"] = "One Renamed"
+    config["games"]["g3"] = game("g3", "Three")
+    del config["games"]["g2"]
+    config["backup_history"]["g3"] = "2024-01-03 10:00:00"
+    changes.games |= {"g1", "g2", "g3"}
+    changes.history.add("g3")
+    store.save(config, changes)
+    store.close()
+
+    store = SqliteConfigStore(*paths)
+    loaded = store.load()
+    assert list(loaded["games"]) == ["g1", "g3"]
+    assert loaded["games"]["g1"]["game_title"] == "One Renamed"
+    assert loaded["backup_history"] == {"g3": "2024-01-03 10:00:00"}
+    store.close()
+
+def test_query_runs_by_period_and_limit(paths):
+    store = SqliteConfigStore(*paths)
+    for day in range(1, 6):
+        store.append_run(run("g1", f"2024-01-0{day} 10:00:00"))
+    store.append_run(run("g2", "2024-01-03 10:00:00"))
+    in_period = store.query_runs("g1", "2024-01-02 00:00:00", "2024-01-04 23:59:59")
+    assert [r.timestamp[:10] for r in in_period] == ["2024-01-02", "2024-01-03", "2024-01-04"]
+    assert [r.timestamp[:10] for r in store.query_runs("g1", limit=2)] == ["2024-01-04", "2024-01-05"]
+    store.delete_runs("g1")
+    assert store.query_runs("g1") == []
+    assert len(store.query_runs("g2")) == 1
+    store.close()
+
+def test_run_table_without_written_column_is_upgraded(paths):
+    db_path, _ = paths
+    connection = sqlite3.connect(db_path)
+    connection.execute("CREATE TABLE backup_runs (game_id TEXT NOT NULL, timestamp TEXT NOT NULL, path TEXT NOT NULL, "
+                       "size INTEGER NOT NULL, file_count INTEGER NOT NULL, duration REAL NOT NULL, "
+                       "outcome TEXT NOT NULL, error TEXT)")
+    connection.execute("INSERT INTO backup_runs VALUES ('g1', '2024-01-01 10:00:00', '/b', 100, 2, 1.5, 'success', NULL)")
+    connection.commit()
+    connection.close()
+
+    store = SqliteConfigStore(*paths)
+    assert store.query_runs("g1") == [BackupRun("g1", "2024-01-01 10:00:00", "/b", 100, 2, 1.5, "success", None, 0)]
+    store.close()
+
+def test_config_manager_switches_from_json_to_sqlite(paths, monkeypatch):
+    db_path, json_path = paths
+    manager = ConfigManager(JsonConfigStore(json_path))
+    manager.add_game("One", "/saves/One", "/backups")
+    gid = manager.get_game_id_by_title("One")
+    manager.record_backup_run(gid, "2024-01-01 10:00:00", "/backups/One", 100, 2, 1.5, "success")
+    manager.flush()
+
+    monkeypatch.setattr("config.config_manager.create_store", lambda backend: SqliteConfigStore(db_path, json_path))
+    manager.switch_storage("sqlite")
+    assert manager.store.name == "sqlite"
+    assert not os.path.exists(json_path)
+    manager.store.close()
+
+    reopened = ConfigManager(SqliteConfigStore(db_path, json_path))
+    assert reopened.get_game_id_by_title("One") == gid
+    assert [r.timestamp for r in reopened.get_backup_runs(gid)] == ["2024-01-01 10:00:00"]
+    reopened.store.close()
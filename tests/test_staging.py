@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from backup.backup_manager import BackupManager
+from backup.staging import (REPLACED_PREFIX, STAGING_PREFIX, BackgroundDeleter, clear_leftovers, staging_path,
+                            swap_into_place)
+
+@pytest.fixture
+def deleter():
+    return BackgroundDeleter()
+
+def make_folder(path, text):
+    path.mkdir()
+    (path / "save.dat").write_text(text)
+
+def test_swap_into_an_empty_place(tmp_path, deleter):
+    staged = tmp_path / (STAGING_PREFIX + "Saves")
+    make_folder(staged, "new")
+    assert not swap_into_place(str(staged), str(tmp_path / "Saves"), deleter)
+    assert (tmp_path / "Saves" / "save.dat").read_text() == "new"
+
+def test_swap_replaces_a_folder_and_deletes_the_old_one_in_the_background(tmp_path, deleter):
+    destination = tmp_path / "Saves"
+    make_folder(destination, "old")
+    staged = tmp_path / (STAGING_PREFIX + "Saves")
+    make_folder(staged, "new")
+    assert swap_into_place(str(staged), str(destination), deleter)
+    assert (destination / "save.dat").read_text() == "new"
+    deleter.wait()
+    assert os.listdir(tmp_path) == ["Saves"]
+
+def test_swap_replaces_a_file(tmp_path, deleter):
+    destination = tmp_path / "save.dat"
+    destination.write_text("old")
+    staged = tmp_path / (STAGING_PREFIX + "save.dat")
+    staged.write_text("new")
+    assert swap_into_place(str(staged), str(destination), deleter)
+    assert destination.read_text() == "new"
+    assert os.listdir(tmp_path) == ["save.dat"]
+
+def test_failed_swap_puts_the_old_backup_back(tmp_path, deleter, monkeypatch):
+    destination = tmp_path / "Saves"
+    make_folder(destination, "old")
+    staged = tmp_path / (STAGING_PREFIX + "Saves")
+    make_folder(staged, "new")
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if src == str(staged):
+            raise OSError("staged copy is locked")
+        real_replace(src, dst)
+    monkeypatch.setattr(os, "replace", replace)
+    with pytest.raises(OSError):
+        swap_into_place(str(staged), str(destination), deleter)
+    assert (destination / "save.dat").read_text() == "old"
+    assert not any(name.startswith(REPLACED_PREFIX) for name in os.listdir(tmp_path))
+
+def test_clear_leftovers_removes_staging_and_replaced_copies(tmp_path, deleter):
+    destination = tmp_path / "Saves"
+    make_folder(destination, "current")
+    make_folder(tmp_path / (STAGING_PREFIX + "Saves"), "interrupted")
+    make_folder(tmp_path / f"{REPLACED_PREFIX}0123abcd-Saves", "replaced")
+    make_folder(tmp_path / f"{REPLACED_PREFIX}0123abcd-Other", "another backup")
+    clear_leftovers(str(destination), deleter)
+    deleter.wait()
+    assert sorted(os.listdir(tmp_path)) == sorted(["Saves", f"{REPLACED_PREFIX}0123abcd-Other"])
+
+def test_failed_copy_keeps_the_old_backup(tmp_path, deleter):
+    destination = tmp_path / "Saves"
+    make_folder(destination, "old")
+    manager = BackupManager(None, deleter=deleter)
+
+    def write_copy(staged):
+        assert staged == staging_path(str(destination))
+        make_folder(tmp_path / os.path.basename(staged), "half")
+        raise OSError("disk full")
+    with pytest.raises(OSError):
+        manager.replace_with_copy(str(destination), write_copy)
+    deleter.wait()
+    assert (destination / "save.dat").read_text() == "old"
+    assert os.listdir(tmp_path) == ["Saves"]
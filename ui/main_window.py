@@ -1,8 +1,9 @@
 import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from datetime import datetime
-import webbrowser
 
 from config.config_manager import ConfigManager
 from backup.backup_manager import BackupManager
@@ -12,9 +13,14 @@ from utils.logger import logger
 from utils.exceptions import SweetProgressError
 from utils.constants import (
     APP_NAME, WINDOW_WIDTH, WINDOW_HEIGHT, MIN_WINDOW_WIDTH, MIN_WINDOW_HEIGHT,
-    MAX_LOG_LINES, MAX_RECENT_GAMES, DEFAULT_AUTHOR
+    MAX_LOG_LINES, MAX_RECENT_GAMES, UI_POLL_INTERVAL_MS
 )
-from ui.windows import GameListWindow, CreditSettingWindow, PreferencesWindow
+from ui.windows import GameListWindow, CreditSettingWindow, PreferencesWindow, BatchBackupWindow
+
+def open_url(url):
+    """Open url in the default browser; webbrowser is only imported when a link is clicked"""
+    import webbrowser
+    webbrowser.open_new(url)
 
 class ToolTip:
     """Create a tooltip for a given widget"""
@@ -88,6 +94,8 @@ class SaveGameBackupApp:
         backup_submenu.add_checkbutton(label="Single Backup", command=getattr(self, 'single_backup', lambda: None), variable=self.single_backup_var, state="disabled")
         backup_submenu.add_command(label="Batch Backup", command=getattr(self, 'batch_backup', lambda: None))
         option_menu.add_cascade(label="Backup", menu=backup_submenu)
+        option_menu.add_command(label="Restore Backup", command=getattr(self, 'restore_backup', lambda: None))
+        option_menu.add_command(label="Verify Backups", command=getattr(self, 'verify_backups', lambda: None))
         option_menu.add_separator()
         option_menu.add_command(label="Preferences", command=getattr(self, 'show_preferences', lambda: None))
         self.menu_bar.add_cascade(label="Option", menu=option_menu)
@@ -96,7 +104,7 @@ class SaveGameBackupApp:
         about_menu = tk.Menu(self.menu_bar, tearoff=0)
         about_menu.add_command(label="Info", command=getattr(self, 'show_about', lambda: None))
         about_menu.add_separator()
-        about_menu.add_command(label="GitHub", command=lambda: webbrowser.open_new("https://github.com/Smothyze/sweet-progress"))
+        about_menu.add_command(label="GitHub", command=lambda: open_url("https://github.com/Smothyze/sweet-progress"))
         self.menu_bar.add_cascade(label="About", menu=about_menu)
         self.root.config(menu=self.menu_bar)
         
@@ -115,10 +123,14 @@ class SaveGameBackupApp:
         # Validate last_used after config is loaded
         self.config_manager.validate_last_used()
         
+        # Backups run on a worker thread; its events reach the UI through this queue
+        self._ui_events = queue.Queue()
+        self._backup_thread = None
+        self._on_task_finished = None
         self.backup_manager = BackupManager(
             self.config_manager,
-            progress_callback=self.update_progress,
-            log_callback=self.log
+            progress_callback=lambda progress: self._ui_events.put(("progress", progress)),
+            log_callback=lambda message: self._ui_events.put(("log", message))
         )
         
         # Initialize windows
@@ -128,7 +140,6 @@ class SaveGameBackupApp:
         
         # Stub methods to prevent attribute errors if menu items are clicked
         self.single_backup = lambda: None
-        self.batch_backup = lambda: None
         self.show_preferences = self.preferences_window.show
         self.show_about = lambda: messagebox.showinfo("About", "Sweet Progress")
         
@@ -241,7 +252,7 @@ class SaveGameBackupApp:
                 self._selected_game_id = game_id
             else:
                 # Game no longer exists, clear last_used
-                self.config_manager.config["last_used"] = {}
+                self.config_manager.clear_last_used()
         
         # Load preferences
         self.load_preferences()
@@ -346,13 +357,13 @@ class SaveGameBackupApp:
             # Remove first 100 lines when limit is exceeded
             self.log_text.delete("1.0", "101.0")
             self.log_line_count -= 100
-        
-        self.root.update()
     
     def update_progress(self, progress):
         """Update progress bar"""
         self.progress_var.set(progress)
-        self.root.update()
+    
+    def is_backup_running(self):
+        return self._backup_thread is not None and self._backup_thread.is_alive()
     
     def on_location_type_changed(self, event=None):
         """(Deprecated) Kept for backward compatibility with older UI."""
@@ -493,6 +504,8 @@ class SaveGameBackupApp:
         self.add_path_row()
     
     def create_backup(self):
+        if self.is_backup_running():
+            return
         game_title = self.game_title.get().strip()
         backup_location = self.backup_location.get().strip()
         items = self._get_current_paths()
@@ -535,6 +548,22 @@ class SaveGameBackupApp:
             self.show_error_dialog("Error", f"Backup location is not writable: {str(e)}")
             return
             
+        # Ensure each path matches its selected mode
+        for it in items:
+            mode = it["mode"]
+            if mode == "Folder" and not os.path.isdir(it["path"]):
+                if len(items) == 1:
+                    self.show_error_dialog("Error", "Selected path is not a folder. Please switch mode to File or pick a folder.")
+                else:
+                    self.show_error_dialog("Error", f"Not a folder: {it['path']}")
+                return
+            if mode == "File" and not os.path.isfile(it["path"]):
+                if len(items) == 1:
+                    self.show_error_dialog("Error", "Selected path is not a file. Please switch mode to Folder or pick a file.")
+                else:
+                    self.show_error_dialog("Error", f"Not a file: {it['path']}")
+                return
+            
         try:
             # Persist only the first path for backward compatibility
             first_path = items[0]["path"] if items else ""
@@ -547,66 +576,90 @@ class SaveGameBackupApp:
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             self.config_manager.update_backup_history(gid, current_time)
             self.config_manager.save_config()
-            self.log(f"Starting backup for {game_title}...")
-            
-            # Show progress bar
-            self.progress_bar.grid()
-            self.progress_var.set(0)
-            self.root.update()
-            
-            # Get author from config or use default
-            author = self.config_manager.config.get("last_used", {}).get("author", "").strip()
-            if not author:
-                if "last_used" in self.config_manager.config and "author" in self.config_manager.config["last_used"]:
-                    author = ""
-                else:
-                    author = DEFAULT_AUTHOR
-            
-            # If only one item, call single path API to retain credit format; else use multiple
-            if len(items) == 1:
-                single = items[0]
-                mode = single["mode"]
-                # Extra validation: ensure path type matches selected mode
-                if mode == "Folder" and not os.path.isdir(single["path"]):
-                    self.show_error_dialog("Error", "Selected path is not a folder. Please switch mode to File or pick a folder.")
-                    return
-                if mode == "File" and not os.path.isfile(single["path"]):
-                    self.show_error_dialog("Error", "Selected path is not a file. Please switch mode to Folder or pick a file.")
-                    return
-                self.backup_manager.create_backup(
-                    game_title, single["path"], backup_location,
-                    self.timestamp_option.get(), self.path_display_option.get(),
-                    author, self._credit_note, mode
-                )
+        except Exception as e:
+            self.log(f"Error: {str(e)}")
+            self.show_backup_error_dialog(str(e))
+            return
+        self.log(f"Starting backup for {game_title}...")
+        
+        # Get author from config or use default
+        author = self.config_manager.get_author()
+        
+        # If only one item, call single path API to retain credit format; else use multiple
+        if len(items) == 1:
+            single = items[0]
+            backup_args = (
+                self.backup_manager.create_backup,
+                game_title, single["path"], backup_location,
+                self.timestamp_option.get(), self.path_display_option.get(),
+                author, self._credit_note, single["mode"]
+            )
+        else:
+            # All items are copied together into one backup folder with one Readme.txt
+            backup_args = (
+                self.backup_manager.create_backup_multiple,
+                game_title, items, backup_location,
+                self.timestamp_option.get(), self.path_display_option.get(),
+                author, self._credit_note
+            )
+        
+        backup_function, *args = backup_args
+        self._start_backup_task(
+            lambda: backup_function(*args),
+            lambda kind, payload: self._on_backup_finished(kind, payload, backup_location)
+        )
+    
+    def _start_backup_task(self, task, on_finished):
+        """Run task on a worker thread and call on_finished(kind, payload) on the Tk thread afterwards"""
+        # Show progress bar and keep the button disabled until the task is done
+        self.progress_bar.grid()
+        self.progress_var.set(0)
+        self.create_backup_btn.state(["disabled"])
+        self._on_task_finished = on_finished
+        
+        self._backup_thread = threading.Thread(target=self._run_task, args=(task,), daemon=False)
+        self._backup_thread.start()
+        self.root.after(UI_POLL_INTERVAL_MS, self._process_ui_events)
+    
+    def _run_task(self, task):
+        """Worker thread body; the UI is only touched through the event queue"""
+        try:
+            self._ui_events.put(("done", task()))
+        except Exception as e:
+            self._ui_events.put(("error", str(e)))
+    
+    def _process_ui_events(self):
+        """Apply events from the backup thread, then reschedule while it runs"""
+        progress = None
+        finished = None
+        while True:
+            try:
+                kind, payload = self._ui_events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                # Only the newest value matters for the progress bar
+                progress = payload
+            elif kind == "log":
+                self.log(payload)
             else:
-                # Mixed multiple items
-                # Prepare method on BackupManager lazily (fallback to per item if not available)
-                if hasattr(self.backup_manager, 'create_backup_multiple'):
-                    self.backup_manager.create_backup_multiple(
-                        game_title, items, backup_location,
-                        self.timestamp_option.get(), self.path_display_option.get(),
-                        author, self._credit_note
-                    )
-                else:
-                    # Fallback: sequentially back up into same base folder using single API
-                    for it in items:
-                        mode = it["mode"]
-                        if mode == "Folder" and not os.path.isdir(it["path"]):
-                            self.show_error_dialog("Error", f"Not a folder: {it['path']}")
-                            return
-                        if mode == "File" and not os.path.isfile(it["path"]):
-                            self.show_error_dialog("Error", f"Not a file: {it['path']}")
-                            return
-                        self.backup_manager.create_backup(
-                            game_title, it["path"], backup_location,
-                            self.timestamp_option.get(), self.path_display_option.get(),
-                            author, self._credit_note, mode
-                        )
-            
-            # Hide progress bar
-            self.progress_bar.grid_remove()
-            self.progress_var.set(0)
-            
+                finished = (kind, payload)
+        if progress is not None:
+            self.update_progress(progress)
+        
+        if finished is None:
+            self.root.after(UI_POLL_INTERVAL_MS, self._process_ui_events)
+            return
+        
+        self._backup_thread = None
+        # Hide progress bar
+        self.progress_bar.grid_remove()
+        self.progress_var.set(0)
+        self.validate_inputs()
+        self._on_task_finished(*finished)
+    
+    def _on_backup_finished(self, kind, payload, backup_location):
+        if kind == "done":
             # Update dropdown values after successful backup
             self.update_dropdown_values()
             # Enable list button if backup was successful
@@ -614,11 +667,97 @@ class SaveGameBackupApp:
             
             # Show custom success dialog with "Open Folder" button
             self.show_backup_success_dialog(backup_location)
-        except Exception as e:
-            self.log(f"Error: {str(e)}")
-            self.show_backup_error_dialog(str(e))
-            self.progress_bar.grid_remove()
-            self.progress_var.set(0)
+        else:
+            self.log(f"Error: {payload}")
+            self.show_backup_error_dialog(payload)
+    
+    def restore_backup(self):
+        """Handle Restore Backup menu selection"""
+        if self.is_backup_running():
+            self.show_info_dialog("Restore Backup", "Please wait until the current backup has finished.")
+            return
+        game_title = self.game_title.get().strip()
+        items = self._get_current_paths()
+        if not game_title or not items:
+            self.show_info_dialog("Restore Backup", "Select a game with its savegame location first.")
+            return
+        backup_location = self._get_default_backup_directory() or self.backup_location.get().strip()
+        game_folder = os.path.join(backup_location, game_title) if backup_location else ""
+        folder = filedialog.askdirectory(title="Select Backup to Restore",
+                                         initialdir=game_folder if game_folder and os.path.isdir(game_folder) else None)
+        if not folder:
+            return
+        
+        # Only restore the savegame paths this backup actually contains
+        targets = [it["path"] for it in items
+                   if os.path.exists(os.path.join(folder, os.path.basename(it["path"].rstrip("/\\"))))]
+        if not targets:
+            self.show_error_dialog("Error", f"The selected folder does not contain a backup of {game_title}.")
+            return
+        if not messagebox.askyesno(
+                "Restore Backup",
+                f"Restore {game_title} from:\n{folder}\n\n"
+                f"Files that are overwritten or removed are kept in the \"Before Restore\" folder.",
+                parent=self.root):
+            return
+        
+        self.log(f"Restoring {game_title} from: {folder}")
+        self._start_backup_task(
+            lambda: [self.backup_manager.restore_backup(folder, path) for path in targets],
+            self._on_restore_finished
+        )
+    
+    def _on_restore_finished(self, kind, payload):
+        if kind != "done":
+            self.log(f"Error: {payload}")
+            self.show_error_dialog("Error", payload)
+            return
+        restored = sum(result.restored for result in payload)
+        removed = sum(result.removed for result in payload)
+        message = f"Restore complete: {restored} files restored, {removed} removed."
+        safety_folders = [result.safety_folder for result in payload if result.safety_folder]
+        if safety_folders:
+            message += "\n\nPrevious files were kept in:\n" + "\n".join(safety_folders)
+        self.show_info_dialog("Restore Backup", message)
+    
+    def verify_backups(self):
+        """Handle Verify Backups menu selection"""
+        if self.is_backup_running():
+            self.show_info_dialog("Verify Backups", "Please wait until the current backup has finished.")
+            return
+        initial_dir = self._get_default_backup_directory() or self.backup_location.get().strip()
+        folder = filedialog.askdirectory(title="Select Backup Folder to Verify",
+                                         initialdir=initial_dir if initial_dir and os.path.isdir(initial_dir) else None)
+        if not folder:
+            return
+        self.log(f"Verifying backups in: {folder}")
+        self._start_backup_task(
+            lambda: self.backup_manager.verify_backups(folder),
+            self._on_verify_finished
+        )
+    
+    def _on_verify_finished(self, kind, payload):
+        if kind != "done":
+            self.log(f"Error: {payload}")
+            self.show_error_dialog("Error", payload)
+            return
+        results = payload
+        if not results:
+            self.show_info_dialog("Verify Backups", "No backups with checksums were found in this folder.")
+            return
+        checked = sum(result.checked for result in results)
+        bad = [result for result in results if not result.ok]
+        if not bad:
+            self.show_info_dialog("Verify Backups", f"All {len(results)} backups are intact ({checked} files checked).")
+            return
+        lines = []
+        for result in bad:
+            lines.extend(f"Missing: {os.path.join(result.folder, path)}" for path in result.missing)
+            lines.extend(f"Corrupt: {os.path.join(result.folder, path)}" for path in result.corrupt)
+        for line in lines:
+            self.log(line)
+        details = "\n".join(lines[:10]) + (f"\n... and {len(lines) - 10} more" if len(lines) > 10 else "")
+        self.show_error_dialog("Verify Backups", f"{len(bad)} of {len(results)} backups have problems:\n\n{details}")
     
     def show_game_list_window(self):
         """Show game list window"""
@@ -712,7 +851,7 @@ class SaveGameBackupApp:
         if default_backup_dir:
             backup_location = default_backup_dir
         
-        if game_title and items and backup_location:
+        if game_title and items and backup_location and not self.is_backup_running():
             self.create_backup_btn.state(["!disabled"])
         else:
             self.create_backup_btn.state(["disabled"])
@@ -1134,7 +1273,7 @@ class SaveGameBackupApp:
         
         link = tk.Label(created_by_container, text="Smothy", font=("Segoe UI", 9, "underline"), fg="blue", cursor="hand2")
         link.pack(side=tk.LEFT)
-        link.bind("<Button-1>", lambda e: webbrowser.open_new("https://guns.lol/smothyze"))
+        link.bind("<Button-1>", lambda e: open_url("https://guns.lol/smothyze"))
         
         # Buttons area
         button_frame = ttk.Frame(main_frame)
@@ -1174,8 +1313,23 @@ class SaveGameBackupApp:
     def batch_backup(self):
         """Handle Batch Backup menu selection"""
         self.log("Batch Backup option selected from Option menu")
-        # TODO: Implement batch backup functionality
-        self.show_info_dialog("Batch Backup", "Batch Backup functionality will be implemented in future versions.")
+        if self.is_backup_running():
+            self.show_info_dialog("Batch Backup", "Please wait until the current backup has finished.")
+            return
+        if not self.config_manager.config["games"]:
+            self.show_info_dialog("Batch Backup", "There are no games in the list yet. Create a backup first.")
+            return
+        BatchBackupWindow(
+            self.root,
+            self.config_manager,
+            log_callback=self.log,
+            on_finished_callback=self.on_batch_backup_finished
+        )
+    
+    def on_batch_backup_finished(self, results):
+        """Callback when a batch backup run has finished"""
+        self.update_dropdown_values()
+        self.validate_list_button()
     
     def show_preferences(self):
         """Show preferences window"""
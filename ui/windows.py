@@ -1,9 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
+import queue
+import threading
+from datetime import datetime, timedelta
 from utils.resource_utils import ICON_PATH
 from utils.path_utils import detect_game_directory, mask_game_path_in_savegame_location, normalize_path_for_display
-from utils.constants import DEFAULT_AUTHOR
+from utils.constants import ARCHIVE_FORMATS, SNAPSHOT_MODES, UI_POLL_INTERVAL_MS, get_default_author
+from backup.batch_backup import BatchBackup
 
 # Utility function for consistent toplevel window creation
 def create_toplevel_window(parent, title, geometry, icon_path=ICON_PATH):
@@ -70,9 +74,11 @@ class GameListWindow:
         self.select_btn = ttk.Button(btn_frame, text="Select", command=self.select_game, state=tk.DISABLED)
         self.rename_btn = ttk.Button(btn_frame, text="Rename", command=self.rename_game, state=tk.DISABLED)
         self.delete_btn = ttk.Button(btn_frame, text="Delete", command=self.delete_game, state=tk.DISABLED)
+        self.history_btn = ttk.Button(btn_frame, text="History", command=self.show_history, state=tk.DISABLED)
         self.select_btn.pack(side=tk.LEFT, padx=5)
         self.rename_btn.pack(side=tk.LEFT, padx=5)
         self.delete_btn.pack(side=tk.LEFT, padx=5)
+        self.history_btn.pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Close", command=self.window.destroy).pack(side=tk.RIGHT, padx=5)
 
         # Bind events
@@ -87,22 +93,17 @@ class GameListWindow:
         for item in self.tree.get_children():
             self.tree.delete(item)
         
-        # Get games with their last backup time
-        games_with_time = []
-        for gid, game in self.config_manager.config["games"].items():
-            game_title = game.get("game_title", gid)
-            last_backup_time = self.config_manager.config.get("backup_history", {}).get(gid, "Never")
-            games_with_time.append((gid, game_title, last_backup_time))
-        
-        # Sort based on selected option
+        # Sort based on selected option; the recency order is kept by the config manager
+        history = self.config_manager.config.get("backup_history", {})
         if self.sort_var.get() == "Alphabetical":
-            games_with_time.sort(key=lambda x: x[1].lower())
+            games = sorted(((gid, game.get("game_title", gid)) for gid, game in self.config_manager.config["games"].items()),
+                           key=lambda x: x[1].lower())
         else:
-            games_with_time.sort(key=lambda x: x[2] if x[2] != "Never" else "1970-01-01 00:00:00", reverse=True)
+            games = self.config_manager.get_recent_games(None)
         
         # Insert games into treeview
-        for gid, game_title, last_backup in games_with_time:
-            self.tree.insert("", tk.END, iid=gid, values=(game_title, last_backup))
+        for gid, game_title in games:
+            self.tree.insert("", tk.END, iid=gid, values=(game_title, history.get(gid, "Never")))
     
     def select_game(self):
         """Select game from list"""
@@ -209,10 +210,254 @@ class GameListWindow:
             self.select_btn.state(["!disabled"])
             self.rename_btn.state(["!disabled"])
             self.delete_btn.state(["!disabled"])
+            self.history_btn.state(["!disabled"])
         else:
             self.select_btn.state(["disabled"])
             self.rename_btn.state(["disabled"])
             self.delete_btn.state(["disabled"])
+            self.history_btn.state(["disabled"])
+    
+    def show_history(self):
+        """Show the backup runs of the selected game"""
+        selection = self.tree.selection()
+        if selection:
+            BackupHistoryWindow(self.window, self.config_manager, selection[0])
+
+def format_size(size):
+    """Format a byte count for display"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+class BackupHistoryWindow:
+    """Backup runs of one game, newest first, with their size, bytes written, duration and speed"""
+    PERIODS = {"Last 7 days": 7, "Last 30 days": 30, "Last year": 365, "All": None}
+    MAX_ROWS = 500  # Older runs in the chosen period are not loaded
+
+    def __init__(self, parent, config_manager, game_id):
+        self.config_manager = config_manager
+        self.game_id = game_id
+        game = config_manager.get_game_by_id(game_id) or {}
+        self.game_title = game.get("game_title", game_id)
+
+        self.window = create_toplevel_window(parent, "Backup History", "800x420")
+        self.create_widgets()
+
+    def create_widgets(self):
+        header = ttk.Frame(self.window, padding=(16, 12, 16, 0))
+        header.pack(fill=tk.X)
+        ttk.Label(header, text=f"Backup History - {self.game_title}", font=("Segoe UI", 12, "bold")).pack(anchor="w")
+        ttk.Separator(self.window, orient="horizontal").pack(fill=tk.X, padx=16, pady=(0, 10))
+
+        period_frame = ttk.Frame(self.window)
+        period_frame.pack(fill=tk.X, padx=16, pady=(0, 5))
+        ttk.Label(period_frame, text="Period:").pack(side=tk.LEFT, padx=(0, 10))
+        self.period_var = tk.StringVar(value="Last 30 days")
+        period_combo = ttk.Combobox(period_frame, textvariable=self.period_var, values=list(self.PERIODS),
+                                    state="readonly", width=15)
+        period_combo.pack(side=tk.LEFT)
+        self.summary_label = ttk.Label(period_frame, text="", foreground="gray")
+        self.summary_label.pack(side=tk.RIGHT)
+
+        table_frame = ttk.Frame(self.window)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=16, pady=5)
+        columns = ("Started", "Result", "Size", "Files", "Written", "Duration", "Speed", "Location")
+        widths = (140, 60, 80, 60, 80, 70, 80, 200)
+        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=12)
+        for column, width in zip(columns, widths):
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=width, anchor="w", stretch=column == "Location")
+        v_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        h_scrollbar = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        v_scrollbar.grid(row=0, column=1, sticky="ns")
+        h_scrollbar.grid(row=1, column=0, sticky="ew")
+        table_frame.rowconfigure(0, weight=1)
+        table_frame.columnconfigure(0, weight=1)
+
+        btn_frame = ttk.Frame(self.window)
+        btn_frame.pack(fill=tk.X, padx=16, pady=(0, 12))
+        ttk.Button(btn_frame, text="Close", command=self.window.destroy).pack(side=tk.RIGHT, padx=5)
+
+        period_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh_table())
+        self.refresh_table()
+
+    def refresh_table(self):
+        """Load the runs of the chosen period"""
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+
+        days = self.PERIODS.get(self.period_var.get())
+        start = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S") if days else None
+        try:
+            runs = self.config_manager.get_backup_runs(self.game_id, start=start, limit=self.MAX_ROWS)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load backup history: {str(e)}")
+            return
+
+        for run in reversed(runs):
+            succeeded = run.outcome == "success"
+            self.tree.insert("", tk.END, values=(
+                run.timestamp,
+                "OK" if succeeded else "Failed",
+                format_size(run.size) if succeeded else "-",
+                run.file_count if succeeded else "-",
+                format_size(run.written) if succeeded else "-",
+                f"{run.duration:.1f} s",
+                f"{format_size(run.throughput)}/s" if succeeded else "-",
+                run.path if succeeded else (run.error or run.path)
+            ))
+
+        succeeded = [run for run in runs if run.outcome == "success"]
+        summary = f"{len(runs)} runs, {len(runs) - len(succeeded)} failed"
+        if succeeded:
+            average = sum(run.duration for run in succeeded) / len(succeeded)
+            summary += f", average {average:.1f} s, latest {format_size(succeeded[-1].size)}"
+        self.summary_label.config(text=summary)
+
+class BatchBackupWindow:
+    def __init__(self, parent, config_manager, log_callback=None, on_finished_callback=None):
+        self.parent = parent
+        self.config_manager = config_manager
+        self.log_callback = log_callback
+        self.on_finished_callback = on_finished_callback
+        self.running = False
+        # The batch runs on a worker thread; its events reach the window through this queue
+        self.events = queue.Queue()
+
+        self.window = create_toplevel_window(parent, "Batch Backup", "520x480")
+        self.window.protocol("WM_DELETE_WINDOW", self.close_window)
+        self.create_widgets()
+
+    def create_widgets(self):
+        # Header
+        header = ttk.Frame(self.window, padding=(16, 12, 16, 0))
+        header.pack(fill=tk.X)
+        ttk.Label(header, text="Batch Backup", font=("Segoe UI", 12, "bold")).pack(anchor="w")
+        ttk.Label(header, text="Select games to back up, or start without a selection to back up all games.").pack(anchor="w")
+        ttk.Separator(self.window, orient="horizontal").pack(fill=tk.X, padx=16, pady=(6, 10))
+
+        # Table frame
+        table_frame = ttk.Frame(self.window)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=16, pady=5)
+        columns = ("Game Title", "Status")
+        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=12, selectmode="extended")
+        self.tree.heading("Game Title", text="Game Title")
+        self.tree.heading("Status", text="Status")
+        self.tree.column("Game Title", width=320, anchor="w")
+        self.tree.column("Status", width=130, anchor="w")
+        v_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=v_scrollbar.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        v_scrollbar.grid(row=0, column=1, sticky="ns")
+        table_frame.rowconfigure(0, weight=1)
+        table_frame.columnconfigure(0, weight=1)
+
+        games = sorted(self.config_manager.config["games"].items(),
+                       key=lambda item: item[1].get("game_title", item[0]).lower())
+        for gid, game in games:
+            self.tree.insert("", tk.END, iid=gid, values=(game.get("game_title", gid), ""))
+
+        # Overall progress
+        progress_frame = ttk.Frame(self.window)
+        progress_frame.pack(fill=tk.X, padx=16, pady=5)
+        self.overall_label = ttk.Label(progress_frame, text="Overall progress")
+        self.overall_label.pack(anchor="w")
+        self.overall_var = tk.DoubleVar()
+        ttk.Progressbar(progress_frame, variable=self.overall_var, maximum=100).pack(fill=tk.X, pady=(2, 0))
+
+        # Button frame
+        btn_frame = ttk.Frame(self.window)
+        btn_frame.pack(fill=tk.X, padx=16, pady=(5, 12))
+        self.start_btn = ttk.Button(btn_frame, text="Start Backup", command=self.start_backup)
+        self.start_btn.pack(side=tk.LEFT, padx=5)
+        self.close_btn = ttk.Button(btn_frame, text="Close", command=self.close_window)
+        self.close_btn.pack(side=tk.RIGHT, padx=5)
+        if not games:
+            self.start_btn.state(["disabled"])
+
+    def start_backup(self):
+        """Back up the selected games, or all games when nothing is selected"""
+        game_ids = list(self.tree.selection()) or list(self.tree.get_children())
+        if not game_ids or self.running:
+            return
+        self.running = True
+        self.start_btn.state(["disabled"])
+        self.close_btn.state(["disabled"])
+        for gid in self.tree.get_children():
+            self.tree.set(gid, "Status", "Queued" if gid in game_ids else "")
+        self.overall_var.set(0)
+
+        batch = BatchBackup(
+            self.config_manager, game_ids,
+            progress_callback=lambda gid, game_progress, overall: self.events.put(("progress", (gid, game_progress, overall))),
+            log_callback=lambda message: self.events.put(("log", message))
+        )
+        threading.Thread(target=self._run_batch, args=(batch,), daemon=False).start()
+        self.window.after(UI_POLL_INTERVAL_MS, self._process_events)
+
+    def _run_batch(self, batch):
+        """Worker thread body; the window is only touched through the event queue"""
+        try:
+            self.events.put(("done", batch.run()))
+        except Exception as e:
+            self.events.put(("error", str(e)))
+
+    def _process_events(self):
+        """Apply events from the batch thread, then reschedule while it runs"""
+        progress = {}
+        finished = None
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                # Keep only the newest value per game
+                progress[payload[0]] = payload
+            elif kind == "log":
+                if self.log_callback:
+                    self.log_callback(payload)
+            else:
+                finished = (kind, payload)
+        for gid, game_progress, overall_progress in progress.values():
+            self.on_progress(gid, game_progress, overall_progress)
+
+        if finished is None:
+            self.window.after(UI_POLL_INTERVAL_MS, self._process_events)
+            return
+
+        self.running = False
+        self.start_btn.state(["!disabled"])
+        self.close_btn.state(["!disabled"])
+        kind, payload = finished
+        if kind == "error":
+            messagebox.showerror("Error", f"Batch backup failed: {payload}", parent=self.window)
+            return
+        results = payload
+        failed = [result for result in results if not result.success]
+        for result in results:
+            self.tree.set(result.game_id, "Status", "Done" if result.success else "Failed")
+        if self.on_finished_callback:
+            self.on_finished_callback(results)
+        if failed:
+            details = "\n".join(f"- {result.game_title}: {result.error}" for result in failed[:10])
+            messagebox.showwarning("Batch Backup", f"{len(results) - len(failed)} of {len(results)} games backed up.\n\nFailed:\n{details}", parent=self.window)
+        elif results:
+            messagebox.showinfo("Batch Backup", f"All {len(results)} games backed up successfully!", parent=self.window)
+
+    def on_progress(self, gid, game_progress, overall_progress):
+        """Update per-game status and overall progress"""
+        if self.tree.exists(gid):
+            self.tree.set(gid, "Status", f"{game_progress:.0f}%")
+        self.overall_var.set(overall_progress)
+        self.overall_label.config(text=f"Overall progress: {overall_progress:.0f}%")
+
+    def close_window(self):
+        if not self.running:
+            self.window.destroy()
 
 class CreditSettingWindow:
     def __init__(self, parent, config_manager, on_save_callback, on_reset_callback=None):
@@ -239,7 +484,7 @@ class CreditSettingWindow:
             default_author = saved_author
         else:
             # Author was never set, use default
-            default_author = saved_author if saved_author else DEFAULT_AUTHOR
+            default_author = saved_author if saved_author else get_default_author()
         self.author_var = tk.StringVar(value=default_author)
         author_entry = ttk.Entry(main_frame, textvariable=self.author_var, width=36)
         author_entry.grid(row=2, column=1, sticky=tk.EW, pady=(0, 8))
@@ -275,9 +520,7 @@ class CreditSettingWindow:
             author = self.author_var.get().strip()
             note = self.note_text.get("1.0", tk.END).strip()
             
-            if "last_used" not in self.config_manager.config:
-                self.config_manager.config["last_used"] = {}
-            self.config_manager.config["last_used"]["author"] = author
+            self.config_manager.set_author(author)
             self.config_manager.save_config()
             
             if self.on_save_callback:
@@ -292,7 +535,7 @@ class CreditSettingWindow:
         try:
             # Clear author from config
             if "last_used" in self.config_manager.config:
-                self.config_manager.config["last_used"]["author"] = ""
+                self.config_manager.set_author("")
                 self.config_manager.save_config()
             
             # Clear the input fields
@@ -381,6 +624,41 @@ class PreferencesWindow:
         browse_btn = ttk.Button(dir_frame, text="Browse...", command=self.browse_default_backup_dir)
         browse_btn.pack(side=tk.RIGHT)
         
+        # Incremental backup option (only used when timestamps are disabled)
+        self.incremental_backup_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            backup_frame,
+            text="Incremental backup (copy only new or changed files)",
+            variable=self.incremental_backup_var
+        ).pack(anchor=tk.W, pady=5)
+        
+        # Checksum manifest for verifying backups later
+        self.integrity_manifest_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            backup_frame,
+            text="Write checksums (Checksums.json) so backups can be verified",
+            variable=self.integrity_manifest_var
+        ).pack(anchor=tk.W, pady=5)
+        
+        # Config file encoding
+        self.compact_config_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            backup_frame,
+            text="Compact config file (smaller and faster to save, not indented)",
+            variable=self.compact_config_var
+        ).pack(anchor=tk.W, pady=5)
+        
+        # Compressed archive output
+        ttk.Label(backup_frame, text="Archive Output:").pack(anchor=tk.W, pady=(10, 5))
+        self.archive_format_var = tk.StringVar()
+        archive_frame = ttk.Frame(backup_frame)
+        archive_frame.pack(fill=tk.X)
+        
+        for index, archive_format in enumerate(ARCHIVE_FORMATS):
+            text = archive_format if archive_format == "None" else archive_format.upper()
+            ttk.Radiobutton(archive_frame, text=text, variable=self.archive_format_var,
+                            value=archive_format).pack(side=tk.LEFT, padx=0 if index == 0 else 10)
+        
         # Path Display Settings Section
         path_frame = ttk.LabelFrame(main_frame, text="Path Display Settings", padding="15")
         path_frame.pack(fill=tk.X, pady=(0, 15))
@@ -408,6 +686,31 @@ class PreferencesWindow:
         ttk.Radiobutton(timestamp_frame_inner, text="Enable", variable=self.timestamp_var, value="Enable").pack(side=tk.LEFT)
         ttk.Radiobutton(timestamp_frame_inner, text="Disable", variable=self.timestamp_var, value="Disable").pack(side=tk.LEFT, padx=10)
         
+        # Snapshot storage for timestamped backups
+        ttk.Label(timestamp_frame, text="Snapshot Storage:").pack(anchor=tk.W, pady=(0, 5))
+        self.snapshot_mode_var = tk.StringVar()
+        snapshot_mode_frame = ttk.Frame(timestamp_frame)
+        snapshot_mode_frame.pack(fill=tk.X)
+        
+        for index, mode in enumerate(SNAPSHOT_MODES):
+            text = "Full Copy" if mode == "Full" else mode
+            ttk.Radiobutton(snapshot_mode_frame, text=text, variable=self.snapshot_mode_var,
+                            value=mode).pack(side=tk.LEFT, padx=0 if index == 0 else 10)
+        
+        # Retention of old snapshots (0 = no limit)
+        ttk.Label(timestamp_frame, text="Keep Snapshots (0 = no limit):").pack(anchor=tk.W, pady=(10, 5))
+        retention_frame = ttk.Frame(timestamp_frame)
+        retention_frame.pack(fill=tk.X)
+        self.retention_vars = {}
+        for column, (key, label) in enumerate((("retention_keep_last", "Last"),
+                                               ("retention_keep_daily", "Daily"),
+                                               ("retention_keep_weekly", "Weekly"),
+                                               ("retention_max_size_mb", "Max MB"))):
+            self.retention_vars[key] = tk.StringVar()
+            ttk.Label(retention_frame, text=label).grid(row=0, column=column * 2, sticky=tk.W, padx=(0 if column == 0 else 10, 3))
+            ttk.Spinbox(retention_frame, from_=0, to=999999, width=6,
+                        textvariable=self.retention_vars[key]).grid(row=0, column=column * 2 + 1)
+        
         # Buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=(20, 0))
@@ -428,6 +731,13 @@ class PreferencesWindow:
         self.save_output_dir_var.set(preferences.get("save_output_directory", False))
         self.path_display_var.set(preferences.get("path_display", "Auto"))
         self.timestamp_var.set(preferences.get("timestamp_option", "Disable"))
+        self.incremental_backup_var.set(preferences.get("incremental_backup", False))
+        self.integrity_manifest_var.set(preferences.get("integrity_manifest", True))
+        self.compact_config_var.set(preferences.get("compact_config", False))
+        self.snapshot_mode_var.set(preferences.get("snapshot_mode", "Full"))
+        self.archive_format_var.set(preferences.get("archive_format", "None"))
+        for key, var in self.retention_vars.items():
+            var.set(str(preferences.get(key, 0)))
         
         # Load default backup directory from config
         default_backup = self.config_manager.config.get("default_backup_directory", "")
@@ -439,16 +749,22 @@ class PreferencesWindow:
             preferences = {
                 "save_output_directory": self.save_output_dir_var.get(),
                 "path_display": self.path_display_var.get(),
-                "timestamp_option": self.timestamp_var.get()
+                "timestamp_option": self.timestamp_var.get(),
+                "incremental_backup": self.incremental_backup_var.get(),
+                "integrity_manifest": self.integrity_manifest_var.get(),
+                "compact_config": self.compact_config_var.get(),
+                "snapshot_mode": self.snapshot_mode_var.get(),
+                "archive_format": self.archive_format_var.get()
             }
+            for key, var in self.retention_vars.items():
+                value = var.get().strip()
+                preferences[key] = int(value) if value.isdigit() else 0
             
             # Save preferences
             self.config_manager.save_preferences(preferences)
             
             # Save default backup directory
-            if "default_backup_directory" not in self.config_manager.config:
-                self.config_manager.config["default_backup_directory"] = ""
-            self.config_manager.config["default_backup_directory"] = self.default_backup_dir.get()
+            self.config_manager.set_default_backup_directory(self.default_backup_dir.get())
             
             # Save config
             self.config_manager.save_config()
@@ -10,6 +10,7 @@ WINDOW_WIDTH = 560
 WINDOW_HEIGHT = 460
 MIN_WINDOW_WIDTH = 560
 MIN_WINDOW_HEIGHT = 420
+UI_POLL_INTERVAL_MS = 50  # How often the UI picks up events from background backups
 
 # Logging Configuration
 MAX_LOG_LINES = 1000
@@ -17,12 +18,33 @@ LOG_RETENTION_DAYS = 30
 
 # Backup Configuration
 MAX_RECENT_GAMES = 5
-# Get default author from system username
-import getpass
-try:
-    DEFAULT_AUTHOR = getpass.getuser()
-except Exception:
-    DEFAULT_AUTHOR = "User"
+COPY_WORKERS = 8  # Number of threads used to copy files in parallel
+MTIME_GRANULARITIES_NS = (2_000_000_000, 100)  # FAT/exFAT keep modification times to 2 seconds, NTFS to 100 ns
+SNAPSHOT_NAME_FORMAT = "%Y-%m-%d_%H-%M-%S"  # Folder name of timestamped backups
+BATCH_PARALLEL_GAMES = 2  # Games backed up at the same time by Batch Backup
+PROGRESS_UPDATE_INTERVAL = 0.05  # Minimum seconds between progress callbacks (20 per second)
+AUTO_BACKUP_DEBOUNCE_SECONDS = 30  # Seconds a save must stay unchanged before the watcher backs it up
 # Path Display Options
 PATH_DISPLAY_OPTIONS = ["Auto", "Game Path", "Standard"]
-TIMESTAMP_OPTIONS = ["Enable", "Disable"]
\ No newline at end of file
+TIMESTAMP_OPTIONS = ["Enable", "Disable"]
+SNAPSHOT_MODES = ["Full", "Hardlink", "Deduplicated"]
+ARCHIVE_FORMATS = ["None", "zip", "tar.xz"]
+
+# Default author is the system username, looked up on first use instead of at import
+_default_author = None
+
+def get_default_author() -> str:
+    global _default_author
+    if _default_author is None:
+        import getpass
+        try:
+            _default_author = getpass.getuser()
+        except Exception:
+            _default_author = "User"
+    return _default_author
+
+def __getattr__(name):
+    # Keeps "from utils.constants import DEFAULT_AUTHOR" working
+    if name == "DEFAULT_AUTHOR":
+        return get_default_author()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
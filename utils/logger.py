@@ -1,20 +1,34 @@
 import logging
 import os
+import threading
 from datetime import datetime
 from utils.resource_utils import RESOURCE_DIR
 
 class Logger:
-    """Centralized logging system for the application"""
+    """
+    Centralized logging system for the application. The log file and handlers
+    are set up on the first message, so importing this module has no side effects.
+    """
     
     def __init__(self, name="SweetProgress"):
-        self.logger = logging.getLogger(name)
-        self.logger.setLevel(logging.DEBUG)
-        
-        # Prevent duplicate handlers
-        if not self.logger.handlers:
-            self._setup_handlers()
+        self.name = name
+        self._logger = None
+        self._lock = threading.Lock()
+    
+    @property
+    def logger(self):
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    logger = logging.getLogger(self.name)
+                    logger.setLevel(logging.DEBUG)
+                    # Prevent duplicate handlers
+                    if not logger.handlers:
+                        self._setup_handlers(logger)
+                    self._logger = logger
+        return self._logger
     
-    def _setup_handlers(self):
+    def _setup_handlers(self, logger):
         """Setup file and console handlers"""
         # Create logs directory
         logs_dir = os.path.join(RESOURCE_DIR, "logs")
@@ -37,8 +51,8 @@ class Logger:
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
     
     def debug(self, message):
         self.logger.debug(message)
@@ -3,13 +3,21 @@ import getpass
 from pathlib import Path
 from utils.logger import logger
 
+_current_username = None
+
+# Folder holding the user profiles; only paths under it can need the username replaced
+HOME_ROOT = "users" if os.name == 'nt' else "home"
+
 def get_current_username() -> str:
-    """Get current system username"""
-    try:
-        return getpass.getuser()
-    except Exception as e:
-        logger.error(f"Failed to get username: {e}")
-        return "unknown_user"
+    """Get current system username, looked up once per process"""
+    global _current_username
+    if _current_username is None:
+        try:
+            _current_username = getpass.getuser()
+        except Exception as e:
+            logger.error(f"Failed to get username: {e}")
+            _current_username = "unknown_user"
+    return _current_username
 
 def normalize_path(path):
     """Normalize path to use system-specific separator"""
@@ -28,6 +36,9 @@ def replace_username_in_path(path):
     """Replace username in path with current username"""
     if not path:
         return path
+    # Paths that never mention the profile folder are returned without normalizing them
+    if HOME_ROOT not in (path.lower() if os.name == 'nt' else path):
+        return path
     
     current_username = get_current_username()
     normalized_path = normalize_path(path)